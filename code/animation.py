@@ -0,0 +1,50 @@
+"""
+Relógio de animação compartilhado. Cada animação (ex.: "enemy1walk", "playershot") tem um contador de
+passos avançado uma vez por frame para todo o nível; o resto do tempo que não completou um passo é
+guardado para o frame seguinte, então a troca de frames segue o período exato em qualquer taxa de frames.
+Cada entidade só guarda o passo em que começou (`animation_start`); o frame atual dela é
+`frames[animation.frame_index(animation_start, len(frames))]`, sem temporizador por entidade.
+"""
+
+
+class Animation:
+    """Um passo a cada `period * scale` segundos; `paused` congela todas as entidades desta animação."""
+    __slots__ = ("name", "period", "scale", "paused", "step", "remainder")
+
+    def __init__(self, name, period):
+        self.name = name
+        self.period = period
+        self.scale = 1.0
+        self.paused = False
+        self.step = 0
+        self.remainder = 0.0
+
+    def frame_index(self, start, frame_count):
+        """Frame atual de uma entidade que começou esta animação no passo `start`."""
+        return (self.step - start) % frame_count
+
+
+class AnimationClock:
+    """As animações de um nível, criadas sob demanda pelo nome e avançadas juntas por `advance`."""
+
+    def __init__(self):
+        self.animations = {}
+
+    def animation(self, name, period):
+        """A animação `name`, criada com `period` segundos por frame se ainda não existir."""
+        animation = self.animations.get(name)
+        if animation is None:
+            animation = self.animations[name] = Animation(name, period)
+        return animation
+
+    def advance(self, delta_time):
+        for animation in self.animations.values():
+            if animation.paused:
+                continue
+            period = animation.period * animation.scale
+            remainder = animation.remainder + delta_time
+            if remainder >= period:
+                steps = int(remainder // period)
+                animation.step += steps
+                remainder -= steps * period
+            animation.remainder = remainder
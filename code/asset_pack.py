@@ -0,0 +1,140 @@
+"""
+Arquivo único com todos os assets do jogo, lido por mmap.
+
+Formato: cabeçalho fixo (magic, versão, posição e tamanho do índice), os arquivos concatenados
+(alinhados a 16 bytes) e, no fim, o índice em JSON {nome: [posição, tamanho]}.
+
+Gerar o arquivo (passo de build, depois de mexer em asset/):
+
+    python -m code.asset_pack [--output CAMINHO]
+"""
+import argparse
+import io
+import json
+import mmap
+import os
+import struct
+import sys
+
+ARCHIVE_MAGIC = b"WHPK"
+ARCHIVE_VERSION = 1
+_HEADER = struct.Struct("<4sHQQ")
+_ALIGNMENT = 16
+
+
+class _SliceReader(io.RawIOBase):
+    """Arquivo somente-leitura sobre uma fatia do mmap, sem copiar os bytes do asset."""
+
+    def __init__(self, view, name):
+        super().__init__()
+        self._view = view
+        self._position = 0
+        self.name = name
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def read(self, size=-1):
+        end = len(self._view) if size is None or size < 0 else min(len(self._view), self._position + size)
+        data = self._view[self._position:end].tobytes()
+        self._position = max(self._position, end)
+        return data
+
+    def readall(self):
+        return self.read()
+
+    def readinto(self, buffer):
+        count = min(len(buffer), len(self._view) - self._position)
+        if count <= 0:
+            return 0
+        buffer[:count] = self._view[self._position:self._position + count]
+        self._position += count
+        return count
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_CUR:
+            offset += self._position
+        elif whence == io.SEEK_END:
+            offset += len(self._view)
+        self._position = max(0, offset)
+        return self._position
+
+    def tell(self):
+        return self._position
+
+    def close(self):
+        self._view = self._view[:0]
+        super().close()
+
+
+class AssetArchive:
+    """Arquivo de assets aberto por mmap; `open(nome)` devolve um arquivo sobre a fatia do asset."""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, index_offset, index_size = _HEADER.unpack_from(self._mmap, 0)
+        if magic != ARCHIVE_MAGIC or version != ARCHIVE_VERSION:
+            self._mmap.close()
+            raise ValueError(f"'{path}' não é um arquivo de assets válido.")
+        self._view = memoryview(self._mmap)
+        self.index = json.loads(bytes(self._view[index_offset:index_offset + index_size]))
+
+    def __contains__(self, name):
+        return name in self.index
+
+    def names(self):
+        return list(self.index)
+
+    def open(self, name):
+        try:
+            offset, size = self.index[name]
+        except KeyError:
+            raise FileNotFoundError(f"'{name}' não está em '{self.path}'.") from None
+        return _SliceReader(self._view[offset:offset + size], name)
+
+
+def build(source_dir, output_path):
+    """Empacota todos os arquivos de `source_dir` (com subpastas) em `output_path`. Retorna o índice."""
+    names = []
+    for root, _, files in os.walk(source_dir):
+        for file_name in files:
+            names.append(os.path.relpath(os.path.join(root, file_name), source_dir).replace(os.sep, "/"))
+    index = {}
+    temporary_path = output_path + ".tmp"
+    with open(temporary_path, "wb") as out:
+        out.write(b"\0" * _HEADER.size)
+        for name in sorted(names):
+            out.write(b"\0" * (-out.tell() % _ALIGNMENT))
+            with open(os.path.join(source_dir, name), "rb") as f:
+                data = f.read()
+            index[name] = [out.tell(), len(data)]
+            out.write(data)
+        index_bytes = json.dumps(index, separators=(",", ":")).encode("utf-8")
+        index_offset = out.tell()
+        out.write(index_bytes)
+        out.seek(0)
+        out.write(_HEADER.pack(ARCHIVE_MAGIC, ARCHIVE_VERSION, index_offset, len(index_bytes)))
+    os.replace(temporary_path, output_path)
+    return index
+
+
+def main(argv=None):
+    from . import assets
+
+    parser = argparse.ArgumentParser(prog="python -m code.asset_pack", description="Empacota asset/ num arquivo só.")
+    parser.add_argument("--source", default=assets.ASSET_DIR)
+    parser.add_argument("--output", default=assets.ARCHIVE_PATH)
+    args = parser.parse_args(argv)
+    index = build(args.source, args.output)
+    total = sum(size for _, size in index.values())
+    print(f"{len(index)} arquivos, {total / 2 ** 20:.1f} MiB -> {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
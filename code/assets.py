@@ -0,0 +1,201 @@
+"""
+Ponto único de acesso aos assets do jogo.
+Se existir o arquivo empacotado (ver code/asset_pack.py), tudo é lido de fatias dele via mmap;
+senão, dos arquivos soltos em asset/ (desenvolvimento).
+As imagens são carregadas com o formato de blit escolhido pelo conteúdo do canal alfa:
+opaca -> `convert()` (cópia direta), transparência binária -> `convert()` + colorkey com RLEACCEL
+(os trechos transparentes são pulados) e só as imagens realmente translúcidas ficam com alfa por pixel.
+Com um pool de memória compartilhada ligado (`use_shared_pool`, ver code/shared_assets.py), as imagens
+prontas são publicadas nele e as que outra instância já publicou são usadas sem decodificar.
+"""
+import os
+
+import numpy as np
+import pygame
+
+from . import const, surface_memory
+
+FORMAT_OPAQUE = "opaque"
+FORMAT_COLORKEY = "colorkey"
+FORMAT_ALPHA = "alpha"
+FORMATS = (FORMAT_OPAQUE, FORMAT_COLORKEY, FORMAT_ALPHA)
+
+_COLORKEY_CANDIDATES = ((255, 0, 255), (0, 255, 0), (0, 255, 255), (255, 0, 128), (1, 2, 3))
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ASSET_DIR = os.path.join(ROOT_DIR, 'asset')
+ARCHIVE_PATH = os.path.join(ROOT_DIR, const.ASSET_ARCHIVE_NAME)
+
+_report = {}
+_prefetched = {}
+_archive = None
+_loose_only = False
+_shared_pool = None
+
+
+def use_loose_files(loose=True):
+    """Força a leitura dos arquivos soltos de asset/ mesmo que o arquivo empacotado exista."""
+    global _loose_only, _archive
+    _loose_only = loose
+    _archive = None
+
+
+def use_shared_pool(pool):
+    """Passa a buscar e publicar as imagens em `pool` (um `shared_assets.SharedAssetPool`); None desliga."""
+    global _shared_pool
+    _shared_pool = pool
+
+
+def get_archive():
+    """O arquivo de assets aberto (na primeira chamada), ou None se não houver ou se estiver desligado."""
+    global _archive
+    if _archive is None:
+        _archive = False
+        if not _loose_only and os.path.exists(ARCHIVE_PATH):
+            from .asset_pack import AssetArchive
+            _archive = AssetArchive(ARCHIVE_PATH)
+    return _archive or None
+
+
+def open_asset(name):
+    """Arquivo binário do asset `name` (caminho relativo a asset/). FileNotFoundError se não existir."""
+    archive = get_archive()
+    if archive is not None:
+        return archive.open(name)
+    return open(os.path.join(ASSET_DIR, name), "rb")
+
+
+def load_font(name, size):
+    return pygame.font.Font(open_asset(name), size)
+
+
+def load_music(name):
+    """Carrega a música no mixer (o pygame mantém o arquivo aberto enquanto ela toca)."""
+    pygame.mixer.music.load(open_asset(name), name)
+
+
+def classify(surface, edge_tolerance=const.ASSET_ALPHA_EDGE_TOLERANCE):
+    """
+    Retorna (formato, fração de pixels semi-transparentes). Com `edge_tolerance` > 0, imagens cuja
+    fração de pixels semi-transparentes (bordas suavizadas) não passa desse valor contam como binárias.
+    """
+    if not surface.get_flags() & pygame.SRCALPHA:
+        return FORMAT_OPAQUE, 0.0
+    alpha = pygame.surfarray.pixels_alpha(surface)
+    try:
+        partial = float(np.count_nonzero((alpha > 0) & (alpha < 255))) / alpha.size if alpha.size else 0.0
+        if partial > edge_tolerance:
+            return FORMAT_ALPHA, partial
+        if not np.any(alpha < 128):
+            return FORMAT_OPAQUE, partial
+        return FORMAT_COLORKEY, partial
+    finally:
+        del alpha
+
+
+def _free_colorkey(surface):
+    """Uma cor que nenhum pixel visível da imagem usa."""
+    rgb = pygame.surfarray.pixels3d(surface)
+    alpha = pygame.surfarray.pixels_alpha(surface)
+    try:
+        visible = rgb[alpha >= 128].astype(np.uint32)
+        used = set(np.unique((visible[:, 0] << 16) | (visible[:, 1] << 8) | visible[:, 2]).tolist())
+    finally:
+        del rgb, alpha
+    for color in _COLORKEY_CANDIDATES:
+        if (color[0] << 16) | (color[1] << 8) | color[2] not in used:
+            return color
+    packed = next(value for value in range(1 << 24) if value not in used)
+    return packed >> 16, (packed >> 8) & 0xFF, packed & 0xFF
+
+
+def optimize(surface, name=None, edge_tolerance=const.ASSET_ALPHA_EDGE_TOLERANCE):
+    """Converte a superfície para o formato de blit mais barato que preserva sua aparência."""
+    optimized, fmt, partial = _optimize(surface, edge_tolerance)
+    if name:
+        _report[(name, optimized.get_size())] = (fmt, partial)
+    return optimized
+
+
+def _optimize(surface, edge_tolerance):
+    fmt, partial = classify(surface, edge_tolerance)
+    if fmt == FORMAT_OPAQUE:
+        optimized = surface.convert()
+    elif fmt == FORMAT_COLORKEY:
+        key = _free_colorkey(surface)
+        # Alfa binário limiarizado em 128, como a máscara de colisão
+        source = surface.copy()
+        alpha = pygame.surfarray.pixels_alpha(source)
+        alpha[...] = np.where(alpha >= 128, 255, 0)
+        del alpha
+        optimized = pygame.Surface(surface.get_size()).convert()
+        optimized.fill(key)
+        optimized.blit(source, (0, 0))
+        optimized.set_colorkey(key, pygame.RLEACCEL)
+    else:
+        optimized = surface if surface.get_flags() & pygame.SRCALPHA else surface.convert_alpha()
+    return optimized, fmt, partial
+
+
+def prefetch(name):
+    """
+    Lê e decodifica a imagem `name` para o próximo `load_image` dela, que só converte e escala.
+    Não toca no display, então pode rodar numa thread de fundo. Erros de carregamento são repassados.
+    """
+    if name not in _prefetched:
+        with open_asset(name) as f:
+            image = pygame.image.load(f, name)
+        # Só fundos são pré-carregados; contam como parallax até o load_image consumir ou o descarte
+        _prefetched[name] = surface_memory.track(surface_memory.CATEGORY_PARALLAX, image)
+
+
+def discard_prefetched():
+    """Descarta as imagens pré-carregadas que ninguém usou (ex.: o jogador saiu antes do próximo nível)."""
+    for image in list(_prefetched.values()):
+        surface_memory.release(image)
+    _prefetched.clear()
+
+
+def load_image(name, size=None, height=None):
+    """
+    Carrega a imagem `name` de asset/, escala para `size` (ou para a `height` dada, mantendo a proporção)
+    e aplica `optimize`. Erros de carregamento (pygame.error, FileNotFoundError) são repassados.
+    """
+    key = (name, size, height, const.ASSET_ALPHA_EDGE_TOLERANCE)
+    if _shared_pool is not None:
+        shared = _shared_pool.get(key)
+        if shared is not None:
+            image, fmt, partial = shared
+            surface_memory.release(_prefetched.pop(name, None))
+            _report[(name, image.get_size())] = (fmt, partial)
+            return image
+    image = _prefetched.pop(name, None)
+    surface_memory.release(image)
+    if image is None:
+        with open_asset(name) as f:
+            image = pygame.image.load(f, name)
+    image = image.convert_alpha()
+    if height is not None:
+        size = (int(image.get_width() * (height / image.get_height())), height)
+    if size is not None:
+        image = pygame.transform.scale(image, size)
+    image, fmt, partial = _optimize(image, const.ASSET_ALPHA_EDGE_TOLERANCE)
+    _report[(name, image.get_size())] = (fmt, partial)
+    if _shared_pool is not None:
+        image = _shared_pool.put(key, image, fmt, partial)
+    return image
+
+
+def report_entries():
+    """[(nome, (largura, altura), formato, fração semi-transparente)] de tudo o que foi carregado."""
+    return [(name, size, fmt, partial) for (name, size), (fmt, partial) in sorted(_report.items())]
+
+
+def report():
+    lines = [f"{'asset':<24} {'tamanho':>10} {'formato':>9} {'semi-transp.':>12}"]
+    counts = dict.fromkeys(FORMATS, 0)
+    for name, size, fmt, partial in report_entries():
+        counts[fmt] += 1
+        lines.append(f"{name:<24} {size[0]:>5}x{size[1]:<4} {fmt:>9} {partial * 100:>11.2f}%")
+    lines.append(", ".join(f"{fmt}: {count}" for fmt, count in counts.items()))
+    return "\n".join(lines)
@@ -0,0 +1,1432 @@
+"""
+Benchmarks de desempenho do jogo. Uso:
+
+    python -m code.benchmarks <nome> [opções]
+
+Todos rodam sem janela (driver de vídeo/áudio "dummy").
+"""
+import argparse
+import os
+import sys
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+
+def bench_vecenv(args):
+    """Passos/segundo agregados do VectorizedLevelRunner variando o número de processos de 1 até o nº de núcleos."""
+    import numpy as np
+    from .vecenv import VectorizedLevelRunner, NUM_ACTIONS
+
+    max_workers = args.max_workers or os.cpu_count() or 1
+    rng = np.random.default_rng(0)
+    print(f"{'workers':>8} {'envs':>6} {'steps/s':>12}")
+    for num_workers in range(1, max_workers + 1):
+        num_envs = num_workers * args.envs_per_worker
+        with VectorizedLevelRunner(num_envs, num_workers=num_workers, seed=0) as runner:
+            runner.reset()
+            for _ in range(args.warmup):
+                runner.step(rng.integers(0, NUM_ACTIONS, num_envs, dtype=np.uint8))
+            start = time.perf_counter()
+            for _ in range(args.steps):
+                runner.step(rng.integers(0, NUM_ACTIONS, num_envs, dtype=np.uint8))
+            elapsed = time.perf_counter() - start
+        print(f"{num_workers:>8} {num_envs:>6} {args.steps * num_envs / elapsed:>12.0f}")
+
+
+def _make_level(screen, level_num=1, seed=0):
+    from . import const
+    from .level import Level
+    from .score import ScoreManager
+
+    bg_prefix, bg_count, bg_start_index, level_width = const.LEVEL_DATA[level_num]
+    return Level(screen, bg_prefix, bg_count, bg_start_index, level_width,
+                 player_lives=const.PLAYER_LIVES_START, score_manager=ScoreManager(), seed=seed)
+
+
+def bench_present(args):
+    """Custo de desenhar um frame do nível e apresentá-lo numa janela de 1080p, por backend e modo de escala."""
+    import pygame
+    from . import const, display
+
+    pygame.font.init()
+    budget_ms = 1000.0 / const.FPS
+    failed = False
+    print(f"{'backend':>8} {'modo':>8} {'janela':>10} {'ms/frame':>9}  orçamento {budget_ms:.1f} ms")
+    configs = [(display.BACKEND_SURFACE, scale_mode) for scale_mode in display.SCALE_MODES]
+    configs += [(display.BACKEND_SDL2, display.SCALE_NEAREST), (display.BACKEND_SDL2, display.SCALE_SMOOTH)]
+    for backend, scale_mode in configs:
+        display.close()
+        pygame.display.quit()
+        pygame.display.init()
+        screen = display.init(args.window, scale_mode=scale_mode, backend=backend,
+                              software_renderer=args.software_renderer)
+        level = _make_level(screen)
+        for _ in range(8):
+            level._spawn_enemy()
+        for _ in range(args.warmup):
+            level.step(1.0 / const.FPS, {pygame.K_LEFT: False, pygame.K_RIGHT: True, pygame.K_SPACE: True})
+            level._draw_elements()
+        start = time.perf_counter()
+        for _ in range(args.frames):
+            level._draw_elements()
+        elapsed_ms = (time.perf_counter() - start) * 1000.0 / args.frames
+        window = display.get_active().window
+        window_size = "x".join(map(str, window.size if backend == display.BACKEND_SDL2 else window.get_size()))
+        del level, screen
+        ok = elapsed_ms <= budget_ms
+        failed |= not ok
+        print(f"{backend:>8} {scale_mode:>8} {window_size:>10} {elapsed_ms:>9.2f}  {'OK' if ok else 'ACIMA'}")
+    display.close()
+    return 1 if failed else 0
+
+
+def bench_enemies(args):
+    """Memória por inimigo e custo por inimigo de EnemyPool.update, com e sem tiros."""
+    import tracemalloc
+    import pygame
+    from .enemy import Enemy1, Enemy2, Enemy3, EnemyPool, ENEMY_ARCHETYPES
+
+    pygame.display.init()
+    pygame.display.set_mode((1, 1))
+    classes = [Enemy1, Enemy2, Enemy3]
+    for enemy_class in classes:
+        enemy_class((0, 0))
+
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    enemies = [classes[i % 3]((700 + i, 340)) for i in range(args.count)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    shared_pixels = sum(frame.get_bytesize() * frame.get_width() * frame.get_height()
+                        for archetype in ENEMY_ARCHETYPES.values() for frame in archetype.frames)
+    print(f"Python por inimigo: {(after - before) / args.count:.0f} bytes; "
+          f"pixels compartilhados por todos os tipos: {shared_pixels / 1024:.0f} KiB")
+
+    for label, screen_width in (("sem tiros", 0), ("atirando", 10 ** 6)):
+        pool = EnemyPool()
+        pool.add(*[classes[i % 3]((700 + i, 340)) for i in range(args.count)])
+        start = time.perf_counter()
+        for _ in range(args.frames):
+            pool.update(1.0 / 60, 0, screen_width)
+        elapsed = time.perf_counter() - start
+        print(f"update {label}: {elapsed * 1e6 / args.frames / args.count:.3f} us por inimigo por frame")
+
+
+def bench_collisions(args):
+    """Custo por frame das colisões: só retângulo (antigo) x retângulo + máscara (atual) x máscara criada por frame."""
+    import random
+    import pygame
+    from .enemy import Enemy1, Enemy2, Enemy3, EnemyPool
+    from .enemyshot import EnemyShot
+    from .entity_mediator import EntityMediator
+    from .player import Player
+    from .playershot import PlayerShot
+
+    pygame.display.init()
+    pygame.display.set_mode((1, 1))
+    rng = random.Random(0)
+    player = Player((300, 340))
+    pool = EnemyPool()
+    pool.add(*[rng.choice([Enemy1, Enemy2, Enemy3])((rng.randint(0, 600), 340)) for _ in range(args.enemies)])
+    player_shots = [PlayerShot((rng.randint(0, 640), rng.randint(340, 420)), 1) for _ in range(args.shots)]
+    enemy_shots = [EnemyShot((rng.randint(0, 640), rng.randint(340, 420)), "enemy1") for _ in range(args.shots)]
+    pairs = [(shot, enemy) for shot in player_shots for enemy in pool] + [(player, shot) for shot in enemy_shots] \
+        + [(player, enemy) for enemy in pool]
+
+    def rect_only(a, b):
+        return a.rect.colliderect(b.rect)
+
+    def mask_every_frame(a, b):
+        mask_a = pygame.mask.from_surface(a.image)
+        mask_b = pygame.mask.from_surface(b.image)
+        return a.rect.colliderect(b.rect) and \
+            mask_a.overlap(mask_b, (b.rect.x - a.rect.x, b.rect.y - a.rect.y)) is not None
+
+    print(f"{len(pairs)} pares por frame")
+    baseline = None
+    for label, test in (("retângulo", rect_only), ("ret. + máscara", EntityMediator.collide),
+                        ("máscara por frame", mask_every_frame)):
+        hits = sum(1 for a, b in pairs if test(a, b))
+        start = time.perf_counter()
+        for _ in range(args.frames):
+            for a, b in pairs:
+                test(a, b)
+        per_frame_us = (time.perf_counter() - start) * 1e6 / args.frames
+        baseline = baseline or per_frame_us
+        print(f"{label:>18}: {per_frame_us:8.1f} us/frame ({per_frame_us / baseline:5.2f}x), {hits} colisões")
+
+
+class _FrameBudgetClock:
+    """
+    Relógio para benchmarks: encerra o loop (QUIT) após N frames. Sem `inner`, `tick` não dorme e
+    devolve dt fixo; com `inner` (um Clock/FramePacer) delega a espera a ele e registra os instantes
+    de cada tick. `key_every` injeta um KEYDOWN de pulo a cada tantos frames.
+    """
+
+    def __init__(self, frames, fps, inner=None, key_every=0):
+        import pygame
+        self._pygame = pygame
+        self.frames_left = frames
+        self.dt_ms = 1000.0 / fps
+        self.inner = inner
+        self.key_every = key_every
+        self.tick_times = []
+
+    def tick(self, framerate=0):
+        pygame = self._pygame
+        self.frames_left -= 1
+        if self.frames_left < 0:
+            pygame.event.post(pygame.event.Event(pygame.QUIT))
+        if self.inner is None:
+            return self.dt_ms
+        dt_ms = self.inner.tick(framerate)
+        self.tick_times.append(time.perf_counter())
+        if self.key_every and len(self.tick_times) % self.key_every == 0:
+            pygame.event.post(pygame.event.Event(pygame.KEYDOWN, key=pygame.K_UP, mod=0, unicode="", scancode=0))
+        return dt_ms
+
+
+def _run_level(level, clock):
+    """Roda `level.frame` com o dt de `clock.tick` até o nível devolver uma ação (ex.: o QUIT do relógio)."""
+    from . import const
+
+    try:
+        while not level.frame(clock.tick(const.FPS) / 1000.0):
+            pass
+    finally:
+        level.end_frames()
+
+
+def bench_pipeline(args):
+    """ms/frame do loop do nível serial x com o fundo composto numa thread em paralelo à simulação."""
+    import pygame
+    from . import const, display
+
+    pygame.font.init()
+    screen = display.init(args.window)
+    print(f"{os.cpu_count()} núcleo(s); janela {args.window[0]}x{args.window[1]}")
+    baseline = None
+    for label, pipelined in (("serial", False), ("em paralelo", True)):
+        level = _make_level(screen)
+        level.pipelined = pipelined
+        for _ in range(args.enemies):
+            level._spawn_enemy()
+        _run_level(level, _FrameBudgetClock(args.warmup, const.FPS))
+        pygame.event.clear()
+        start = time.perf_counter()
+        _run_level(level, _FrameBudgetClock(args.frames, const.FPS))
+        per_frame_ms = (time.perf_counter() - start) * 1000.0 / args.frames
+        pygame.event.clear()
+        baseline = baseline or per_frame_ms
+        print(f"{label:>12}: {per_frame_ms:7.2f} ms/frame ({baseline / per_frame_ms:4.2f}x)")
+    display.close()
+    return 0
+
+
+def bench_latency(args):
+    """Latência entrada -> frame apresentado e regularidade do frame por política de pacing, com e sem late latching."""
+    import statistics
+    import pygame
+    from . import const, display
+    from .input_latency import InputLatencyTracker
+    from .pacing import FramePacer, PACING_POLICIES
+
+    pygame.font.init()
+    screen = display.init()
+    period_ms = 1000.0 / const.FPS
+    print(f"{'pacing':>7} {'latch':>6} {'p50 ms':>7} {'p95 ms':>7} {'p99 ms':>7} "
+          f"{'frame ms':>9} {'desvio':>7} {'atrasados':>9}")
+    for policy in PACING_POLICIES:
+        for late_latch in (False, True):
+            tracker = InputLatencyTracker()
+            display.add_present_hook(tracker.on_present)
+            level = _make_level(screen)
+            level.late_latch = late_latch
+            level.input_latency = tracker
+            for _ in range(args.enemies):
+                level._spawn_enemy()
+            clock = _FrameBudgetClock(args.frames, const.FPS, inner=FramePacer(policy), key_every=args.key_every)
+            _run_level(level, clock)
+            pygame.event.clear()
+            display.remove_present_hook(tracker.on_present)
+            tracker.close()
+
+            intervals = [(b - a) * 1000.0 for a, b in zip(clock.tick_times, clock.tick_times[1:])]
+            late = sum(1 for interval in intervals if interval > period_ms * 1.5)
+            stats = tracker.stats()
+            print(f"{policy:>7} {'sim' if late_latch else 'não':>6} {stats['p50_ms']:>7.2f} {stats['p95_ms']:>7.2f} "
+                  f"{stats['p99_ms']:>7.2f} {statistics.mean(intervals):>9.2f} {statistics.pstdev(intervals):>7.2f} "
+                  f"{late:>9}")
+    display.close()
+    return 0
+
+
+def _resident_bytes():
+    """Memória residente atual do processo (Linux: /proc/self/statm; outros: pico via getrusage)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def bench_soak(args):
+    """Joga N ciclos de nível sem janela; falha se a memória de superfícies ou a residente não ficarem estáveis."""
+    import pygame
+    from . import const, display, surface_memory
+
+    pygame.font.init()
+    screen = display.init()
+    keys = {pygame.K_LEFT: False, pygame.K_RIGHT: True, pygame.K_SPACE: True}
+    tracked_after, resident_after = [], []
+    for cycle in range(args.cycles):
+        level = _make_level(screen, level_num=cycle % const.MAX_GAME_LEVELS + 1, seed=cycle)
+        for _ in range(args.enemies):
+            level._spawn_enemy()
+        for _ in range(args.frames):
+            level.step(1.0 / const.FPS, keys)
+            level._draw_elements()
+        level.unload()
+        del level
+        tracked_after.append(surface_memory.current_bytes())
+        resident_after.append(_resident_bytes())
+
+    # A residente oscila conforme o nível carregado por último (reuso do alocador); compara os picos de
+    # uma janela logo após o aquecimento e da janela final, ambas cobrindo todos os níveis.
+    warm = min(args.warmup, args.cycles // 2)
+    window = max(const.MAX_GAME_LEVELS, min(args.warmup, args.cycles - warm))
+    tracked_growth = tracked_after[-1] - tracked_after[warm]
+    resident_growth = max(resident_after[-window:]) - max(resident_after[warm:warm + window])
+    print(surface_memory.report())
+    print(f"Após {args.cycles} ciclos: superfícies {tracked_growth / 1024:+.0f} KiB desde o ciclo {warm + 1}, "
+          f"pico residente {resident_growth / 2 ** 20:+.1f} MiB entre a primeira e a última janela de {window} "
+          f"ciclos (tolerância {args.tolerance_mib:.0f} MiB)")
+    ok = tracked_growth <= 0 and resident_growth <= args.tolerance_mib * 2 ** 20
+    print("OK" if ok else "MEMÓRIA CRESCENDO")
+    display.close()
+    return 0 if ok else 1
+
+
+def bench_snapshot(args):
+    """Custo de Level.snapshot()/restore() e determinismo: reproduzir a partir de um snapshot dá o mesmo estado."""
+    import pygame
+    from . import const, display
+
+    pygame.font.init()
+    screen = display.init()
+    level = _make_level(screen, seed=1)
+
+    def play(frames):
+        for i in range(frames):
+            if i % 45 == 0:
+                level.player.jump()
+            keys = {pygame.K_LEFT: i % 90 >= 70, pygame.K_RIGHT: i % 90 < 60, pygame.K_SPACE: i % 4 == 0}
+            if level.step(1.0 / const.FPS, keys):
+                break
+
+    for _ in range(args.enemies):
+        level._spawn_enemy()
+    play(args.warmup)
+    blob = level.snapshot()
+    num_enemies, num_shots = len(level.enemies), len(level.player.shots_group) + len(level.enemy_shots)
+
+    start = time.perf_counter()
+    for _ in range(args.repeat):
+        level.snapshot()
+    snapshot_us = (time.perf_counter() - start) * 1e6 / args.repeat
+    start = time.perf_counter()
+    for _ in range(args.repeat):
+        level.restore(blob)
+    restore_us = (time.perf_counter() - start) * 1e6 / args.repeat
+
+    round_trip = level.snapshot() == blob
+    play(args.frames)
+    first_run = level.snapshot()
+    level.restore(blob)
+    play(args.frames)
+    replay_matches = level.snapshot() == first_run
+    level.unload()
+    display.close()
+
+    print(f"{len(blob)} bytes; {num_enemies} inimigos e {num_shots} tiros no snapshot")
+    print(f"snapshot {snapshot_us:.1f} us, restore {restore_us:.1f} us (orçamento {args.budget_us:.0f} us)")
+    print(f"ida e volta idêntica: {'sim' if round_trip else 'NÃO'}; "
+          f"{args.frames} frames reproduzidos idênticos: {'sim' if replay_matches else 'NÃO'}")
+    ok = round_trip and replay_matches and max(snapshot_us, restore_us) <= args.budget_us
+    return 0 if ok else 1
+
+
+def bench_endless(args):
+    """Soak do modo infinito: horas de jogo simuladas; falha se memória, coordenadas ou custo por frame crescerem."""
+    import hashlib
+    import pygame
+    from . import const, display, surface_memory
+    from .endless_level import EndlessLevel
+    from .score import ScoreManager
+
+    pygame.font.init()
+    screen = display.init()
+    level = EndlessLevel(screen, player_lives=10 ** 6, score_manager=ScoreManager(), seed=0)
+    frames_per_window = int(args.window_minutes * 60 * const.FPS)
+    windows = max(2, int(args.minutes / args.window_minutes))
+    rows = []
+    print(f"{'minuto':>7} {'distância':>10} {'inimigos':>8} {'tiros':>6} {'máx |x|':>8} {'us/frame':>9} {'residente':>10}")
+    frame = 0
+    for window in range(windows):
+        max_coordinate = 0
+        start = time.perf_counter()
+        for _ in range(frames_per_window):
+            if frame % 50 == 0:
+                level.player.jump()
+            keys = {pygame.K_LEFT: False, pygame.K_RIGHT: frame % 240 < 200, pygame.K_SPACE: frame % 3 == 0}
+            level.step(1.0 / const.FPS, keys)
+            if frame % args.draw_every == 0:
+                level._draw_elements()
+            max_coordinate = max(max_coordinate, abs(level.player.rect.x), abs(level.camera_offset_x),
+                                 *(abs(enemy.rect.x) for enemy in level.enemies))
+            frame += 1
+        per_frame_us = (time.perf_counter() - start) * 1e6 / frames_per_window
+        row = (level.distance, len(level.enemies), len(level.enemy_shots) + len(level.player.shots_group),
+               max_coordinate, per_frame_us, _resident_bytes(), surface_memory.current_bytes())
+        rows.append(row)
+        print(f"{(window + 1) * args.window_minutes:>7.0f} {row[0]:>10.0f} {row[1]:>8} {row[2]:>6} {row[3]:>8} "
+              f"{row[4]:>9.1f} {row[5] / 2 ** 20:>9.1f}M")
+    level.unload()
+
+    # Modo pipelined: o fundo é composto numa thread enquanto o próximo frame é simulado (e rebaseado).
+    # Os frames apresentados, um frame atrás, têm de ser os mesmos do modo serial, rebases incluídos.
+    def presented_frames(pipelined):
+        digests = []
+        hook = lambda surface: digests.append(hashlib.sha1(surface.get_view("2").raw).digest())
+        level = EndlessLevel(screen, player_lives=10 ** 6, score_manager=ScoreManager(), seed=0, pipelined=pipelined)
+        display.add_present_hook(hook)
+        rebases, origin = 0, level.world_origin
+        for _ in range(args.pipelined_frames):
+            level.player.rect.x += args.pipelined_speed
+            level.frame(1.0 / const.FPS)
+            rebases += level.world_origin != origin
+            origin = level.world_origin
+        level.frame(1.0 / const.FPS)
+        display.remove_present_hook(hook)
+        level.unload()
+        return digests, rebases
+
+    serial, rebases = presented_frames(False)
+    pipelined, _ = presented_frames(True)
+    print(f"pipelined: {args.pipelined_frames} frames com {rebases} rebases")
+    display.close()
+
+    first, last = rows[0], rows[-1]
+    coordinate_limit = const.ENDLESS_REBASE_DISTANCE + 2 * const.SCREEN_WIDTH
+    checks = {
+        "pipelined idêntico ao serial nos rebases": rebases > 0 and pipelined[:args.pipelined_frames] == serial[:args.pipelined_frames],
+        "coordenadas limitadas": max(row[3] for row in rows) <= coordinate_limit,
+        "memória residente estável": last[5] - first[5] <= args.tolerance_mib * 2 ** 20,
+        "superfícies estáveis": last[6] <= first[6],
+        "custo por frame estável": last[4] <= first[4] * args.cost_tolerance,
+    }
+    for label, ok in checks.items():
+        print(f"{label}: {'OK' if ok else 'FALHOU'}")
+    return 0 if all(checks.values()) else 1
+
+
+def bench_blitformats(args):
+    """Custo de blit de cada asset com alfa por pixel (antes) x no formato escolhido pelo otimizador de assets."""
+    import glob
+    import pygame
+    from . import assets, const
+
+    pygame.display.init()
+    target = pygame.display.set_mode((const.SCREEN_WIDTH, const.SCREEN_HEIGHT))
+    asset_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "asset")
+
+    def blit_us(surface):
+        start = time.perf_counter()
+        for _ in range(args.blits):
+            target.blit(surface, (0, 0))
+        return (time.perf_counter() - start) * 1e6 / args.blits
+
+    totals = {fmt: [0.0, 0.0, 0] for fmt in assets.FORMATS}
+    print(f"{'asset':<20} {'tamanho':>9} {'formato':>9} {'alfa us':>8} {'novo us':>8} {'ganho':>6}")
+    for path in sorted(glob.glob(os.path.join(asset_dir, "*.png"))):
+        source = pygame.image.load(path).convert_alpha()
+        if source.get_height() > const.SCREEN_HEIGHT:
+            source = pygame.transform.scale(source, (int(source.get_width() * const.SCREEN_HEIGHT / source.get_height()),
+                                                     const.SCREEN_HEIGHT))
+        fmt, _ = assets.classify(source, args.edge_tolerance)
+        optimized = assets.optimize(source, edge_tolerance=args.edge_tolerance)
+        before, after = blit_us(source), blit_us(optimized)
+        totals[fmt][0] += before
+        totals[fmt][1] += after
+        totals[fmt][2] += 1
+        width, height = source.get_size()
+        print(f"{os.path.basename(path):<20} {width:>4}x{height:<4} {fmt:>9} {before:>8.1f} {after:>8.1f} "
+              f"{before / after:>5.2f}x")
+    failed = False
+    for fmt, (before, after, count) in totals.items():
+        if count:
+            print(f"{fmt:>9}: {count} assets, {before:.0f} -> {after:.0f} us somando um blit de cada "
+                  f"({before / after:.2f}x)")
+            failed |= after > before * 1.1
+    return 1 if failed else 0
+
+
+_ASSET_LOAD_CHILD = """
+import json, sys, time
+from code import assets
+if sys.argv[1] == "loose":
+    assets.use_loose_files()
+import pygame
+pygame.display.init()
+pygame.display.set_mode((1, 1))
+pygame.font.init()
+start = time.perf_counter()
+names = assets.get_archive().names() if assets.get_archive() else sorted(__import__("os").listdir(assets.ASSET_DIR))
+read_bytes = 0
+for name in names:
+    with assets.open_asset(name) as f:
+        read_bytes += len(f.read())
+read_done = time.perf_counter()
+for name in names:
+    if name.endswith(".png"):
+        assets.load_image(name)
+    elif name.endswith(".ttf"):
+        assets.load_font(name, 24)
+print(json.dumps({"files": len(names), "bytes": read_bytes, "read": read_done - start,
+                  "total": time.perf_counter() - start}))
+"""
+
+
+def _evict_from_page_cache(paths):
+    """Tira os arquivos do cache de páginas do SO (posix_fadvise DONTNEED; não precisa de root)."""
+    for path in paths:
+        fd = os.open(path, os.O_RDONLY)
+        try:
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+        finally:
+            os.close(fd)
+
+
+def bench_assetload(args):
+    """Carga de todos os assets com cache frio: arquivos soltos de asset/ x assets.pak via mmap."""
+    import json
+    import statistics
+    import subprocess
+    from . import asset_pack, assets
+
+    if not hasattr(os, "posix_fadvise"):
+        print("posix_fadvise indisponível: os tempos serão de cache quente.")
+    repo_root = assets.ROOT_DIR
+    archive_path = assets.ARCHIVE_PATH
+    if args.rebuild or not os.path.exists(archive_path):
+        index = asset_pack.build(assets.ASSET_DIR, archive_path)
+        print(f"{archive_path} gerado com {len(index)} arquivos")
+    loose_files = [os.path.join(root, name) for root, _, names in os.walk(assets.ASSET_DIR) for name in names]
+    env = dict(os.environ, PYTHONDONTWRITEBYTECODE="1")
+
+    results = {"loose": [], "archive": []}
+    for _ in range(args.runs):
+        for mode in results:
+            if hasattr(os, "posix_fadvise"):
+                _evict_from_page_cache(loose_files + [archive_path])
+            output = subprocess.run([sys.executable, "-c", _ASSET_LOAD_CHILD, mode], cwd=repo_root, env=env,
+                                    check=True, capture_output=True, text=True).stdout
+            results[mode].append(json.loads(output.strip().splitlines()[-1]))
+
+    print(f"{'modo':>8} {'arquivos':>8} {'aberturas':>9} {'MiB':>6} {'leitura ms':>11} {'total ms':>9}  (medianas)")
+    for mode, runs in results.items():
+        opens = runs[0]['files'] if mode == "loose" else 1
+        print(f"{mode:>8} {runs[0]['files']:>8} {opens:>9} {runs[0]['bytes'] / 2 ** 20:>6.1f} "
+              f"{statistics.median(r['read'] for r in runs) * 1000:>11.1f} "
+              f"{statistics.median(r['total'] for r in runs) * 1000:>9.1f}")
+    return 0
+
+
+def bench_quality(args):
+    """Custo de desenho de cada nível de qualidade e resposta do governador a traços de tempo de frame."""
+    import random
+    import pygame
+    from . import const, display
+    from .enemy import Enemy1, Enemy2, Enemy3
+    from .playershot import PlayerShot
+    from .quality import QUALITY_LEVELS, QUALITY_MAX_HOLD_FRAMES, QUALITY_WINDOW_FRAMES, QualityGovernor
+
+    pygame.font.init()
+    screen = display.init(args.window)
+    level = _make_level(screen, level_num=args.level)
+    classes = [Enemy1, Enemy2, Enemy3]
+    level.enemies.add(*[classes[i % 3]((200 + i * 40, const.ENEMY_START_Y)) for i in range(args.enemies)])
+    for i in range(args.shots):
+        level.player.shots_group.add(PlayerShot((100 + i * 25, 300), 1))
+
+    costs = []
+    print(f"{'nível':>7} {'camadas':>7} {'ms/frame':>9}")
+    for settings in QUALITY_LEVELS:
+        level.apply_quality(settings)
+        start = time.perf_counter()
+        for frame in range(args.frames):
+            level.enemies.update(1.0 / const.FPS, level.camera_offset_x, level.screen_width)
+            level.player.shots_group.update(1.0 / const.FPS, -10 ** 6, 10 ** 7)
+            level.camera_offset_x = frame * 3
+            level._draw_elements()
+        costs.append((time.perf_counter() - start) * 1000 / args.frames)
+        print(f"{settings['name']:>7} {len(level.visible_layers):>7} {costs[-1]:>9.2f}")
+    level.apply_quality(None)
+    level.unload()
+    display.close()
+
+    # Traços sintéticos em múltiplos do orçamento; no de laço fechado o custo depende do nível atual
+    rng = random.Random(0)
+    budget = 1000.0 / const.FPS
+
+    def run_trace(cost_of_level, frames):
+        governor = QualityGovernor(budget)
+        levels = []
+        for _ in range(frames):
+            governor.record(cost_of_level(governor.level) * budget * rng.uniform(0.9, 1.1))
+            levels.append(governor.level)
+        governor.close()
+        return governor, levels
+
+    lowest = len(QUALITY_LEVELS) - 1
+    overload, overload_levels = run_trace(lambda level: 2.0, 600)
+    headroom_governor = QualityGovernor(budget)
+    for _ in range(200):
+        headroom_governor.record(2.0 * budget)
+    for _ in range(2000):
+        headroom_governor.record(0.3 * budget)
+    headroom_governor.close()
+    # Perto do limiar: o nível 0 estoura e o nível 1 tem folga suficiente para tentar subir
+    edge, edge_levels = run_trace(lambda level: (1.15, 0.55, 0.45, 0.35)[level], args.edge_frames)
+    # Com o recuo no limite, sobra no máximo uma tentativa de subir (e a descida) a cada espera máxima
+    half = len(edge_levels) // 2
+    max_late_changes = 2 * half / (QUALITY_MAX_HOLD_FRAMES + QUALITY_WINDOW_FRAMES) + 2
+    late_changes = sum(1 for a, b in zip(edge_levels[half:], edge_levels[half + 1:]) if a != b)
+    print(f"sobrecarga: nível mínimo em {overload_levels.index(lowest) + 1} frames")
+    print(f"folga: volta ao nível {headroom_governor.level} depois de {headroom_governor.changes} trocas")
+    print(f"limiar: {edge.changes} trocas em {args.edge_frames} frames, {late_changes} na segunda metade, "
+          f"{sum(1 for level in edge_levels if level == 0) * 100 / len(edge_levels):.0f}% do tempo no nível 0")
+
+    checks = {
+        "qualidade mínima mais barata": costs[-1] < costs[0],
+        "desce sob sobrecarga": overload.level == lowest,
+        "sobe com folga": headroom_governor.level == 0,
+        "sem oscilação perto do limiar": late_changes <= max_late_changes,
+    }
+    for label, ok in checks.items():
+        print(f"{label}: {'OK' if ok else 'FALHOU'}")
+    return 0 if all(checks.values()) else 1
+
+
+def bench_asyncloop(args):
+    """Frames fora do orçamento com gravações, decodificação e logs dentro do frame x na sobra (FrameScheduler)."""
+    import asyncio
+    import statistics
+    import tempfile
+    import pygame
+    from . import assets, const, db_proxy, display, instrumentation
+    from .frame_scheduler import FrameScheduler
+    from .pacing import FramePacer
+
+    pygame.font.init()
+    screen = display.init()
+    workdir = tempfile.mkdtemp()
+    db_proxy.SCORE_FILENAME = os.path.join(workdir, "high_scores.json")
+    log_path = os.path.join(workdir, "metrics.jsonl")
+    scores = [{"score": i, "timestamp": "2024-01-01 00:00"} for i in range(10)]
+    bg_prefix, bg_count, bg_start_index, _ = const.LEVEL_DATA[2]
+    images = [f"{bg_prefix}{i}.png" for i in range(bg_start_index, bg_start_index + bg_count)]
+    budget_ms = 1000.0 / const.FPS
+
+    def decode(name):
+        with assets.open_asset(name) as f:
+            pygame.image.load(f, name)
+
+    def jobs(frame):
+        """A cada --job-every frames: grava os scores, decodifica um fundo e grava 10 snapshots de métricas."""
+        if frame % args.job_every:
+            return ()
+        return ((db_proxy.save_data, (scores,)), (decode, (images[frame // args.job_every % len(images)],)),
+                (instrumentation.append_jsonl, (log_path, [instrumentation.snapshot()] * 10)))
+
+    def new_level():
+        level = _make_level(screen, level_num=1)
+        level.player.lives = 10 ** 6
+        return level
+
+    def run_sync():
+        level, pacer = new_level(), FramePacer()
+        work, intervals = [], []
+        for frame in range(args.frames):
+            intervals.append(pacer.tick(const.FPS))
+            start = time.perf_counter()
+            level.frame(1.0 / const.FPS)
+            for fn, fn_args in jobs(frame):
+                fn(*fn_args)
+            work.append((time.perf_counter() - start) * 1000)
+        level.unload()
+        return work, intervals[1:]
+
+    failed = []
+
+    async def run_async():
+        level, scheduler = new_level(), FrameScheduler()
+        work, intervals = [], []
+        # Um trabalho que falha e que ninguém aguarda: o scheduler deve mostrá-lo e contá-lo
+        scheduler.run_in_background(decode, "nao_existe.png")
+        for frame in range(args.frames):
+            intervals.append(await scheduler.tick(const.FPS))
+            start = time.perf_counter()
+            level.frame(1.0 / const.FPS)
+            for fn, fn_args in jobs(frame):
+                scheduler.run_in_background(fn, *fn_args)
+            work.append((time.perf_counter() - start) * 1000)
+        await scheduler.drain()
+        failed.append(scheduler.jobs_failed)
+        scheduler.close()
+        level.unload()
+        return work, intervals[1:]
+
+    results = {"síncrono": run_sync(), "asyncio": asyncio.run(run_async())}
+    display.close()
+    print(f"{'loop':>9} {'p50 ms':>7} {'p99 ms':>7} {'máx ms':>7} {'estouros':>8} {'intervalo ms':>13} {'desvio':>7}")
+    summary = {}
+    for label, (work, intervals) in results.items():
+        work_sorted = sorted(work)
+        over = sum(1 for ms in work if ms > budget_ms)
+        summary[label] = (over, statistics.mean(intervals))
+        print(f"{label:>9} {work_sorted[len(work) // 2]:>7.2f} {work_sorted[int(len(work) * 0.99)]:>7.2f} "
+              f"{work_sorted[-1]:>7.2f} {over:>8} {statistics.mean(intervals):>13.2f} {statistics.stdev(intervals):>7.2f}")
+    checks = {
+        "menos frames fora do orçamento": summary["asyncio"][0] < summary["síncrono"][0],
+        "ritmo sem deriva": abs(summary["asyncio"][1] - budget_ms) <= budget_ms * 0.02,
+        "trabalho com erro contado": failed == [1],
+    }
+    for label, ok in checks.items():
+        print(f"{label}: {'OK' if ok else 'FALHOU'}")
+    return 0 if all(checks.values()) else 1
+
+
+def bench_background(args):
+    """CPU e frames apresentados com a janela em primeiro plano x sem foco, e tempo até voltar a apresentar."""
+    import threading
+    import pygame
+    from . import const, display
+    from .game import Game
+
+    game = Game()
+    game.menu.draw()
+    presents = []
+    display.add_present_hook(lambda surface: presents.append(time.perf_counter()))
+    pygame.event.post(pygame.event.Event(pygame.KEYDOWN, key=pygame.K_RETURN))
+
+    def phase(seconds):
+        """Roda o loop síncrono do jogo; retorna (CPU ms por segundo, apresentações por segundo)."""
+        presents.clear()
+        wall, cpu = time.perf_counter(), time.process_time()
+        while time.perf_counter() - wall < seconds:
+            game._frame(game.relogio.tick(game._frame_rate()) / 1000.0)
+        elapsed = time.perf_counter() - wall
+        return (time.process_time() - cpu) * 1000 / elapsed, len(presents) / elapsed
+
+    foreground = phase(args.seconds)
+    level = game.level
+    pygame.event.post(pygame.event.Event(pygame.WINDOWFOCUSLOST))
+    camera_before = (level.camera_offset_x, len(level.enemies), level.enemy_spawn_timer)
+    background = phase(args.seconds)
+    paused = (level.camera_offset_x, len(level.enemies), level.enemy_spawn_timer) == camera_before
+    # Digitação em outra janela: só o último KEYUP de cada tecla deve ficar guardado
+    for _ in range(args.typed_events):
+        for event_type in (pygame.KEYDOWN, pygame.KEYUP):
+            pygame.event.post(pygame.event.Event(event_type, key=pygame.K_SPACE))
+        pygame.event.post(pygame.event.Event(pygame.MOUSEMOTION, pos=(0, 0), rel=(1, 1), buttons=(0, 0, 0)))
+    while pygame.event.peek():
+        game._frame(game.relogio.tick(game._frame_rate()) / 1000.0)
+    deferred = [event.type for event in game._deferred_keyups.values()]
+
+    # Volta o foco de outra thread no meio de uma espera e mede até a primeira apresentação
+    presents.clear()
+    posted = []
+    timer = threading.Timer(0.1, lambda: (posted.append(time.perf_counter()),
+                                          pygame.event.post(pygame.event.Event(pygame.WINDOWFOCUSGAINED))))
+    timer.start()
+    while not presents:
+        game._frame(game.relogio.tick(game._frame_rate()) / 1000.0)
+    resume_ms = (presents[0] - posted[0]) * 1000
+    game._unload_level()
+    display.close()
+
+    print(f"{'janela':>16} {'CPU ms/s':>9} {'frames/s':>9}")
+    print(f"{'primeiro plano':>16} {foreground[0]:>9.1f} {foreground[1]:>9.1f}")
+    print(f"{'sem foco':>16} {background[0]:>9.1f} {background[1]:>9.1f}")
+    print(f"volta ao primeiro plano: primeiro frame {resume_ms:.1f} ms depois do evento")
+    print(f"eventos guardados em segundo plano: {len(deferred)} de {args.typed_events * 3} recebidos")
+    checks = {
+        "nível pausado": paused,
+        "só um KEYUP por tecla guardado": deferred == ([pygame.KEYUP] if args.typed_events else []),
+        "nada apresentado sem foco": background[1] == 0,
+        "CPU quase zero sem foco": background[0] <= foreground[0] * 0.05,
+        "volta em até um frame de espera": resume_ms <= 1000.0 / const.FPS * 2,
+    }
+    for label, ok in checks.items():
+        print(f"{label}: {'OK' if ok else 'FALHOU'}")
+    return 0 if all(checks.values()) else 1
+
+
+def bench_profiler(args):
+    """Custo do profiler por amostragem sobre frames do nível e funções quentes que ele encontra."""
+    import statistics
+    import tempfile
+    import pygame
+    from . import const, display, profiler
+    from .profiler import PROFILER_MODES, SamplingProfiler
+
+    pygame.font.init()
+    screen = display.init()
+    level = _make_level(screen, level_num=1)
+    level.player.lives = 10 ** 6
+
+    def frames_ms():
+        start = time.perf_counter()
+        for frame in range(args.frames):
+            level.frame(1.0 / const.FPS)
+            if frame % 10 == 0:
+                level._spawn_enemy()
+                level.player.shoot()
+        return (time.perf_counter() - start) * 1000 / args.frames
+
+    def inclusive_shares(counts):
+        totals, total = {}, 0
+        for line in profiler.collapsed(counts):
+            stack, count = line.rsplit(" ", 1)
+            total += int(count)
+            for label in set(stack.split(";")[1:]):
+                totals[label] = totals.get(label, 0) + int(count)
+        return {label: count / total for label, count in totals.items()}, total
+
+    frames_ms()
+    # "custo" compara medianas de blocos com e sem o profiler (ruidoso); "na amostra" é o tempo medido
+    # dentro das próprias amostras sobre o tempo ligado
+    print(f"{'modo':>6} {'intervalo':>9} {'sem ms':>7} {'com ms':>7} {'custo':>6} {'na amostra':>10} {'amostras':>8}")
+    overheads, shares_in_sampler, profiles = {}, {}, {}
+    for mode in PROFILER_MODES:
+        for interval in args.intervals:
+            sampler = SamplingProfiler(lambda: "playing:level1", interval=interval, mode=mode)
+            without, with_profiler = [], []
+            for _ in range(args.rounds):
+                without.append(frames_ms())
+                sampler.start()
+                with_profiler.append(frames_ms())
+                sampler.stop()
+            base, profiled = statistics.median(without), statistics.median(with_profiler)
+            overheads[mode, interval] = (profiled - base) / base
+            shares_in_sampler[mode, interval] = sampler.stats()["sampling_share"]
+            profiles[mode, interval] = counts = sampler.take()
+            sampler.close()
+            print(f"{mode:>6} {interval * 1000:>7.0f}ms {base:>7.3f} {profiled:>7.3f} "
+                  f"{overheads[mode, interval] * 100:>5.1f}% {shares_in_sampler[mode, interval] * 100:>9.2f}% "
+                  f"{sum(counts.values()):>8}")
+    level.unload()
+    display.close()
+
+    default = profiler.PROFILER_INTERVAL_S
+    shares = {mode: inclusive_shares(profiles[mode, default])[0] for mode in PROFILER_MODES}
+    game_labels = sorted((label for label in shares["signal"] if not label.startswith(("benchmarks:", "<"))),
+                         key=lambda label: -shares["signal"][label])
+    print(f"funções com mais amostras (inclusivo, intervalo {default * 1000:.0f}ms):")
+    print(f"  {'signal':>6} {'thread':>6}  função")
+    for label in game_labels[:args.top]:
+        print(f"  {shares['signal'][label] * 100:5.1f}% {shares['thread'].get(label, 0.0) * 100:5.1f}%  {label}")
+    with tempfile.TemporaryDirectory() as directory:
+        paths = profiler.write(profiles["signal", default], default, directory)
+        print("arquivos: " + ", ".join(f"{os.path.basename(path)} ({os.path.getsize(path)} bytes)" for path in paths))
+
+    expected = ("level:Level._draw_elements", "enemy:EnemyPool.update", "entity_mediator:EntityMediator.check_all_collisions")
+    lines = profiler.collapsed(profiles["signal", default])
+    checks = {
+        "etiqueta do estado nas pilhas": all(line.startswith("playing:level1;") for line in lines),
+        "funções quentes encontradas": all(label in shares["signal"] for label in expected),
+        f"custo até {args.max_overhead:.0%} no intervalo padrão": shares_in_sampler["signal", default] <= args.max_overhead,
+    }
+    for label, ok in checks.items():
+        print(f"{label}: {'OK' if ok else 'FALHOU'}")
+    return 0 if all(checks.values()) else 1
+
+
+def bench_animation(args):
+    """Relógio de animação compartilhado: frame certo em qualquer taxa de frames e custo por entidade constante."""
+    import math
+    import random
+    import pygame
+    from . import const
+    from .animation import AnimationClock
+    from .enemy import Enemy1, Enemy2, Enemy3, EnemyPool
+
+    def timer_reset_steps(deltas, period):
+        # O esquema antigo: temporizador por entidade zerado a cada troca de frame (perde o excesso)
+        timer, steps = 0.0, 0
+        for delta in deltas:
+            timer += delta
+            if timer >= period:
+                timer = 0.0
+                steps += 1
+        return steps
+
+    rng = random.Random(0)
+    period = const.ENEMY1_ANIMATION_SPEED
+    cases = [(f"{fps} fps", [1.0 / fps] * int(args.seconds * fps)) for fps in args.rates]
+    cases.append(("irregular", [rng.uniform(0.004, 0.034) for _ in range(int(args.seconds * 60))]))
+    print(f"período {period * 1000:.0f} ms, {args.seconds:.0f} s de jogo")
+    print(f"{'taxa':>10} {'esperado':>8} {'relógio':>8} {'erro máx':>8} {'temporizador':>12} {'deriva':>7}")
+    worst = 0
+    for label, deltas in cases:
+        clock = AnimationClock()
+        animation = clock.animation("enemy1walk", period)
+        elapsed, max_error = 0.0, 0
+        for delta in deltas:
+            clock.advance(delta)
+            elapsed += delta
+            max_error = max(max_error, abs(animation.step - math.floor(elapsed / period + 1e-9)))
+        expected = math.floor(math.fsum(deltas) / period + 1e-9)
+        old_steps = timer_reset_steps(deltas, period)
+        worst = max(worst, max_error)
+        print(f"{label:>10} {expected:>8} {animation.step:>8} {max_error:>8} {old_steps:>12} "
+              f"{(old_steps - expected) / expected * 100:>6.1f}%")
+
+    pygame.display.init()
+    pygame.display.set_mode((1, 1))
+    classes = [Enemy1, Enemy2, Enemy3]
+    for count in args.counts:
+        clock = AnimationClock()
+        pool = EnemyPool(clock)
+        pool.add(*[classes[i % 3]((700 + i, 340)) for i in range(count)])
+        start = time.perf_counter()
+        for _ in range(args.frames):
+            clock.advance(1.0 / 60)
+        advance_us = (time.perf_counter() - start) * 1e6 / args.frames
+        start = time.perf_counter()
+        for _ in range(args.frames):
+            pool.update(1.0 / 60, 0, 0)
+            pool.blit_list(0)
+        per_enemy_us = (time.perf_counter() - start) * 1e6 / args.frames / count
+        print(f"{count:>5} inimigos: relógio {advance_us:.2f} us por frame, update + frames {per_enemy_us:.3f} us por inimigo")
+
+    # Erro de um passo só quando o tempo cai exatamente na borda de um frame (arredondamento da soma)
+    print(f"frame exato em todas as taxas: {'OK' if worst <= 1 else 'FALHOU'}")
+    return 0 if worst <= 1 else 1
+
+
+def bench_hitch(args):
+    """Detector de travadas: acha as travadas injetadas, com a pilha no meio do frame, num log de tamanho fixo."""
+    import gc
+    import json
+    import tempfile
+    import pygame
+    from . import const, display
+    from .hitch import HitchDetector, HitchLog, read_log
+
+    def _injected_stall():
+        # Travada sintética: lixo com ciclos para o GC, um JSON grande gravado e a thread dormindo
+        garbage = [[index] for index in range(50000)]
+        for item in garbage:
+            item.append(item)
+        del garbage
+        gc.collect()
+        json.dumps([list(range(100))] * 2000)
+        time.sleep(args.stall_ms / 1000.0)
+
+    pygame.font.init()
+    screen = display.init()
+    level = _make_level(screen, level_num=1)
+    level.player.lives = 10 ** 6
+    directory = tempfile.mkdtemp()
+    path = os.path.join(directory, "hitches.log")
+    budget_ms = 1000.0 / const.FPS
+
+    detector = HitchDetector(path, args.threshold, budget_ms, slots=args.slots,
+                             context=lambda: {"state": "playing:level1", "enemies": len(level.enemies)})
+    level.hitch_detector = detector
+    injected = detected = 0
+    frame_due = time.perf_counter()
+    for frame in range(args.frames):
+        # Espera até o próximo frame como o FramePacer faria, para "wait" não contar como travada
+        frame_due += budget_ms / 1000.0
+        time.sleep(max(0.0, frame_due - time.perf_counter()))
+        detector.begin_frame()
+        level.frame(1.0 / const.FPS)
+        if frame % 10 == 0:
+            level._spawn_enemy()
+            level.player.shoot()
+        hitches = detector.hitches
+        stalled = frame % args.every == args.every - 1
+        if stalled:
+            _injected_stall()
+            injected += 1
+            detector.mark("stall")
+        detector.end_frame()
+        detected += stalled and detector.hitches > hitches
+        frame_due = max(frame_due, time.perf_counter())
+    detector.close()
+    level.unload()
+    display.close()
+    hitches = detector.hitches
+
+    records = read_log(path)
+    stalls = [record for record in records if "stall" in record["phases_ms"]]
+    with_stack = [record for record in stalls if record["stack"] and any("_injected_stall" in line for line in record["stack"])]
+    with_gc = [record for record in stalls if record["gc"]["collections"][2] >= 1]
+    print(f"{args.frames} frames, {injected} travadas injetadas de ~{args.stall_ms:.0f} ms, "
+          f"limite {args.threshold * budget_ms:.1f} ms")
+    print(f"detectadas: {detected} injetadas, {hitches} no total (pior {detector.worst_ms:.1f} ms), no log: {len(records)} "
+          f"de {args.slots} posições, arquivo {os.path.getsize(path)} bytes")
+    if records:
+        last = records[-1]
+        print(f"última: #{last['seq']} {last['frame_ms']:.1f} ms, fases {last['phases_ms']}, gc {last['gc']}, "
+              f"pilha amostrada em {last['stack_at_ms']} ms: ... {' <- '.join(reversed((last['stack'] or [])[-3:]))}")
+
+    # Custo das chamadas do detector num frame sem travada (begin, 3 marcas, end)
+    detector = HitchDetector(path, slots=args.slots)
+    start = time.perf_counter()
+    for _ in range(args.overhead_frames):
+        detector.begin_frame()
+        detector.mark("simulate")
+        detector.mark("draw")
+        detector.mark("present")
+        detector.end_frame()
+    overhead_us = (time.perf_counter() - start) * 1e6 / args.overhead_frames
+    detector.close()
+    reopened = HitchLog(path, slots=args.slots)
+    next_seq = reopened.next_seq
+    reopened.close()
+    print(f"custo por frame: {overhead_us:.2f} us ({overhead_us / 10 / budget_ms:.3f}% do orçamento)")
+
+    checks = {
+        "todas as travadas injetadas detectadas": detected == injected,
+        "pilha aponta a função que travou": len(with_stack) == len(stalls),
+        "coleta do GC registrada": len(with_gc) == len(stalls),
+        "log em anel com as últimas travadas": [record["seq"] for record in records]
+        == list(range(max(0, hitches - args.slots), hitches))
+        and os.path.getsize(path) <= args.slots * const.HITCH_LOG_SLOT_BYTES,
+        "sequência continua ao reabrir": next_seq == hitches,
+        f"custo até {args.max_overhead_us:.0f} us por frame": overhead_us <= args.max_overhead_us,
+    }
+    os.remove(path)
+    os.rmdir(directory)
+    for label, ok in checks.items():
+        print(f"{label}: {'OK' if ok else 'FALHOU'}")
+    return 0 if all(checks.values()) else 1
+
+
+def bench_bgtiles(args):
+    """Fundos em blocos: memória limitada qualquer que seja a largura do nível e nenhuma carga no meio do frame."""
+    import shutil
+    import statistics
+    import tempfile
+    import numpy as np
+    import pygame
+    from . import assets, const, display, surface_memory
+    from .tiled_background import cut
+
+    pygame.font.init()
+    screen = display.init()
+    screen_width, screen_height = screen.get_size()
+    budget = 1.0 / const.FPS
+    asset_dir = assets.ASSET_DIR
+    bg_prefix, bg_count, bg_start_index, _ = const.LEVEL_DATA[1]
+    layer_names = [f"{bg_prefix}{i}" for i in range(bg_start_index, bg_start_index + bg_count)]
+
+    def wide_art(name, width):
+        # Arte sem repetição: a camada original lado a lado, espelhada e com a cor mudando a cada cópia
+        source = pygame.image.load(os.path.join(asset_dir, f"{name}.png")).convert_alpha()
+        art = pygame.Surface((width, source.get_height()), pygame.SRCALPHA)
+        for copy, x in enumerate(range(0, width, source.get_width())):
+            piece = pygame.transform.flip(source, copy % 2 == 1, False)
+            piece.fill((255 - 20 * (copy % 5), 255, 255 - 15 * (copy % 7), 255), special_flags=pygame.BLEND_RGBA_MULT)
+            art.blit(piece, (x, 0))
+        return art
+
+    def asset_copy(directory):
+        os.makedirs(directory)
+        for name in os.listdir(asset_dir):
+            if not name.startswith(bg_prefix):
+                os.symlink(os.path.join(asset_dir, name), os.path.join(directory, name))
+
+    def sweep(level_width):
+        """Câmera do começo ao fim do nível a `speed` px por frame, com a espera de um frame de 60 fps."""
+        start = time.perf_counter()
+        level = _make_level(screen, level_num=1)
+        load_ms = (time.perf_counter() - start) * 1000
+        loaded = surface_memory.current_bytes(surface_memory.CATEGORY_PARALLAX)
+        peak, times, frames = loaded, [], {}
+        samples = set(range(0, level_width - screen_width, (level_width - screen_width) // args.samples))
+        frame_due = time.perf_counter()
+        for camera in range(0, level_width - screen_width, args.speed):
+            frame_due += budget
+            time.sleep(max(0.0, frame_due - time.perf_counter()))
+            start = time.perf_counter()
+            level._draw_background(camera)
+            times.append((time.perf_counter() - start) * 1000)
+            frame_due = max(frame_due, time.perf_counter())
+            peak = max(peak, surface_memory.current_bytes(surface_memory.CATEGORY_PARALLAX))
+            if camera in samples:
+                frames[camera] = pygame.surfarray.array3d(screen).astype(np.int16)
+        stats = level.tile_streamer.stats() if level.tile_streamer is not None else {}
+        level.unload()
+        return load_ms, loaded, peak, times, frames, stats
+
+    root = tempfile.mkdtemp()
+    results = {}
+    try:
+        for level_width in args.widths:
+            source_width = level_width * 1080 // screen_height
+            whole_dir, tiled_dir = (os.path.join(root, f"{mode}{level_width}") for mode in ("whole", "tiled"))
+            asset_copy(whole_dir)
+            asset_copy(tiled_dir)
+            for name in layer_names:
+                art = wide_art(name, source_width)
+                pygame.image.save(art, os.path.join(whole_dir, f"{name}.png"))
+                cut(art, name, tiled_dir, args.tile_width)
+                del art
+            for mode, directory in (("whole", whole_dir), ("tiled", tiled_dir)):
+                assets.ASSET_DIR = directory
+                assets.use_loose_files()
+                results[level_width, mode] = sweep(level_width)
+                assets.ASSET_DIR = asset_dir
+            shutil.rmtree(whole_dir)
+            shutil.rmtree(tiled_dir)
+    finally:
+        assets.ASSET_DIR = asset_dir
+        assets.use_loose_files(False)
+        shutil.rmtree(root, ignore_errors=True)
+    display.close()
+
+    print(f"{len(layer_names)} camadas, blocos de {args.tile_width}px, câmera a {args.speed} px/frame")
+    print(f"{'largura':>8} {'modo':>6} {'carga ms':>8} {'MiB na carga':>12} {'MiB pico':>9} {'ms mediana':>10} {'ms p99':>7} "
+          f"{'ms máx':>7} {'faltas':>6} {'esperas':>7} {'diferença':>9}")
+    checks = {"nenhum bloco carregado no meio do frame": True, "tela igual à da camada inteira": True}
+    tiled_peaks = []
+    for level_width in args.widths:
+        whole_frames = results[level_width, "whole"][4]
+        for mode in ("whole", "tiled"):
+            load_ms, loaded, peak, times, frames, stats = results[level_width, mode]
+            times = sorted(times)
+            difference = max(float(np.abs(frames[camera] - whole_frames[camera]).mean()) for camera in frames)
+            print(f"{level_width:>8} {mode:>6} {load_ms:>8.0f} {loaded / 2 ** 20:>12.1f} {peak / 2 ** 20:>9.1f} "
+                  f"{statistics.median(times):>10.3f} {times[int(len(times) * 0.99)]:>7.3f} {times[-1]:>7.3f} "
+                  f"{stats.get('misses', '-'):>6} {stats.get('waits', '-'):>7} {difference:>9.3f}")
+            if mode == "tiled":
+                tiled_peaks.append(peak)
+                checks["nenhum bloco carregado no meio do frame"] &= stats["misses"] == 0
+                checks["tela igual à da camada inteira"] &= difference <= args.max_difference
+    # Memória dos blocos: a mesma para qualquer largura de nível
+    checks["memória dos blocos não cresce com o nível"] = max(tiled_peaks) <= min(tiled_peaks) * 1.1
+    for label, ok in checks.items():
+        print(f"{label}: {'OK' if ok else 'FALHOU'}")
+    return 0 if all(checks.values()) else 1
+
+
+_SHARED_ASSETS_CHILD = """
+import hashlib, json, sys
+import pygame
+from code import assets, const
+from code.benchmarks import _make_level, _pss_kib
+from code.endless_level import EndlessLevel
+from code.enemy import ENEMY_ARCHETYPES
+from code.enemyshot import EnemyShot
+from code.menu import Menu
+from code.player import Player
+from code.score import ScoreManager
+
+pygame.font.init()
+screen = pygame.display.set_mode((const.SCREEN_WIDTH, const.SCREEN_HEIGHT))
+pool = None
+if sys.argv[1]:
+    from code.shared_assets import SharedAssetPool
+    pool = SharedAssetPool(sys.argv[1])
+    assets.use_shared_pool(pool)
+base = _pss_kib()
+keep = [Menu(screen, font_name=f"{const.FONT_NAME}.ttf"), Player((0, 0)),
+        EndlessLevel(screen, const.PLAYER_LIVES_START, ScoreManager())]
+keep.extend(_make_level(screen, level_num) for level_num in const.LEVEL_DATA)
+keep.extend(assets.load_image(name, (const.SCREEN_WIDTH, const.SCREEN_HEIGHT))
+            for name in (const.GAME_OVER_WIN_IMAGE, const.GAME_OVER_LOSE_IMAGE))
+surfaces = [layer["image"] for level in keep[2:2 + 1 + len(const.LEVEL_DATA)] for layer in level.parallax_layers
+            if layer["image"] is not None]
+for archetype in ENEMY_ARCHETYPES.values():
+    archetype.load()
+    surfaces.extend(archetype.frames)
+    surfaces.append(EnemyShot._load_image(archetype.name)[0])
+surfaces.extend(keep[1].walk_frames + keep[1].jump_frames + [keep[1].idle_image, keep[0].menu_bg_image])
+digest = hashlib.sha1()
+for surface in surfaces:
+    digest.update(pygame.image.tobytes(surface, "RGBA" if surface.get_flags() & pygame.SRCALPHA else "RGB"))
+print(json.dumps({"base_kib": base, "images": len(surfaces), "digest": digest.hexdigest(),
+                  "stats": pool.stats() if pool else {}}), flush=True)
+sys.stdin.readline()
+if pool:
+    pool.close()
+"""
+
+
+def _pss_kib(pid="self"):
+    """Memória proporcional (PSS) do processo em KiB: páginas compartilhadas divididas entre quem as mapeia."""
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            if line.startswith("Pss:"):
+                return int(line.split()[1])
+    return 0
+
+
+def bench_sharedassets(args):
+    """Memória de assets somada de N instâncias simultâneas, com e sem o pool de memória compartilhada."""
+    import json
+    import subprocess
+    import tempfile
+
+    repo_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    pool_name = f"twb{os.getpid()}"
+
+    def run_seats(seats, pool):
+        children, reports = [], []
+        try:
+            for _ in range(seats):
+                # Um assento de cada vez, como um quiosque ligando as instâncias em sequência
+                child = subprocess.Popen([sys.executable, "-c", _SHARED_ASSETS_CHILD, pool], cwd=repo_root,
+                                         stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True)
+                children.append(child)
+                reports.append(json.loads(child.stdout.readline()))
+            # PSS de todos juntos: as páginas do pool contam uma fração para cada assento
+            asset_kib = [_pss_kib(child.pid) - report["base_kib"] for child, report in zip(children, reports)]
+            base_kib = [report["base_kib"] for report in reports]
+        finally:
+            for child in children:
+                child.stdin.close()
+                child.wait()
+        return sum(asset_kib), sum(base_kib), reports
+
+    single_kib, single_base, single = run_seats(1, "")
+    print(f"1 instância: assets {single_kib / 1024:.1f} MiB, resto do processo {single_base / 1024:.1f} MiB, "
+          f"{single[0]['images']} imagens")
+    print(f"{'assentos':>8} {'pool':>5} {'assets MiB':>10} {'x 1 inst.':>9} {'resto MiB':>9}")
+    results = {}
+    for pool in ("", pool_name):
+        asset_kib, base_kib, reports = run_seats(args.seats, pool)
+        results[pool] = (asset_kib, reports)
+        print(f"{args.seats:>8} {'sim' if pool else 'não':>5} {asset_kib / 1024:>10.1f} "
+              f"{asset_kib / single_kib:>8.2f}x {base_kib / 1024:>9.1f}")
+    shared_kib, shared_reports = results[pool_name]
+    stats = [report["stats"] for report in shared_reports]
+    print(f"pool: {stats[0]['published']} imagens publicadas pelo 1º assento, "
+          f"{sum(s['hits'] for s in stats[1:])} reaproveitadas pelos outros, "
+          f"{sum(s['published'] for s in stats[1:])} publicadas por eles")
+    leftovers = [name for name in os.listdir("/dev/shm") if name.startswith(pool_name)] \
+        if os.path.isdir("/dev/shm") else []
+    lock_path = os.path.join(tempfile.gettempdir(), f"{pool_name}.lock")
+    if os.path.exists(lock_path):
+        os.remove(lock_path)
+
+    checks = {
+        "mesmos pixels com e sem pool": len({report["digest"] for report in single + shared_reports}) == 1,
+        f"{args.seats} assentos perto de 1 instância": shared_kib <= args.max_ratio * single_kib,
+        "blocos apagados depois do último assento": not leftovers,
+    }
+    for label, ok in checks.items():
+        print(f"{label}: {'OK' if ok else 'FALHOU'}")
+    return 0 if all(checks.values()) else 1
+
+
+_STARTUP_CHILD = """
+import json, time
+from code import startup_trace
+with startup_trace.step("import pygame"):
+    import pygame
+with startup_trace.step("import code.game"):
+    from code.game import Game
+with startup_trace.step("Game.__init__"):
+    game = Game()
+game.menu.draw()
+startup_trace.mark_first_frame()
+trace = startup_trace.as_dict()
+trace["first_frame_wall"] = time.time()
+print(json.dumps(trace))
+"""
+
+
+def bench_startup(args):
+    """Tempo do lançamento do processo até o primeiro frame do menu; falha (código 1) se passar do orçamento."""
+    import json
+    import statistics
+    import subprocess
+
+    repo_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    results = []
+    for _ in range(args.runs):
+        launched = time.time()
+        output = subprocess.run([sys.executable, "-c", _STARTUP_CHILD], cwd=repo_root, check=True,
+                                capture_output=True, text=True).stdout
+        trace = json.loads(output.strip().splitlines()[-1])
+        results.append(((trace["first_frame_wall"] - launched) * 1000.0, trace))
+
+    for step in results[-1][1]["steps"]:
+        print(f"  {step['start'] * 1000:8.1f} +{step['duration'] * 1000:7.1f}  {'  ' * step['depth']}{step['label']}")
+    median_ms = statistics.median(ms for ms, _ in results)
+    ok = median_ms <= args.budget_ms
+    print(f"Lançamento até o primeiro frame: mediana {median_ms:.1f} ms em {args.runs} execuções "
+          f"(orçamento {args.budget_ms:.0f} ms) {'OK' if ok else 'ACIMA'}")
+    return 0 if ok else 1
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m code.benchmarks")
+    sub = parser.add_subparsers(dest="name", required=True)
+
+    p = sub.add_parser("vecenv", help=bench_vecenv.__doc__)
+    p.add_argument("--envs-per-worker", type=int, default=4)
+    p.add_argument("--max-workers", type=int, default=None)
+    p.add_argument("--steps", type=int, default=2000)
+    p.add_argument("--warmup", type=int, default=100)
+    p.set_defaults(func=bench_vecenv)
+
+    p = sub.add_parser("present", help=bench_present.__doc__)
+    p.add_argument("--window", type=lambda t: tuple(int(v) for v in t.split("x")), default=(1920, 1080))
+    p.add_argument("--frames", type=int, default=200)
+    p.add_argument("--warmup", type=int, default=30)
+    p.add_argument("--software-renderer", action="store_true", help="usa o renderer de software do SDL no backend sdl2")
+    p.set_defaults(func=bench_present)
+
+    p = sub.add_parser("enemies", help=bench_enemies.__doc__)
+    p.add_argument("--count", type=int, default=1000)
+    p.add_argument("--frames", type=int, default=200)
+    p.set_defaults(func=bench_enemies)
+
+    p = sub.add_parser("collisions", help=bench_collisions.__doc__)
+    p.add_argument("--enemies", type=int, default=10)
+    p.add_argument("--shots", type=int, default=10)
+    p.add_argument("--frames", type=int, default=500)
+    p.set_defaults(func=bench_collisions)
+
+    p = sub.add_parser("startup", help=bench_startup.__doc__)
+    p.add_argument("--runs", type=int, default=5)
+    p.add_argument("--budget-ms", type=float, default=1000.0)
+    p.set_defaults(func=bench_startup)
+
+    p = sub.add_parser("pipeline", help=bench_pipeline.__doc__)
+    p.add_argument("--window", type=lambda t: tuple(int(v) for v in t.split("x")), default=(1920, 1080))
+    p.add_argument("--enemies", type=int, default=8)
+    p.add_argument("--frames", type=int, default=300)
+    p.add_argument("--warmup", type=int, default=30)
+    p.set_defaults(func=bench_pipeline)
+
+    p = sub.add_parser("latency", help=bench_latency.__doc__)
+    p.add_argument("--enemies", type=int, default=8)
+    p.add_argument("--frames", type=int, default=300)
+    p.add_argument("--key-every", type=int, default=7, help="injeta uma tecla a cada N frames")
+    p.set_defaults(func=bench_latency)
+
+    p = sub.add_parser("soak", help=bench_soak.__doc__)
+    p.add_argument("--cycles", type=int, default=100)
+    p.add_argument("--frames", type=int, default=60, help="frames jogados por ciclo")
+    p.add_argument("--enemies", type=int, default=8)
+    p.add_argument("--warmup", type=int, default=10, help="ciclos antes da referência de memória")
+    p.add_argument("--tolerance-mib", type=float, default=8.0)
+    p.set_defaults(func=bench_soak)
+
+    p = sub.add_parser("snapshot", help=bench_snapshot.__doc__)
+    p.add_argument("--enemies", type=int, default=12)
+    p.add_argument("--warmup", type=int, default=120, help="frames jogados antes do snapshot")
+    p.add_argument("--frames", type=int, default=600, help="frames reproduzidos no teste de determinismo")
+    p.add_argument("--repeat", type=int, default=2000)
+    p.add_argument("--budget-us", type=float, default=1000.0)
+    p.set_defaults(func=bench_snapshot)
+
+    p = sub.add_parser("endless", help=bench_endless.__doc__)
+    p.add_argument("--minutes", type=float, default=120.0, help="tempo de jogo simulado")
+    p.add_argument("--window-minutes", type=float, default=10.0, help="tamanho de cada janela medida")
+    p.add_argument("--draw-every", type=int, default=30, help="desenha um a cada N frames simulados")
+    p.add_argument("--tolerance-mib", type=float, default=8.0)
+    p.add_argument("--cost-tolerance", type=float, default=1.5, help="razão máxima do custo da última janela")
+    p.add_argument("--pipelined-frames", type=int, default=700, help="frames do teste serial x pipelined")
+    p.add_argument("--pipelined-speed", type=int, default=30, help="px por frame do jogador nesse teste")
+    p.set_defaults(func=bench_endless)
+
+    p = sub.add_parser("blitformats", help=bench_blitformats.__doc__)
+    p.add_argument("--blits", type=int, default=300)
+    p.add_argument("--edge-tolerance", type=float, default=0.0,
+                   help="fração de pixels semi-transparentes tolerada como alfa binário (ver const)")
+    p.set_defaults(func=bench_blitformats)
+
+    p = sub.add_parser("assetload", help=bench_assetload.__doc__)
+    p.add_argument("--runs", type=int, default=5)
+    p.add_argument("--rebuild", action="store_true", help="regera o assets.pak antes de medir")
+    p.set_defaults(func=bench_assetload)
+
+    p = sub.add_parser("quality", help=bench_quality.__doc__)
+    p.add_argument("--window", type=lambda text: tuple(int(v) for v in text.lower().split("x")),
+                   default=(1920, 1080), help="tamanho da janela, ex: 1920x1080")
+    p.add_argument("--level", type=int, default=1)
+    p.add_argument("--enemies", type=int, default=20)
+    p.add_argument("--shots", type=int, default=20)
+    p.add_argument("--frames", type=int, default=200)
+    p.add_argument("--edge-frames", type=int, default=20000, help="frames do traço perto do limiar")
+    p.set_defaults(func=bench_quality)
+
+    p = sub.add_parser("asyncloop", help=bench_asyncloop.__doc__)
+    p.add_argument("--frames", type=int, default=900)
+    p.add_argument("--job-every", type=int, default=30, help="frames entre cada lote de trabalhos de fundo")
+    p.set_defaults(func=bench_asyncloop)
+
+    p = sub.add_parser("background", help=bench_background.__doc__)
+    p.add_argument("--seconds", type=float, default=3.0, help="duração de cada fase")
+    p.add_argument("--typed-events", type=int, default=5000,
+                   help="KEYDOWN/KEYUP/MOUSEMOTION postados enquanto a janela está sem foco")
+    p.set_defaults(func=bench_background)
+
+    p = sub.add_parser("profiler", help=bench_profiler.__doc__)
+    p.add_argument("--frames", type=int, default=300)
+    p.add_argument("--rounds", type=int, default=7)
+    p.add_argument("--intervals", type=float, nargs="+", default=[0.002, 0.01], help="segundos entre amostras")
+    p.add_argument("--top", type=int, default=12)
+    p.add_argument("--max-overhead", type=float, default=0.03)
+    p.set_defaults(func=bench_profiler)
+
+    p = sub.add_parser("animation", help=bench_animation.__doc__)
+    p.add_argument("--seconds", type=float, default=60.0)
+    p.add_argument("--rates", type=int, nargs="+", default=[30, 60, 144, 240])
+    p.add_argument("--counts", type=int, nargs="+", default=[10, 100, 1000])
+    p.add_argument("--frames", type=int, default=600)
+    p.set_defaults(func=bench_animation)
+
+    p = sub.add_parser("sharedassets", help=bench_sharedassets.__doc__)
+    p.add_argument("--seats", type=int, default=8)
+    p.add_argument("--max-ratio", type=float, default=1.5, help="memória de assets dos N assentos / de 1 instância")
+    p.set_defaults(func=bench_sharedassets)
+
+    p = sub.add_parser("hitch", help=bench_hitch.__doc__)
+    p.add_argument("--frames", type=int, default=600)
+    p.add_argument("--every", type=int, default=40, help="injeta uma travada a cada N frames")
+    p.add_argument("--stall-ms", type=float, default=60.0, help="sono dentro da travada injetada")
+    p.add_argument("--threshold", type=float, default=2.0)
+    p.add_argument("--slots", type=int, default=8, help="posições do log em anel (menor que as travadas, para dar a volta)")
+    p.add_argument("--overhead-frames", type=int, default=100000)
+    p.add_argument("--max-overhead-us", type=float, default=20.0)
+    p.set_defaults(func=bench_hitch)
+
+    p = sub.add_parser("bgtiles", help=bench_bgtiles.__doc__)
+    p.add_argument("--widths", type=int, nargs="+", default=[5500, 16500], help="larguras de nível (px de tela)")
+    p.add_argument("--tile-width", type=int, default=576, help="largura dos blocos na arte original")
+    p.add_argument("--speed", type=int, default=30, help="px de câmera por frame")
+    p.add_argument("--samples", type=int, default=8, help="frames comparados com a camada inteira")
+    p.add_argument("--max-difference", type=float, default=0.5,
+                   help="diferença média por canal (0-255); só é zero com blocos que caem em pixels inteiros")
+    p.set_defaults(func=bench_bgtiles)
+
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,133 @@
+import json
+import multiprocessing as mp
+import os
+import queue
+from multiprocessing import shared_memory
+
+import numpy as np
+import pygame
+
+from . import const, instrumentation
+
+CAPTURE_FORMAT_PNG = const.CAPTURE_FORMAT_PNG
+CAPTURE_FORMAT_RAW = const.CAPTURE_FORMAT_RAW
+CAPTURE_RING_FRAMES = 90
+
+
+def _writer_main(shm_name, ring_shape, channel_order, output_path, fmt, ready_queue, free_queue, stats):
+    """Processo escritor: codifica os slots prontos do anel e devolve cada slot assim que o copia."""
+    shm = shared_memory.SharedMemory(name=shm_name)
+    ring = np.ndarray(ring_shape, dtype=np.uint8, buffer=shm.buf)
+    _, height, row_bytes = ring_shape
+    width = row_bytes // 4
+    raw_file = open(output_path, "wb") if fmt == CAPTURE_FORMAT_RAW else None
+    try:
+        while True:
+            item = ready_queue.get()
+            if item is None:
+                break
+            slot, frame_number = item
+            rgb = ring[slot].reshape(height, width, 4)[:, :, channel_order]
+            free_queue.put(slot)
+            if raw_file:
+                raw_file.write(rgb.tobytes())
+            else:
+                image = pygame.image.frombuffer(rgb.tobytes(), (width, height), "RGB")
+                pygame.image.save(image, os.path.join(output_path, f"frame_{frame_number:06d}.png"))
+            stats[0] += 1
+    finally:
+        if raw_file:
+            raw_file.close()
+        del ring
+        shm.close()
+
+
+class FrameRecorder:
+    """
+    Grava os frames apresentados sem travar o loop do jogo.
+    O jogo só copia o buffer de pixels da tela para um slot livre de um anel pré-alocado em memória
+    compartilhada; um processo escritor codifica os slots prontos em PNGs numerados ou num arquivo
+    RGB24 bruto. Se o escritor ficar para trás e não houver slot livre, o frame é descartado e contado.
+    """
+
+    def __init__(self, output_path, size, fmt=CAPTURE_FORMAT_PNG, capacity=CAPTURE_RING_FRAMES, fps=const.FPS):
+        if fmt not in (CAPTURE_FORMAT_PNG, CAPTURE_FORMAT_RAW):
+            raise ValueError(f"Formato de captura desconhecido: '{fmt}'.")
+        self.output_path = output_path
+        self.width, self.height = size
+        self.fmt = fmt
+        self.fps = fps
+        self.captured = 0
+        self.dropped = 0
+
+        if fmt == CAPTURE_FORMAT_PNG:
+            os.makedirs(output_path, exist_ok=True)
+        else:
+            os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+
+        self._ring_shape = (capacity, self.height, self.width * 4)
+        self._shm = shared_memory.SharedMemory(create=True, size=int(np.prod(self._ring_shape)))
+        self._ring = np.ndarray(self._ring_shape, dtype=np.uint8, buffer=self._shm.buf)
+
+        ctx = mp.get_context("spawn")
+        self._ready = ctx.Queue()
+        self._free = ctx.Queue()
+        for slot in range(capacity):
+            self._free.put(slot)
+        self._written = ctx.Array("q", 1, lock=False)
+        self._writer = None
+        self._ctx = ctx
+        self._closed = False
+        instrumentation.register_provider("capture", self.stats)
+
+    @property
+    def written(self):
+        return self._written[0]
+
+    def _start_writer(self, surface):
+        if surface.get_bytesize() != 4:
+            raise ValueError("FrameRecorder só suporta superfícies de 32 bits.")
+        r_shift, g_shift, b_shift, _ = surface.get_shifts()
+        channel_order = [r_shift // 8, g_shift // 8, b_shift // 8]
+        self._writer = self._ctx.Process(
+            target=_writer_main, name="FrameRecorder", daemon=True,
+            args=(self._shm.name, self._ring_shape, channel_order, self.output_path, self.fmt,
+                  self._ready, self._free, self._written))
+        self._writer.start()
+
+    def capture(self, surface):
+        """Copia o frame atual para o anel. Nunca bloqueia: sem slot livre, o frame é descartado."""
+        if self._closed:
+            return
+        if self._writer is None:
+            self._start_writer(surface)
+        try:
+            slot = self._free.get_nowait()
+        except queue.Empty:
+            self.dropped += 1
+            return
+        pixels = np.frombuffer(surface.get_buffer(), dtype=np.uint8).reshape(self.height, surface.get_pitch())
+        np.copyto(self._ring[slot], pixels[:, :self.width * 4])
+        del pixels
+        self.captured += 1
+        self._ready.put((slot, self.captured))
+
+    def stats(self):
+        return {"captured": self.captured, "dropped": self.dropped, "written": self.written}
+
+    def close(self):
+        """Espera o escritor terminar os frames pendentes e libera a memória compartilhada."""
+        if self._closed:
+            return
+        self._closed = True
+        if self._writer is not None:
+            self._ready.put(None)
+            self._writer.join()
+        instrumentation.unregister_provider("capture")
+        del self._ring
+        self._shm.close()
+        self._shm.unlink()
+        if self.fmt == CAPTURE_FORMAT_RAW:
+            with open(self.output_path + ".json", "w") as f:
+                json.dump({"width": self.width, "height": self.height, "fps": self.fps,
+                           "pix_fmt": "rgb24", "frames": self.written, "dropped": self.dropped}, f, indent=4)
@@ -24,6 +24,8 @@ JUMP_STRENGTH = 600
 GRAVITY = 1500
 PLAYER_GROUND_Y = PLAYER_START_Y
 JUMP_ANIMATION_SPEED = 0.08
+WALK_ANIMATION_SPEED = 0.1
+PLAYER_SHOT_ANIMATION_SPEED = 0.05
 
 ENEMY_WIDTH = 80
 ENEMY_HEIGHT = 80
@@ -65,6 +67,59 @@ LVL3_BG_PREFIX = 'lvl3bg'
 LVL3_BG_COUNT = 5
 LVL3_BG_START_INDEX = 1
 
+LEVEL_DATA = {
+    1: (LVL1_BG_PREFIX, LVL1_BG_COUNT, LVL1_BG_START_INDEX, LEVEL1_WIDTH),
+    2: (LVL2_BG_PREFIX, LVL2_BG_COUNT, LVL2_BG_START_INDEX, LEVEL2_WIDTH),
+    3: (LVL3_BG_PREFIX, LVL3_BG_COUNT, LVL3_BG_START_INDEX, LEVEL3_WIDTH),
+}
+
+# Modo infinito: fundo do nível 1, inimigos por distância percorrida e coordenadas rebaseadas
+ENDLESS_BG_LEVEL = 1
+ENDLESS_REBASE_DISTANCE = 8192
+ENDLESS_RETIRE_MARGIN = 200
+ENDLESS_MAX_ENEMIES = 12
+ENDLESS_DIFFICULTY_DISTANCE = 20000
+ENDLESS_SPAWN_GAP_START = 600
+ENDLESS_SPAWN_GAP_MIN = 160
+ENDLESS_SPAWN_WAIT_START = 2.5
+ENDLESS_SPAWN_WAIT_MIN = 0.6
+
+# Arquivo único com todos os assets (gerado por `python -m code.asset_pack`); sem ele, lê asset/ solto
+ASSET_ARCHIVE_NAME = 'assets.pak'
+
+# Fração de pixels semi-transparentes (bordas suavizadas) que ainda deixa uma imagem ser tratada como de
+# alfa binário (colorkey). 0 = só imagens realmente binárias; valores maiores trocam bordas suaves por velocidade.
+ASSET_ALPHA_EDGE_TOLERANCE = 0.0
+
+# Log de métricas (--metrics-log): um snapshot da instrumentação a cada intervalo (s), gravado em lotes
+METRICS_LOG_INTERVAL = 1.0
+METRICS_LOG_BATCH = 10
+
+# Com a janela sem foco ou minimizada: espera máxima por eventos em cada frame de segundo plano (ms)
+BACKGROUND_EVENT_WAIT_MS = 250
+# Máximo de KEYUPs guardados em segundo plano (um por tecla) para devolver à fila ao voltar
+BACKGROUND_DEFERRED_KEYUPS_MAX = 32
+
+# Profiler por amostragem (--profile / F9): pasta padrão e intervalo entre arquivos gravados com ele ligado (s)
+PROFILE_DIR = 'profiles'
+PROFILE_FLUSH_INTERVAL = 300.0
+
+# Pool de assets em memória compartilhada (--shared-assets): nome padrão, o mesmo para todos os assentos da máquina
+SHARED_ASSET_POOL = 'twho'
+
+# Travada (--hitch-log): frame mais longo que HITCH_THRESHOLD vezes o orçamento (1/FPS); o log em anel guarda as últimas
+# HITCH_LOG_SLOTS, uma por linha de tamanho fixo
+HITCH_THRESHOLD = 2.0
+HITCH_LOG_SLOTS = 256
+HITCH_LOG_SLOT_BYTES = 4096
+
+# Fundos em blocos (code/tiled_background.py): largura dos blocos na arte original (px) e quantos blocos
+# à frente, no sentido da rolagem, são decodificados antes de entrar na tela. 576 = 64 x 9: com a arte em
+# 1080 px de altura escalada para 480 (4/9), cada bloco começa num pixel inteiro e a tela fica idêntica à da
+# camada inteira
+BG_TILE_WIDTH = 576
+BG_TILE_PREFETCH = 1
+
 FONT_NAME = 'OldLondon'
 MENU_FONT_SIZE = 40
 MENU_ITEM_COLOR = WHITE_COLOR
@@ -79,13 +134,16 @@ CONTROLS_MOVE_KEY = "controls_move"
 CONTROLS_JUMP_KEY = "controls_jump"
 CONTROLS_ATTACK_KEY = "controls_attack"
 
-GAME_OVER_WIN_IMAGE = 'asset/scorebg.png'
-GAME_OVER_LOSE_IMAGE = 'asset/dead.PNG'
+GAME_OVER_WIN_IMAGE = 'scorebg.png'
+GAME_OVER_LOSE_IMAGE = 'dead.png'
 WIN_TEXT_PT = "Você venceu os tiranos"
 WIN_TEXT_EN = "You defeated the tyrants"
 GAME_OVER_TEXT_PT = "VOCÊ MORREU"
 GAME_OVER_TEXT_EN = "YOU DIED"
 
+CAPTURE_FORMAT_PNG = "png"
+CAPTURE_FORMAT_RAW = "raw"
+
 GAME_STATE_MENU = "menu"
 GAME_STATE_PLAYING = "playing"
 GAME_STATE_GAME_OVER_WIN = "win"
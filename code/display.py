@@ -0,0 +1,257 @@
+import os
+import weakref
+
+import pygame
+
+from . import const
+
+SCALE_NEAREST = "nearest"
+SCALE_SDL = "scaled"
+SCALE_SMOOTH = "smooth"
+SCALE_MODES = (SCALE_NEAREST, SCALE_SDL, SCALE_SMOOTH)
+
+BACKEND_SURFACE = "surface"
+BACKEND_SDL2 = "sdl2"
+BACKENDS = (BACKEND_SURFACE, BACKEND_SDL2)
+
+_present_hooks = []
+_active_display = None
+
+
+class Display:
+    """
+    Separa a resolução lógica do jogo (const.SCREEN_WIDTH x SCREEN_HEIGHT) da janela real.
+    Todo o jogo desenha em `surface`, de tamanho fixo; `present()` amplia esse alvo para a janela
+    uma única vez por frame, centralizado e com barras pretas quando a proporção não bate.
+
+    Modos de ampliação:
+      - SCALE_NEAREST: vizinho mais próximo com fator inteiro (pixels nítidos, o mais barato em CPU);
+      - SCALE_SDL: deixa a ampliação para o SDL (pygame.SCALED), sem cópia extra no Python;
+      - SCALE_SMOOTH: smoothscale preenchendo o máximo da janela.
+    """
+
+    def __init__(self, window_size=None, fullscreen=False, scale_mode=SCALE_NEAREST,
+                 logical_size=(const.SCREEN_WIDTH, const.SCREEN_HEIGHT)):
+        if scale_mode not in SCALE_MODES:
+            raise ValueError(f"Modo de escala desconhecido: '{scale_mode}'.")
+        self.logical_size = logical_size
+        self.scale_mode = scale_mode
+
+        if scale_mode == SCALE_SDL:
+            flags = pygame.SCALED | (pygame.FULLSCREEN if fullscreen else 0)
+            try:
+                self.window = pygame.display.set_mode(logical_size, flags)
+            except pygame.error as e:
+                print(f"pygame.SCALED indisponível ({e}), usando '{SCALE_NEAREST}'")
+                self.scale_mode = scale_mode = SCALE_NEAREST
+        if scale_mode != SCALE_SDL:
+            if fullscreen:
+                size, flags = window_size or (0, 0), pygame.FULLSCREEN
+            else:
+                size, flags = window_size or logical_size, 0
+            self.window = pygame.display.set_mode(size, flags)
+
+        if self.window.get_size() == tuple(logical_size):
+            self.surface = self.window
+        else:
+            self.surface = pygame.Surface(logical_size).convert(self.window)
+        self._update_viewport()
+
+    def _update_viewport(self):
+        window_w, window_h = self.window.get_size()
+        logical_w, logical_h = self.logical_size
+        if self.surface is self.window:
+            self.viewport = self.window.get_rect()
+            self._target = None
+            return
+        if self.scale_mode == SCALE_NEAREST:
+            factor = max(1, min(window_w // logical_w, window_h // logical_h))
+            size = (logical_w * factor, logical_h * factor)
+        else:
+            factor = min(window_w / logical_w, window_h / logical_h)
+            size = (int(logical_w * factor), int(logical_h * factor))
+        self.viewport = pygame.Rect((0, 0), size)
+        self.viewport.center = self.window.get_rect().center
+        self.viewport = self.viewport.clip(self.window.get_rect())
+        self.window.fill(const.BLACK_COLOR)
+        self._target = self.window.subsurface(self.viewport)
+
+    def present(self):
+        """Amplia o alvo lógico para a janela (se preciso) e faz o flip."""
+        if self._target is not None:
+            if self.scale_mode == SCALE_SMOOTH:
+                pygame.transform.smoothscale(self.surface, self.viewport.size, self._target)
+            else:
+                pygame.transform.scale(self.surface, self.viewport.size, self._target)
+        pygame.display.flip()
+
+    def to_logical(self, pos):
+        """Converte uma posição em pixels da janela (ex: event.pos) para coordenadas lógicas."""
+        if self._target is None:
+            return pos
+        x = (pos[0] - self.viewport.x) * self.logical_size[0] / self.viewport.width
+        y = (pos[1] - self.viewport.y) * self.logical_size[1] / self.viewport.height
+        return int(x), int(y)
+
+    def close(self):
+        """Nada a liberar: a janela e as superfícies são do pygame e fecham com `pygame.quit()`."""
+
+
+class TextureCanvas:
+    """
+    Alvo de desenho do backend SDL2 com a mesma interface de Surface que o jogo usa
+    (blit, blits, fill, get_size...). Cada Surface desenhada é enviada uma única vez como
+    Texture e reaproveitada enquanto a Surface existir; o desenho em si acontece na GPU
+    (ou no renderer de software do SDL).
+    """
+
+    def __init__(self, renderer, size):
+        self.renderer = renderer
+        self._size = tuple(size)
+        self._textures = weakref.WeakKeyDictionary()
+
+    def get_size(self):
+        return self._size
+
+    def get_width(self):
+        return self._size[0]
+
+    def get_height(self):
+        return self._size[1]
+
+    def get_rect(self, **kwargs):
+        rect = pygame.Rect((0, 0), self._size)
+        for name, value in kwargs.items():
+            setattr(rect, name, value)
+        return rect
+
+    def texture_for(self, surface):
+        """Retorna a Texture da Surface, criando-a no primeiro uso."""
+        from pygame._sdl2.video import Texture
+
+        texture = self._textures.get(surface)
+        if texture is None:
+            texture = self._textures[surface] = Texture.from_surface(self.renderer, surface)
+        return texture
+
+    def fill(self, color, rect=None):
+        self.renderer.draw_color = pygame.Color(color)
+        if rect is None:
+            self.renderer.clear()
+        else:
+            self.renderer.fill_rect(rect)
+
+    def blit(self, source, dest, area=None):
+        texture = self.texture_for(source)
+        if isinstance(dest, pygame.Rect):
+            dest = dest.topleft
+        if area is None:
+            texture.draw(dstrect=dest)
+        else:
+            area = pygame.Rect(area)
+            texture.draw(srcrect=area, dstrect=(dest[0], dest[1], area.width, area.height))
+
+    def blits(self, blit_sequence, doreturn=True):
+        for item in blit_sequence:
+            self.blit(*item)
+        return [] if doreturn else None
+
+    def to_surface(self):
+        """Lê de volta os pixels do frame atual (lento; usado só pela captura de vídeo)."""
+        return self.renderer.to_surface()
+
+    def release(self):
+        self._textures.clear()
+
+
+class RendererDisplay:
+    """
+    Backend opcional baseado em pygame._sdl2.video (Window, Renderer, Texture).
+    Camadas de parallax, sprites e textos viram texturas enviadas uma vez; a composição
+    e a ampliação para a janela ficam a cargo do Renderer (logical_size).
+    Com `software=True` usa o renderer de software do SDL, o que permite rodar sem GPU.
+    """
+
+    def __init__(self, window_size=None, fullscreen=False, scale_mode=SCALE_NEAREST,
+                 logical_size=(const.SCREEN_WIDTH, const.SCREEN_HEIGHT), software=False):
+        from pygame._sdl2.video import Window, Renderer
+
+        self.logical_size = logical_size
+        self.scale_mode = scale_mode
+        # Qualidade da ampliação das texturas: "0" = vizinho mais próximo, "1" = linear
+        os.environ["SDL_RENDER_SCALE_QUALITY"] = "1" if scale_mode == SCALE_SMOOTH else "0"
+        # Janela oculta do pygame.display: só existe para convert()/convert_alpha() terem um formato
+        # de pixel de referência. Como ela conta como janela aberta, fechar a janela visível gera
+        # WINDOWCLOSE em vez de QUIT (os loops tratam os dois).
+        pygame.display.set_mode((1, 1), pygame.HIDDEN)
+        self.window = Window(const.GAME_TITLE, size=window_size or logical_size,
+                             fullscreen_desktop=fullscreen)
+        self.renderer = Renderer(self.window, accelerated=0 if software else -1)
+        self.renderer.logical_size = logical_size
+        self.surface = TextureCanvas(self.renderer, logical_size)
+
+    def present(self):
+        self.renderer.present()
+
+    def to_logical(self, pos):
+        # Com logical_size definido o SDL já entrega eventos de mouse em coordenadas lógicas
+        return pos
+
+    def close(self):
+        """Libera texturas, renderer e janela antes do pygame.quit() (a ordem importa para o SDL)."""
+        self.surface.release()
+        del self.surface
+        del self.renderer
+        self.window.destroy()
+
+
+def init(window_size=None, fullscreen=False, scale_mode=SCALE_NEAREST, backend=BACKEND_SURFACE,
+         software_renderer=False):
+    """Cria a janela e retorna o alvo lógico onde o jogo deve desenhar."""
+    global _active_display
+    if backend not in BACKENDS:
+        raise ValueError(f"Backend de vídeo desconhecido: '{backend}'.")
+    close()
+    if backend == BACKEND_SDL2:
+        _active_display = RendererDisplay(window_size, fullscreen, scale_mode, software=software_renderer)
+    else:
+        _active_display = Display(window_size, fullscreen, scale_mode)
+    return _active_display.surface
+
+
+def close():
+    """Fecha o display ativo, se houver."""
+    global _active_display
+    if _active_display is not None:
+        _active_display.close()
+        _active_display = None
+
+
+def get_active():
+    return _active_display
+
+
+def to_logical(pos):
+    return _active_display.to_logical(pos) if _active_display else pos
+
+
+def add_present_hook(hook):
+    """Registra uma função chamada com a superfície do frame logo antes de ele ser apresentado."""
+    _present_hooks.append(hook)
+
+
+def remove_present_hook(hook):
+    if hook in _present_hooks:
+        _present_hooks.remove(hook)
+
+
+def present(surface):
+    """Ponto único de apresentação de frames: roda os hooks e envia o frame para a janela."""
+    if _present_hooks and not isinstance(surface, pygame.Surface):
+        surface = surface.to_surface()
+    for hook in _present_hooks:
+        hook(surface)
+    if _active_display is not None:
+        _active_display.present()
+    else:
+        pygame.display.flip()
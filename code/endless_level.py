@@ -0,0 +1,95 @@
+import math
+import struct
+
+from . import const
+from .enemy import Enemy1, Enemy2, Enemy3
+from .level import Level
+
+_ENDLESS_STATE = struct.Struct("<qdd")
+
+
+class EndlessLevel(Level):
+    """
+    Nível sem fim para o modo arcade. A câmera só avança; os inimigos surgem conforme a distância
+    percorrida, cada vez mais juntos e de tipos mais difíceis. Quando a câmera passa de
+    ENDLESS_REBASE_DISTANCE, todo o mundo é deslocado de volta para perto da origem, então posições
+    de Rect e floats continuam pequenos, e o que fica para trás da câmera é descartado na hora.
+    """
+
+    def __init__(self, screen, player_lives, score_manager, seed=None, **kwargs):
+        bg_prefix, bg_count, bg_start_index, _ = const.LEVEL_DATA[const.ENDLESS_BG_LEVEL]
+        super().__init__(screen, bg_prefix, bg_count, bg_start_index, math.inf, player_lives,
+                         score_manager, seed=seed, **kwargs)
+        self.world_origin = 0
+        self.distance = 0.0
+        self.distance_since_spawn = 0.0
+
+    def difficulty(self):
+        """De 0 (início) tendendo a 1 conforme a distância percorrida."""
+        return 1.0 - math.exp(-self.distance / const.ENDLESS_DIFFICULTY_DISTANCE)
+
+    def _spawn_enemy(self):
+        difficulty = self.difficulty()
+        enemy_class = self.rng.choices([Enemy1, Enemy2, Enemy3],
+                                       weights=[1.0, 2.0 * difficulty, 2.0 * difficulty * difficulty])[0]
+        spawn_x = self.camera_offset_x + self.screen_width + const.ENEMY_SPAWN_X_OFFSET
+        self.enemies.add(enemy_class((spawn_x, const.ENEMY_START_Y)))
+
+    def _step_world(self, delta_time):
+        if delta_time <= 0:
+            return
+        self.animations.advance(delta_time)
+        difficulty = self.difficulty()
+        spawn_gap = const.ENDLESS_SPAWN_GAP_START + (const.ENDLESS_SPAWN_GAP_MIN - const.ENDLESS_SPAWN_GAP_START) * difficulty
+        spawn_wait = const.ENDLESS_SPAWN_WAIT_START + (const.ENDLESS_SPAWN_WAIT_MIN - const.ENDLESS_SPAWN_WAIT_START) * difficulty
+        self.enemy_spawn_timer += delta_time
+        if len(self.enemies) < const.ENDLESS_MAX_ENEMIES and \
+                (self.distance_since_spawn >= spawn_gap or self.enemy_spawn_timer >= spawn_wait):
+            self._spawn_enemy()
+            self.distance_since_spawn = 0.0
+            self.enemy_spawn_timer = 0.0
+
+        self.enemies.update(delta_time, self.camera_offset_x, self.screen_width)
+
+        retire_x = self.camera_offset_x - const.ENDLESS_RETIRE_MARGIN
+        behind = [enemy for enemy in self.enemies if enemy.rect.right < retire_x]
+        for enemy in behind:
+            enemy.kill()
+
+    def _update_camera(self):
+        target_x = self.player.rect.centerx - self.screen_width // 2
+        if target_x > self.camera_offset_x:
+            advance = target_x - self.camera_offset_x
+            self.distance += advance
+            self.distance_since_spawn += advance
+            self.camera_offset_x = target_x
+        self.player.rect.left = max(self.camera_offset_x, self.player.rect.left)
+        self.player.rect.right = min(self.camera_offset_x + self.screen_width, self.player.rect.right)
+        if self.camera_offset_x >= const.ENDLESS_REBASE_DISTANCE:
+            self._rebase(self.camera_offset_x)
+
+    def _rebase(self, shift):
+        """Desloca o mundo `shift` px para a esquerda, mantendo a imagem na tela idêntica."""
+        self._wait_compositor()
+        self.world_origin += shift
+        self.camera_offset_x -= shift
+        self.player.rect.x -= shift
+        for sprite in self.player.shots_group:
+            sprite.rect.x -= shift
+        for enemy in self.enemies:
+            enemy.rect.x -= shift
+        for shot in self.enemy_shots:
+            shot.rect.x -= shift
+        for layer in self.parallax_layers:
+            layer['phase'] = (layer['phase'] + shift * layer['scroll_factor']) % layer['width']
+
+    def _snapshot_extra(self):
+        phases = [layer['phase'] for layer in self.parallax_layers]
+        return _ENDLESS_STATE.pack(self.world_origin, self.distance, self.distance_since_spawn) + \
+            struct.pack(f"<{len(phases)}d", *phases)
+
+    def _restore_extra(self, data):
+        self.world_origin, self.distance, self.distance_since_spawn = _ENDLESS_STATE.unpack_from(data, 0)
+        phases = struct.unpack_from(f"<{len(self.parallax_layers)}d", data, _ENDLESS_STATE.size)
+        for layer, phase in zip(self.parallax_layers, phases):
+            layer['phase'] = phase
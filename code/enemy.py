@@ -1,108 +1,237 @@
 import pygame
-import os
-import random
-from . import const
+from . import assets, const, surface_memory
+from .animation import AnimationClock
 from .enemyshot import EnemyShot
 
-class Enemy(pygame.sprite.Sprite):
-    """Classe base para todos os inimigos do jogo."""
-    def __init__(self, position, speed, animation_speed, animation_prefix, num_frames):
-        super().__init__()
-        self.name = f"{animation_prefix.replace('walk', '')}"
+
+class EnemyArchetype:
+    """
+    Tabela compartilhada por todos os inimigos de um mesmo tipo: frames de animação (com a máscara
+    de colisão de cada frame), velocidade, cooldown de tiro e vida inicial. Tudo é carregado uma única vez.
+    """
+    __slots__ = ("name", "animation_prefix", "num_frames", "speed", "animation_speed", "health",
+                 "shoot_cooldown", "frames", "masks", "frame_count")
+
+    def __init__(self, name, animation_prefix, num_frames, speed, animation_speed, health, shoot_cooldown):
+        self.name = name
+        self.animation_prefix = animation_prefix
+        self.num_frames = num_frames
         self.speed = speed
         self.animation_speed = animation_speed
-        self.walk_frames = []
-        self._load_animation_frames(animation_prefix, num_frames)
-        if self.walk_frames:
-            self.image = self.walk_frames[0]
-        else:
-            self.image = pygame.Surface((const.ENEMY_WIDTH, const.ENEMY_HEIGHT), pygame.SRCALPHA)
-            self.image.fill(const.RED_COLOR)
-        self.rect = self.image.get_rect(topleft=position)
-        self.current_frame_index = 0
-        self.animation_timer = 0.0
-        self.health = 100
-        self.shoot_cooldown = 2.0
-        self.shots_group = pygame.sprite.Group()
-        self.has_fired_on_screen = False
-        self.time_since_last_shot = 0.0
+        self.health = health
+        self.shoot_cooldown = shoot_cooldown
+        self.frames = None
+        self.masks = None
+        self.frame_count = 0
 
-    def _load_animation_frames(self, prefix, num_frames):
-        """Carrega os frames de animação para o inimigo."""
-        base_dir = os.path.dirname(os.path.abspath(__file__))
-        asset_path = os.path.join(base_dir, '..', 'asset')
-        for i in range(1, num_frames + 1):
-            frame_file = os.path.join(asset_path, f'{prefix}{i}.png')
+    def load(self):
+        """Carrega e escala os frames de animação e calcula suas máscaras (só na primeira chamada)."""
+        if self.frames is not None:
+            return
+        frames = []
+        for i in range(1, self.num_frames + 1):
             try:
-                img = pygame.image.load(frame_file).convert_alpha()
-                self.walk_frames.append(pygame.transform.scale(img, (const.ENEMY_WIDTH, const.ENEMY_HEIGHT)))
-            except pygame.error:
+                frames.append(assets.load_image(f'{self.animation_prefix}{i}.png', (const.ENEMY_WIDTH, const.ENEMY_HEIGHT)))
+            except (pygame.error, FileNotFoundError):
                 continue
+        if not frames:
+            fallback = pygame.Surface((const.ENEMY_WIDTH, const.ENEMY_HEIGHT), pygame.SRCALPHA)
+            fallback.fill(const.RED_COLOR)
+            frames.append(fallback)
+        self.frames = surface_memory.track_all(surface_memory.CATEGORY_SPRITES, frames)
+        self.masks = [pygame.mask.from_surface(frame) for frame in frames]
+        self.frame_count = len(frames)
 
-    def update(self, delta_time, camera_offset_x, screen_width):
-        """Atualiza a lógica do inimigo com a verificação de entrada na tela."""
-        self.rect.x -= self.speed * delta_time
-        if self.walk_frames:
-            self.animation_timer += delta_time
-            if self.animation_timer >= self.animation_speed:
-                self.animation_timer = 0.0
-                self.current_frame_index = (self.current_frame_index + 1) % len(self.walk_frames)
-                self.image = self.walk_frames[self.current_frame_index]
-        if not self.has_fired_on_screen:
-            if self.rect.right < camera_offset_x + screen_width:
-                self.shoot()
-                self.has_fired_on_screen = True
-                self.time_since_last_shot = 0.0
-        else:
-            self.time_since_last_shot += delta_time
-            if self.time_since_last_shot >= self.shoot_cooldown:
-                self.shoot()
-                self.time_since_last_shot = 0.0
-        self.shots_group.update(delta_time, camera_offset_x, screen_width)
-        if self.rect.right < 0:
-            self.kill()
+
+ENEMY_ARCHETYPES = {
+    "enemy1": EnemyArchetype("enemy1", "enemy1walk", 6, const.ENEMY1_SPEED, const.ENEMY1_ANIMATION_SPEED,
+                             const.ENEMY1_HEALTH, const.ENEMY1_SHOOT_COOLDOWN),
+    "enemy2": EnemyArchetype("enemy2", "enemy2walk", 4, const.ENEMY2_SPEED, const.ENEMY2_ANIMATION_SPEED,
+                             const.ENEMY2_HEALTH, const.ENEMY2_SHOOT_COOLDOWN),
+    "enemy3": EnemyArchetype("enemy3", "enemy3walk", 5, const.ENEMY3_SPEED, const.ENEMY3_ANIMATION_SPEED,
+                             const.ENEMY3_HEALTH, const.ENEMY3_SHOOT_COOLDOWN),
+}
+
+
+class Enemy:
+    """
+    Estado de um inimigo individual. Tudo o que é igual para o tipo fica no `EnemyArchetype`;
+    aqui só ficam posição, vida e temporizadores, em __slots__ (sem __dict__ por instância).
+    A animação é a do tipo, compartilhada no relógio do nível; o inimigo só guarda o passo em que entrou nela.
+    """
+    __slots__ = ("archetype", "rect", "health", "animation", "animation_start",
+                 "has_fired_on_screen", "time_since_last_shot", "pool")
+
+    def __init__(self, archetype, position):
+        archetype.load()
+        self.archetype = archetype
+        self.rect = pygame.Rect(position, (const.ENEMY_WIDTH, const.ENEMY_HEIGHT))
+        self.health = archetype.health
+        self.animation = None
+        self.animation_start = 0
+        self.has_fired_on_screen = False
+        self.time_since_last_shot = 0.0
+        self.pool = None
+
+    @property
+    def name(self):
+        return self.archetype.name
+
+    @property
+    def current_frame_index(self):
+        animation = self.animation
+        if animation is None:
+            return 0
+        return animation.frame_index(self.animation_start, self.archetype.frame_count)
+
+    @property
+    def image(self):
+        return self.archetype.frames[self.current_frame_index]
+
+    @property
+    def mask(self):
+        return self.archetype.masks[self.current_frame_index]
+
+    @property
+    def speed(self):
+        return self.archetype.speed
+
+    @property
+    def shoot_cooldown(self):
+        return self.archetype.shoot_cooldown
 
     def shoot(self):
-        """Método de tiro a ser implementado pelas subclasses."""
-        pass
+        new_shot = EnemyShot(self.rect.midleft, self.archetype.name, direction=-1)
+        new_shot.owner = self
+        if self.pool is not None:
+            self.pool.shots.add(new_shot)
 
     def take_damage(self, amount):
         self.health -= amount
         if self.health <= 0:
             self.kill()
 
+    def kill(self):
+        """Remove o inimigo (e os tiros que ele disparou) do pool ao qual pertence."""
+        if self.pool is not None:
+            self.pool.remove(self)
+
+    def alive(self):
+        return self.pool is not None
+
     def draw(self, surface, camera_offset_x):
         screen_x = self.rect.x - camera_offset_x
         surface.blit(self.image, (screen_x, self.rect.y))
-        for shot in self.shots_group:
-            shot.draw(surface, camera_offset_x)
+
 
 class Enemy1(Enemy):
+    __slots__ = ()
+
     def __init__(self, position):
-        super().__init__(position, const.ENEMY1_SPEED, const.ENEMY1_ANIMATION_SPEED, "enemy1walk", 6)
-        self.health = const.ENEMY1_HEALTH
-        self.shoot_cooldown = const.ENEMY1_SHOOT_COOLDOWN
+        super().__init__(ENEMY_ARCHETYPES["enemy1"], position)
 
-    def shoot(self):
-        new_shot = EnemyShot(self.rect.midleft, 'enemy1', direction=-1)
-        self.shots_group.add(new_shot)
 
 class Enemy2(Enemy):
+    __slots__ = ()
+
     def __init__(self, position):
-        super().__init__(position, const.ENEMY2_SPEED, const.ENEMY2_ANIMATION_SPEED, "enemy2walk", 4)
-        self.health = const.ENEMY2_HEALTH
-        self.shoot_cooldown = const.ENEMY2_SHOOT_COOLDOWN
+        super().__init__(ENEMY_ARCHETYPES["enemy2"], position)
 
-    def shoot(self):
-        new_shot = EnemyShot(self.rect.midleft, 'enemy2', direction=-1)
-        self.shots_group.add(new_shot)
 
 class Enemy3(Enemy):
+    __slots__ = ()
+
     def __init__(self, position):
-        super().__init__(position, const.ENEMY3_SPEED, const.ENEMY3_ANIMATION_SPEED, "enemy3walk", 5)
-        self.health = const.ENEMY3_HEALTH
-        self.shoot_cooldown = const.ENEMY3_SHOOT_COOLDOWN
+        super().__init__(ENEMY_ARCHETYPES["enemy3"], position)
 
-    def shoot(self):
-        new_shot = EnemyShot(self.rect.midleft, 'enemy3', direction=-1)
-        self.shots_group.add(new_shot)
\ No newline at end of file
+
+class EnemyPool:
+    """
+    Coleção de inimigos de um nível, atualizada num único laço.
+    Também guarda, num grupo só, os tiros de todos os inimigos.
+    Suporta a interface de `pygame.sprite.Group` usada pelo jogo (len, iteração, add, update, sprites).
+    As animações de cada tipo ficam em `animations` (o relógio do nível, que as avança uma vez por frame).
+    """
+
+    def __init__(self, animations=None):
+        self._enemies = []
+        self.shots = pygame.sprite.Group()
+        self.animations = animations if animations is not None else AnimationClock()
+
+    def __len__(self):
+        return len(self._enemies)
+
+    def __iter__(self):
+        return iter(self._enemies)
+
+    def __contains__(self, enemy):
+        return enemy.pool is self
+
+    def sprites(self):
+        return list(self._enemies)
+
+    def add(self, *enemies):
+        for enemy in enemies:
+            if enemy.pool is None:
+                enemy.pool = self
+                archetype = enemy.archetype
+                enemy.animation = self.animations.animation(archetype.animation_prefix, archetype.animation_speed)
+                enemy.animation_start = enemy.animation.step
+                self._enemies.append(enemy)
+
+    def remove(self, enemy):
+        if enemy.pool is not self:
+            return
+        self._enemies.remove(enemy)
+        enemy.pool = None
+        for shot in self.shots.sprites():
+            if shot.owner is enemy:
+                shot.kill()
+
+    def empty(self):
+        for enemy in self._enemies:
+            enemy.pool = None
+        self._enemies.clear()
+        self.shots.empty()
+
+    def update(self, delta_time, camera_offset_x, screen_width):
+        """Move e faz atirar todos os inimigos; remove os que saíram pela esquerda do nível."""
+        visible_right = camera_offset_x + screen_width
+        gone = None
+        for enemy in self._enemies:
+            archetype = enemy.archetype
+            rect = enemy.rect
+            rect.x -= archetype.speed * delta_time
+
+            if enemy.has_fired_on_screen:
+                since_shot = enemy.time_since_last_shot + delta_time
+                if since_shot >= archetype.shoot_cooldown:
+                    enemy.shoot()
+                    since_shot = 0.0
+                enemy.time_since_last_shot = since_shot
+            elif rect.right < visible_right:
+                enemy.shoot()
+                enemy.has_fired_on_screen = True
+                enemy.time_since_last_shot = 0.0
+
+            if rect.right < 0:
+                if gone is None:
+                    gone = []
+                gone.append(enemy)
+
+        self.shots.update(delta_time, camera_offset_x, screen_width)
+        if gone:
+            for enemy in gone:
+                enemy.kill()
+
+    def blit_list(self, camera_offset_x):
+        """Lista (frame atual, posição na tela) de cada inimigo, pronta para Surface.blits."""
+        draws = []
+        for enemy in self._enemies:
+            archetype = enemy.archetype
+            frame = archetype.frames[enemy.animation.frame_index(enemy.animation_start, archetype.frame_count)]
+            draws.append((frame, (enemy.rect.x - camera_offset_x, enemy.rect.y)))
+        return draws
+
+    def draw(self, surface, camera_offset_x):
+        surface.blits(self.blit_list(camera_offset_x), doreturn=False)
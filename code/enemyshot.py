@@ -1,22 +1,33 @@
-import os
 import pygame
+from . import assets, surface_memory
 
 class EnemyShot(pygame.sprite.Sprite):
+    _image_cache = {}
+
     def __init__(self, position, enemy_type, direction=-1):
         super().__init__()
-        try:
-            base_dir = os.path.dirname(os.path.abspath(__file__))
-            image_path = os.path.join(base_dir, '..', 'asset', f'{enemy_type}shot.png')
-            self.image = pygame.image.load(image_path).convert_alpha()
-        except (pygame.error, FileNotFoundError):
-            self.image = pygame.Surface((25, 25), pygame.SRCALPHA)
-            self.image.fill((255, 100, 100))
+        self.image, self.mask = self._load_image(enemy_type)
 
         self.rect = self.image.get_rect(center=position)
         self.speed = 400
         self.direction = direction
         self.enemy_type = enemy_type
         self.damage = 1
+        self.owner = None
+
+    @classmethod
+    def _load_image(cls, enemy_type):
+        """Carrega a imagem do tiro e sua máscara de colisão uma única vez por tipo de inimigo."""
+        cached = cls._image_cache.get(enemy_type)
+        if cached is None:
+            try:
+                image = assets.load_image(f'{enemy_type}shot.png')
+            except (pygame.error, FileNotFoundError):
+                image = pygame.Surface((25, 25), pygame.SRCALPHA)
+                image.fill((255, 100, 100))
+            surface_memory.track(surface_memory.CATEGORY_SPRITES, image)
+            cached = cls._image_cache[enemy_type] = (image, pygame.mask.from_surface(image))
+        return cached
 
     def update(self, delta_time, camera_offset_x, screen_width):
         """
@@ -29,4 +40,4 @@ class EnemyShot(pygame.sprite.Sprite):
 
     def draw(self, surface, camera_offset_x):
         screen_x = self.rect.x - camera_offset_x
-        surface.blit(self.image, (screen_x, self.rect.y))
\ No newline at end of file
+        surface.blit(self.image, (screen_x, self.rect.y))
@@ -4,13 +4,26 @@ class EntityMediator:
     """
     Mediador central para interações entre entidades, especialmente colisões.
     """
+    @staticmethod
+    def collide(sprite_a, sprite_b):
+        """
+        Colisão por pixel: testa primeiro os retângulos e só para os pares que se sobrepõem
+        compara as máscaras pré-calculadas (compartilhadas por frame de animação) com o deslocamento.
+        """
+        rect_a = sprite_a.rect
+        rect_b = sprite_b.rect
+        if not rect_a.colliderect(rect_b):
+            return False
+        return sprite_a.mask.overlap(sprite_b.mask, (rect_b.x - rect_a.x, rect_b.y - rect_a.y)) is not None
+
     @staticmethod
     def check_all_collisions(player, enemies_group, player_shots_group, enemy_shots_group):
         """
         Verifica e processa todas as colisões entre jogador, inimigos e projéteis.
         """
+        collide = EntityMediator.collide
         collisions_player_shot_enemy = pygame.sprite.groupcollide(
-            player_shots_group, enemies_group, True, False
+            player_shots_group, enemies_group, True, False, collide
         )
         if collisions_player_shot_enemy:
             for shot, enemies_hit in collisions_player_shot_enemy.items():
@@ -18,13 +31,13 @@ class EntityMediator:
                     enemy.take_damage(shot.damage)
 
         collisions_enemy_shot_player = pygame.sprite.spritecollide(
-            player, enemy_shots_group, True
+            player, enemy_shots_group, True, collide
         )
         if collisions_enemy_shot_player:
             player.take_damage(amount=1)
 
         collisions_player_enemy = pygame.sprite.spritecollide(
-            player, enemies_group, False
+            player, enemies_group, False, collide
         )
         if collisions_player_enemy:
-            pass
\ No newline at end of file
+            pass
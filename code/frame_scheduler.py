@@ -0,0 +1,133 @@
+"""
+Loop de frames sobre asyncio. O frame do estado atual roda como um passo síncrono; entre um frame e o
+próximo o loop espera o prazo com `await`, e só nessa sobra rodam as tarefas de fundo (corrotinas) e
+começam os trabalhos bloqueantes enviados ao executor (gravação de scores, pré-carga de assets, logs).
+"""
+import asyncio
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from . import instrumentation
+
+# Sobra mínima no frame para despachar um trabalho bloqueante
+SCHEDULER_MIN_SLACK_MS = 2.0
+# Um trabalho que espera mais que isso é despachado mesmo sem sobra (em carga contínua nada fica preso na fila)
+SCHEDULER_MAX_JOB_WAIT_S = 1.0
+
+
+class FrameScheduler:
+    """
+    `await tick(framerate)` substitui `Clock.tick`: espera até o prazo do frame e retorna os milissegundos
+    desde o tick anterior (com `framerate` 0, não espera). O prazo avança um período fixo a cada frame
+    (o atraso de um sleep é descontado do seguinte, sem deriva); se o frame estourar por mais de um
+    período, o prazo recomeça do agora em vez de emendar frames curtos para recuperar.
+
+    Corrotinas iniciadas com `spawn` só rodam enquanto o frame espera, então cada passo delas (até o
+    próximo `await`) deve ser curto. Funções bloqueantes vão para `run_in_background`: ficam numa fila e
+    só são entregues ao executor (uma thread) no início da espera de um frame com sobra. Ninguém precisa
+    aguardar o resultado: o erro de um trabalho ou de uma corrotina é mostrado e contado em `jobs_failed`.
+    """
+
+    def __init__(self, workers=1):
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="background")
+        self._jobs = deque()
+        self._running = set()
+        self._tasks = set()
+        self._deadline = None
+        self._last_tick = None
+        self.frames = 0
+        self.late_frames = 0
+        self.jobs_done = 0
+        self.jobs_failed = 0
+        self._idle_total = 0.0
+        instrumentation.register_provider("frame_scheduler", self.stats)
+
+    async def tick(self, framerate=0):
+        now = time.perf_counter()
+        period = 1.0 / framerate if framerate else 0.0
+        if self._deadline is None:
+            self._deadline = now
+        self._deadline += period
+        if now > self._deadline:
+            if period:
+                self.late_frames += 1
+            if now - self._deadline > period:
+                self._deadline = now
+
+        remaining = self._deadline - now
+        self._dispatch_jobs(now, remaining * 1000.0)
+        # Mesmo sem sobra, uma volta do loop para as tarefas prontas não ficarem paradas para sempre
+        await asyncio.sleep(max(remaining, 0.0))
+
+        now = time.perf_counter()
+        self._idle_total += max(remaining, 0.0)
+        self.frames += 1
+        elapsed_ms = (now - self._last_tick) * 1000.0 if self._last_tick is not None else 0.0
+        self._last_tick = now
+        return elapsed_ms
+
+    def spawn(self, coro):
+        """Inicia uma corrotina de fundo; ela roda nas esperas entre frames."""
+        task = asyncio.get_running_loop().create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        task.add_done_callback(lambda done: self._report_failure(done, coro.__qualname__))
+        return task
+
+    def run_in_background(self, fn, *args):
+        """Enfileira `fn(*args)` para o executor. Retorna um Future do asyncio com o resultado."""
+        future = asyncio.get_running_loop().create_future()
+        future.add_done_callback(lambda done: self._report_failure(done, getattr(fn, "__qualname__", repr(fn))))
+        self._jobs.append((time.perf_counter(), fn, args, future))
+        return future
+
+    def _report_failure(self, future, name):
+        """Mostra e conta a exceção de um trabalho ou tarefa; quem aguarda o Future ainda a recebe."""
+        if future.cancelled():
+            return
+        error = future.exception()
+        if error is not None:
+            self.jobs_failed += 1
+            print(f"Trabalho de fundo '{name}' falhou: {error!r}")
+
+    def _dispatch_jobs(self, now, slack_ms):
+        jobs = self._jobs
+        while jobs and (slack_ms >= SCHEDULER_MIN_SLACK_MS or now - jobs[0][0] >= SCHEDULER_MAX_JOB_WAIT_S):
+            _, fn, args, future = jobs.popleft()
+            if future.cancelled():
+                continue
+            inner = asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+            self._running.add(inner)
+            inner.add_done_callback(lambda done, outer=future: self._job_done(done, outer))
+            # Um trabalho por frame quando há sobra; os atrasados saem todos
+            slack_ms = 0.0
+
+    def _job_done(self, inner, outer):
+        self._running.discard(inner)
+        self.jobs_done += 1
+        if outer.cancelled():
+            return
+        if inner.exception() is not None:
+            outer.set_exception(inner.exception())
+        else:
+            outer.set_result(inner.result())
+
+    async def drain(self, timeout=5.0):
+        """Ao sair: cancela as tarefas, despacha o que ainda está na fila e espera os trabalhos terminarem."""
+        for task in list(self._tasks):
+            task.cancel()
+        self._dispatch_jobs(time.perf_counter() + SCHEDULER_MAX_JOB_WAIT_S, 0.0)
+        pending = self._tasks | self._running
+        if pending:
+            await asyncio.wait(pending, timeout=timeout)
+
+    def stats(self):
+        return {"frames": self.frames, "late_frames": self.late_frames, "jobs_pending": len(self._jobs),
+                "jobs_running": len(self._running), "jobs_done": self.jobs_done,
+                "jobs_failed": self.jobs_failed, "tasks": len(self._tasks),
+                "idle_ms_mean": self._idle_total * 1000.0 / self.frames if self.frames else 0.0}
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+        instrumentation.unregister_provider("frame_scheduler")
@@ -1,143 +1,523 @@
+import time
+
 import pygame
 from .menu import Menu
-import os
-from .level import Level
-from . import const
+from . import assets, const, display, instrumentation, startup_trace, surface_memory
 from .score import ScoreManager
+from .pacing import FramePacer, PACING_SLEEP
+
+# Eventos de janela que decidem se o jogo está em segundo plano (sem foco, minimizado ou escondido)
+WINDOW_STATE_EVENTS = (pygame.WINDOWFOCUSLOST, pygame.WINDOWFOCUSGAINED, pygame.WINDOWMINIMIZED,
+                       pygame.WINDOWRESTORED, pygame.WINDOWHIDDEN, pygame.WINDOWSHOWN)
 
 class Game:
-    def __init__(self):
-        pygame.init()
-        pygame.mixer.init()
-        self.tela = pygame.display.set_mode((const.SCREEN_WIDTH, const.SCREEN_HEIGHT))
-        pygame.display.set_caption(const.GAME_TITLE)
-        self.relogio = pygame.time.Clock()
+    def __init__(self, record_path=None, record_format=const.CAPTURE_FORMAT_PNG,
+                 window_size=None, fullscreen=False, scale_mode=display.SCALE_NEAREST,
+                 show_startup_trace=False, backend=display.BACKEND_SURFACE, software_renderer=False,
+                 pipelined_render=False, frame_pacing=PACING_SLEEP, late_latch=False,
+                 measure_input_latency=False, rewind_seconds=0, show_asset_report=False,
+                 adaptive_quality=False, async_loop=False, metrics_log=None, profile_dir=None,
+                 shared_assets=None, hitch_log=None, hitch_threshold=const.HITCH_THRESHOLD):
+        # Só o necessário para o primeiro frame do menu; mixer, telas de resultado e
+        # assets de gameplay são carregados no primeiro uso.
+        with startup_trace.step("pygame.display/font init"):
+            pygame.display.init()
+            pygame.font.init()
+        with startup_trace.step("display.init"):
+            self.tela = display.init(window_size, fullscreen, scale_mode, backend, software_renderer)
+            pygame.display.set_caption(const.GAME_TITLE)
+        # Várias instâncias na mesma máquina: imagens decodificadas uma vez e compartilhadas entre elas
+        self.shared_assets = None
+        if shared_assets:
+            from .shared_assets import SharedAssetPool
+            try:
+                self.shared_assets = SharedAssetPool(shared_assets)
+            except OSError as error:
+                print(f"Pool de assets compartilhado desligado: {error}")
+            else:
+                assets.use_shared_pool(self.shared_assets)
+        self.relogio = FramePacer(frame_pacing)
         self.game_state = const.GAME_STATE_MENU
         self.previous_game_state = None
         self.current_level_number = 0
         self.player_current_lives = const.PLAYER_LIVES_START
-        self.score_manager = ScoreManager()
+        self.show_startup_trace = show_startup_trace
+        self.pipelined_render = pipelined_render
+        self.late_latch = late_latch
+        self.rewind_seconds = rewind_seconds
+        self.show_asset_report = show_asset_report
+        with startup_trace.step("ScoreManager"):
+            self.score_manager = ScoreManager()
         self._load_assets()
-        self.menu = Menu(self.tela, font_path=self.gothic_font_path, font_size=const.MENU_FONT_SIZE)
+        with startup_trace.step("Menu"):
+            self.menu = Menu(self.tela, font_name=self.gothic_font_name, font_size=const.MENU_FONT_SIZE)
         self.level = None
+        self._level_checkpoint = None
+        self.endless_mode = False
+        # Melhor score entre as tentativas (R) da partida infinita atual; gravado uma vez, ao sair dela
+        self._endless_best_score = None
+        self._result_images = {}
+        self._ranking_font = None
+        self.recorder = None
+        if record_path:
+            from .capture import FrameRecorder
+            self.recorder = FrameRecorder(record_path, self.tela.get_size(), fmt=record_format)
+            display.add_present_hook(self.recorder.capture)
+        self.input_latency = None
+        if measure_input_latency:
+            from .input_latency import InputLatencyTracker
+            self.input_latency = InputLatencyTracker()
+            display.add_present_hook(self.input_latency.on_present)
+        # Um governador só para a sessão: o nível de qualidade escolhido passa de um nível para o outro
+        self.quality_governor = None
+        if adaptive_quality:
+            from .quality import QualityGovernor
+            self.quality_governor = QualityGovernor()
+        # Loop asyncio: gravações, pré-carga e logs rodam na sobra de cada frame (ver FrameScheduler)
+        self.async_loop = async_loop
+        self.scheduler = None
+        self.metrics_log = metrics_log
+        self._metrics_records = []
+        self._metrics_due = 0.0
+        # Segundo plano: nada é simulado, desenhado nem apresentado até a janela voltar
+        self.in_background = False
+        self._unfocused = False
+        self._minimized = False
+        self._resumed = False
+        self._deferred_keyups = {}
+        # Profiler por amostragem: ligado desde o início com --profile, ou a qualquer momento com F9
+        self.profile_dir = profile_dir or const.PROFILE_DIR
+        self.profiler = None
+        self._profile_key_down = False
+        self._profile_flush_due = 0.0
+        if profile_dir:
+            self._toggle_profiler()
+        # Detector de travadas: cada frame acima de hitch_threshold vezes o orçamento vai para o log em anel
+        self.hitch_detector = None
+        if hitch_log:
+            from .hitch import HitchDetector
+            self.hitch_detector = HitchDetector(hitch_log, hitch_threshold, context=self._hitch_context)
 
     def _load_assets(self):
-        base_dir = os.path.dirname(os.path.abspath(__file__))
-        asset_dir = os.path.join(base_dir, '..', 'asset')
-        self.game_music_path = os.path.join(asset_dir, 'gamesong.mp3')
-        self.menu_music_path = os.path.join(asset_dir, 'menusong.mp3')
-        self.gothic_font_path = os.path.join(asset_dir, f'{const.FONT_NAME}.ttf')
-        try:
-            win_img_path = os.path.join(base_dir, '..', const.GAME_OVER_WIN_IMAGE)
-            self.win_background_image = pygame.transform.scale(pygame.image.load(win_img_path).convert_alpha(), (const.SCREEN_WIDTH, const.SCREEN_HEIGHT))
-        except pygame.error:
-            self.win_background_image = None
+        self.game_music = 'gamesong.mp3'
+        self.menu_music = 'menusong.mp3'
+        self.gothic_font_name = f'{const.FONT_NAME}.ttf'
+
+    def _load_result_image(self, name):
+        """Carrega (uma única vez) a imagem de fundo de uma tela de resultado."""
+        if name not in self._result_images:
+            try:
+                image = surface_memory.track(surface_memory.CATEGORY_UI, assets.load_image(
+                    name, (const.SCREEN_WIDTH, const.SCREEN_HEIGHT)))
+            except (pygame.error, FileNotFoundError):
+                image = None
+            self._result_images[name] = image
+        return self._result_images[name]
+
+    @property
+    def win_background_image(self):
+        return self._load_result_image(const.GAME_OVER_WIN_IMAGE)
+
+    @property
+    def lose_background_image(self):
+        return self._load_result_image(const.GAME_OVER_LOSE_IMAGE)
+
+    def _ensure_mixer(self):
+        """Inicializa o mixer no primeiro uso. Retorna False se não houver áudio disponível."""
+        if pygame.mixer.get_init():
+            return True
         try:
-            lose_img_path = os.path.join(base_dir, '..', const.GAME_OVER_LOSE_IMAGE)
-            self.lose_background_image = pygame.transform.scale(pygame.image.load(lose_img_path).convert_alpha(), (const.SCREEN_WIDTH, const.SCREEN_HEIGHT))
+            with startup_trace.step("pygame.mixer.init"):
+                pygame.mixer.init()
         except pygame.error:
-            self.lose_background_image = None
+            return False
+        return True
 
     def _load_level(self, level_num):
-        level_data = {
-            1: (const.LVL1_BG_PREFIX, const.LVL1_BG_COUNT, const.LVL1_BG_START_INDEX, const.LEVEL1_WIDTH),
-            2: (const.LVL2_BG_PREFIX, const.LVL2_BG_COUNT, const.LVL2_BG_START_INDEX, const.LEVEL2_WIDTH),
-            3: (const.LVL3_BG_PREFIX, const.LVL3_BG_COUNT, const.LVL3_BG_START_INDEX, const.LEVEL3_WIDTH),
-        }
-        if level_num not in level_data:
+        self._unload_level(keep_prefetched=True)
+        if level_num not in const.LEVEL_DATA:
             self.game_state = const.GAME_STATE_GAME_OVER_WIN
             return
-        bg_prefix, bg_count, bg_start_index, level_width = level_data[level_num]
+        self.current_level_number = level_num
+        from .level import Level
+
+        bg_prefix, bg_count, bg_start_index, level_width = const.LEVEL_DATA[level_num]
         self.level = Level(self.tela, bg_prefix, bg_count, bg_start_index, level_width,
                            player_lives=self.player_current_lives,
-                           score_manager=self.score_manager)
-        self.current_level_number = level_num
+                           score_manager=self.score_manager, pipelined=self.pipelined_render,
+                           late_latch=self.late_latch, input_latency=self.input_latency,
+                           rewind_seconds=self.rewind_seconds, quality_governor=self.quality_governor,
+                           hitch_detector=self.hitch_detector)
+        # Estado do início do nível, para tentar de novo sem recarregar nada
+        self._level_checkpoint = self.level.snapshot()
+        self._prefetch_level(level_num + 1)
+
+    def _prefetch_level(self, level_num):
+        """No loop asyncio, decodifica em segundo plano os fundos do nível `level_num`."""
+        if self.scheduler is None or level_num not in const.LEVEL_DATA:
+            return
+        bg_prefix, bg_count, bg_start_index, _ = const.LEVEL_DATA[level_num]
+        self.scheduler.spawn(self._prefetch_images(
+            [f'{bg_prefix}{i}.png' for i in range(bg_start_index, bg_start_index + bg_count)]))
+
+    async def _prefetch_images(self, names):
+        for name in names:
+            try:
+                await self.scheduler.run_in_background(assets.prefetch, name)
+            except (pygame.error, FileNotFoundError):
+                pass
+
+    def _background(self, fn, *args):
+        """Roda `fn(*args)` fora do frame no loop asyncio; no loop síncrono, na hora."""
+        if self.scheduler is not None:
+            self.scheduler.run_in_background(fn, *args)
+        else:
+            fn(*args)
+
+    def _frame_rate(self):
+        """Taxa pedida ao relógio: 0 (sem espera) em segundo plano, em que a espera é o `event.wait`."""
+        return 0 if self.in_background else const.FPS
+
+    def _track_window_events(self, events):
+        for event in events:
+            if event.type == pygame.WINDOWFOCUSLOST:
+                self._unfocused = True
+            elif event.type == pygame.WINDOWFOCUSGAINED:
+                self._unfocused = False
+            elif event.type in (pygame.WINDOWMINIMIZED, pygame.WINDOWHIDDEN):
+                self._minimized = True
+            elif event.type in (pygame.WINDOWRESTORED, pygame.WINDOWSHOWN):
+                self._minimized = False
+        background = self._unfocused or self._minimized
+        if background != self.in_background:
+            self._set_background(background)
+
+    def _set_background(self, background):
+        """Entra ou sai do segundo plano: pausa a música; ao voltar, devolve à fila os KEYUPs guardados."""
+        self.in_background = background
+        instrumentation.set_gauge("game.in_background", background)
+        if pygame.mixer.get_init():
+            if background:
+                pygame.mixer.music.pause()
+            else:
+                pygame.mixer.music.unpause()
+        if not background:
+            for event in self._deferred_keyups.values():
+                pygame.event.post(event)
+            self._deferred_keyups.clear()
+            self._resumed = True
+
+    def _background_frame(self):
+        """
+        Em segundo plano o frame só espera eventos (até BACKGROUND_EVENT_WAIT_MS, acordando na hora com
+        qualquer um). Só os KEYUPs ficam guardados para o estado atual (ex.: o que o SDL gera ao perder o
+        foco), um por tecla e no máximo BACKGROUND_DEFERRED_KEYUPS_MAX, para nenhuma tecla ficar presa ao
+        voltar; o resto (teclas, texto, mouse e joystick digitados em outra janela) é descartado.
+        """
+        event = pygame.event.wait(const.BACKGROUND_EVENT_WAIT_MS)
+        if event.type == pygame.NOEVENT:
+            return
+        events = [event] + pygame.event.get()
+        for event in events:
+            if event.type in (pygame.QUIT, pygame.WINDOWCLOSE):
+                self.game_state = const.GAME_STATE_QUIT
+            elif event.type == pygame.KEYUP:
+                deferred = self._deferred_keyups
+                if event.key in deferred or len(deferred) < const.BACKGROUND_DEFERRED_KEYUPS_MAX:
+                    deferred[event.key] = event
+        self._track_window_events(events)
+
+    def _profile_tag(self):
+        """Etiqueta das amostras do profiler (lida pela thread de amostragem)."""
+        if self.game_state != const.GAME_STATE_PLAYING:
+            return self.game_state
+        return f"{self.game_state}:endless" if self.endless_mode else f"{self.game_state}:level{self.current_level_number}"
+
+    def _hitch_context(self):
+        """Estado e entidades vivas, anexados a cada travada registrada."""
+        context = {"state": self._profile_tag()}
+        if self.level is not None:
+            context.update(enemies=len(self.level.enemies), enemy_shots=len(self.level.enemy_shots),
+                           player_shots=len(self.level.player.shots_group))
+        return context
+
+    def _toggle_profiler(self):
+        """Liga o profiler, ou desliga e grava o perfil acumulado."""
+        if self.profiler is None:
+            from .profiler import SamplingProfiler
+            self.profiler = SamplingProfiler(self._profile_tag)
+        if self.profiler.running:
+            self.profiler.stop()
+            self._save_profile()
+        else:
+            self.profiler.start()
+            self._profile_flush_due = time.perf_counter() + const.PROFILE_FLUSH_INTERVAL
+
+    def _save_profile(self):
+        counts = self.profiler.take()
+        if counts:
+            from . import profiler
+            self._background(profiler.write, counts, self.profiler.interval, self.profile_dir)
+
+    def _update_profiler(self):
+        """F9 liga/desliga o profiler; ligado, grava um arquivo a cada PROFILE_FLUSH_INTERVAL."""
+        key_down = pygame.key.get_pressed()[pygame.K_F9]
+        if key_down and not self._profile_key_down:
+            self._toggle_profiler()
+        self._profile_key_down = key_down
+        if self.profiler is not None and self.profiler.running and time.perf_counter() >= self._profile_flush_due:
+            self._profile_flush_due = time.perf_counter() + const.PROFILE_FLUSH_INTERVAL
+            self._save_profile()
+
+    def _collect_metrics(self):
+        """A cada METRICS_LOG_INTERVAL guarda um snapshot das métricas; grava em lotes de METRICS_LOG_BATCH."""
+        now = time.perf_counter()
+        if now < self._metrics_due:
+            return
+        self._metrics_due = now + const.METRICS_LOG_INTERVAL
+        record = instrumentation.snapshot()
+        record.update(time=round(now, 3), game_state=self.game_state)
+        self._metrics_records.append(record)
+        if len(self._metrics_records) >= const.METRICS_LOG_BATCH:
+            self._flush_metrics()
+
+    def _finish_background_work(self):
+        """Ao sair: grava o que ainda está acumulado (métricas e perfil)."""
+        self._flush_metrics()
+        if self.profiler is not None:
+            self.profiler.stop()
+            self._save_profile()
+            self.profiler.close()
+
+    def _flush_metrics(self):
+        if self._metrics_records:
+            records, self._metrics_records = self._metrics_records, []
+            self._background(instrumentation.append_jsonl, self.metrics_log, records)
+
+    def _load_endless_level(self):
+        self._unload_level(keep_prefetched=True)
+        from .endless_level import EndlessLevel
+
+        self.level = EndlessLevel(self.tela, player_lives=self.player_current_lives,
+                                  score_manager=self.score_manager, pipelined=self.pipelined_render,
+                                  late_latch=self.late_latch, input_latency=self.input_latency,
+                                  rewind_seconds=self.rewind_seconds,
+                                  quality_governor=self.quality_governor,
+                                  hitch_detector=self.hitch_detector)
+        self._level_checkpoint = self.level.snapshot()
+
+    def _save_endless_score(self):
+        """Grava o melhor score da partida infinita que está terminando (uma entrada só, mesmo com retries)."""
+        if self._endless_best_score is not None:
+            self.score_manager.set_current_score(self._endless_best_score)
+            self.score_manager.save_current_score_if_high()
+            self._endless_best_score = None
+
+    def _unload_level(self, keep_prefetched=False):
+        """
+        Descarrega o nível atual na hora, para que suas superfícies não se acumulem até o GC. Os fundos
+        pré-carregados para o próximo nível só ficam se um nível vai ser carregado em seguida.
+        """
+        if self.level is not None:
+            self.level.unload()
+            self.level = None
+            self._level_checkpoint = None
+        if not keep_prefetched:
+            assets.discard_prefetched()
 
     def _handle_music(self):
         if self.game_state == self.previous_game_state: return
-        music_path = None
+        music = None
         if self.game_state == const.GAME_STATE_MENU:
-            music_path = self.menu_music_path
+            music = self.menu_music
         elif self.game_state == const.GAME_STATE_PLAYING:
-            music_path = self.game_music_path
-        if music_path:
-            try:
-                pygame.mixer.music.load(music_path)
-                pygame.mixer.music.play(-1)
-            except pygame.error:
-                pass
-        else:
+            music = self.game_music
+        if music:
+            if self._ensure_mixer():
+                try:
+                    assets.load_music(music)
+                    pygame.mixer.music.play(-1)
+                except (pygame.error, FileNotFoundError):
+                    pass
+        elif pygame.mixer.get_init():
             pygame.mixer.music.stop()
         self.previous_game_state = self.game_state
 
     def run(self):
-        running = True
-        while running:
-            self._handle_music()
-            if self.game_state == const.GAME_STATE_MENU:
-                self.player_current_lives = const.PLAYER_LIVES_START
-                self.score_manager.reset()
-                action = self.menu.run()
-                if action == "start_game":
-                    self.game_state = const.GAME_STATE_PLAYING
-                    self._load_level(1)
-                elif action == "quit":
-                    self.game_state = const.GAME_STATE_QUIT
-            elif self.game_state == const.GAME_STATE_PLAYING:
-                action = self.level.run(self.relogio)
-                if action == "quit":
-                    self.game_state = const.GAME_STATE_QUIT
-                elif action == "level_complete":
-                    self.player_current_lives = self.level.player.lives
-                    self.current_level_number += 1
-                    if self.current_level_number > const.MAX_GAME_LEVELS:
-                        self.game_state = const.GAME_STATE_GAME_OVER_WIN
-                        self.score_manager.save_current_score_if_high()
-                    else:
-                        self._load_level(self.current_level_number)
-                elif action == const.GAME_STATE_GAME_OVER_LOSE:
-                    self.game_state = const.GAME_STATE_GAME_OVER_LOSE
-            elif self.game_state == const.GAME_STATE_GAME_OVER_WIN:
-                self._draw_win_screen()
-                for event in pygame.event.get():
-                    if event.type == pygame.QUIT: self.game_state = const.GAME_STATE_QUIT
-                    if event.type == pygame.KEYDOWN and (event.key == pygame.K_RETURN or event.key == pygame.K_ESCAPE):
-                        self.game_state = const.GAME_STATE_MENU
-            elif self.game_state == const.GAME_STATE_GAME_OVER_LOSE:
-                self._draw_lose_screen()
-                for event in pygame.event.get():
-                    if event.type == pygame.QUIT: self.game_state = const.GAME_STATE_QUIT
-                    if event.type == pygame.KEYDOWN and (event.key == pygame.K_RETURN or event.key == pygame.K_ESCAPE):
-                        self.game_state = const.GAME_STATE_MENU
-            elif self.game_state == const.GAME_STATE_QUIT:
-                running = False
+        # Primeiro frame do menu antes de iniciar o mixer e a música
+        self.menu.draw()
+        startup_trace.mark_first_frame()
+        if self.show_startup_trace:
+            print(startup_trace.report())
+        if self.async_loop:
+            import asyncio
+            asyncio.run(self._run_async())
+        else:
+            while self._frame(self.relogio.tick(self._frame_rate()) / 1000.0):
+                pass
+            self._finish_background_work()
+        self._unload_level()
+        if self.show_asset_report:
+            print(assets.report())
+        if self.recorder:
+            display.remove_present_hook(self.recorder.capture)
+            self.recorder.close()
+            print(f"Captura: {self.recorder.written} frames gravados, {self.recorder.dropped} descartados")
+        if self.input_latency:
+            display.remove_present_hook(self.input_latency.on_present)
+            self.input_latency.close()
+            print(self.input_latency.report())
+        if self.quality_governor:
+            self.quality_governor.close()
+            print(f"Qualidade: nível final '{self.quality_governor.settings['name']}', "
+                  f"{self.quality_governor.changes} trocas")
+        if self.hitch_detector:
+            self.hitch_detector.close()
+            print(f"Travadas: {self.hitch_detector.hitches} em {self.hitch_detector.frames} frames "
+                  f"(pior {self.hitch_detector.worst_ms:.1f} ms)")
+        if self.shared_assets:
+            assets.use_shared_pool(None)
+            self.shared_assets.close()
+        display.close()
         pygame.quit()
 
+    async def _run_async(self):
+        """O mesmo loop de `_frame`, com a espera entre frames feita pelo FrameScheduler."""
+        from .frame_scheduler import FrameScheduler
+        self.scheduler = FrameScheduler()
+        self.score_manager.background = self.scheduler.run_in_background
+        self._prefetch_level(1)
+        try:
+            while self._frame(await self.scheduler.tick(self._frame_rate()) / 1000.0):
+                pass
+        finally:
+            self._finish_background_work()
+            self.score_manager.background = None
+            await self.scheduler.drain()
+            self.scheduler.close()
+            self.scheduler = None
+
+    def _frame(self, delta_time):
+        """Um frame do estado atual do jogo. Retorna False quando o jogo deve fechar."""
+        hitch = self.hitch_detector
+        if hitch is None:
+            return self._state_frame(delta_time)
+        hitch.begin_frame()
+        running = self._state_frame(delta_time)
+        if self.in_background:
+            # A espera por eventos em segundo plano não é uma travada
+            hitch.cancel_frame()
+        else:
+            hitch.end_frame()
+        return running
+
+    def _mark(self, phase):
+        if self.hitch_detector is not None:
+            self.hitch_detector.mark(phase)
+
+    def _state_frame(self, delta_time):
+        self._track_window_events(pygame.event.get(WINDOW_STATE_EVENTS))
+        if self.in_background and self.game_state != const.GAME_STATE_QUIT:
+            self._background_frame()
+            if self.metrics_log:
+                self._collect_metrics()
+            return True
+        self._update_profiler()
+        if self._resumed:
+            # O tempo em segundo plano não conta para a simulação
+            delta_time = min(delta_time, 1.0 / const.FPS)
+            self._resumed = False
+        self._handle_music()
+        self._mark("music")
+        state = self.game_state
+        if state == const.GAME_STATE_MENU:
+            self.player_current_lives = const.PLAYER_LIVES_START
+            self.score_manager.reset()
+            action = self.menu.frame()
+            if action == "start_game":
+                self.game_state = const.GAME_STATE_PLAYING
+                self.endless_mode = False
+                self._load_level(1)
+            elif action == "start_endless":
+                self.game_state = const.GAME_STATE_PLAYING
+                self.endless_mode = True
+                self._load_endless_level()
+            elif action == "quit":
+                self.game_state = const.GAME_STATE_QUIT
+        elif self.game_state == const.GAME_STATE_PLAYING:
+            action = self.level.frame(delta_time)
+            if action == "quit":
+                self._unload_level()
+                self.game_state = const.GAME_STATE_QUIT
+            elif action == "level_complete":
+                self.player_current_lives = self.level.player.lives
+                self.current_level_number += 1
+                if self.current_level_number > const.MAX_GAME_LEVELS:
+                    self._unload_level()
+                    self.game_state = const.GAME_STATE_GAME_OVER_WIN
+                    self.score_manager.save_current_score_if_high()
+                else:
+                    self._load_level(self.current_level_number)
+            elif action == const.GAME_STATE_GAME_OVER_LOSE:
+                if self.endless_mode:
+                    self._endless_best_score = max(self._endless_best_score or 0,
+                                                   self.score_manager.get_current_score())
+                self.game_state = const.GAME_STATE_GAME_OVER_LOSE
+        elif self.game_state == const.GAME_STATE_GAME_OVER_WIN:
+            self._draw_win_screen()
+            for event in pygame.event.get():
+                if event.type in (pygame.QUIT, pygame.WINDOWCLOSE): self.game_state = const.GAME_STATE_QUIT
+                if event.type == pygame.KEYDOWN and (event.key == pygame.K_RETURN or event.key == pygame.K_ESCAPE):
+                    self.game_state = const.GAME_STATE_MENU
+        elif self.game_state == const.GAME_STATE_GAME_OVER_LOSE:
+            self._draw_lose_screen()
+            for event in pygame.event.get():
+                if event.type in (pygame.QUIT, pygame.WINDOWCLOSE): self.game_state = const.GAME_STATE_QUIT
+                if event.type == pygame.KEYDOWN and event.key == pygame.K_r and self._level_checkpoint:
+                    self.level.restore(self._level_checkpoint)
+                    self.game_state = const.GAME_STATE_PLAYING
+                elif event.type == pygame.KEYDOWN and (event.key == pygame.K_RETURN or event.key == pygame.K_ESCAPE):
+                    self._save_endless_score()
+                    self._unload_level()
+                    self.game_state = const.GAME_STATE_MENU
+        elif self.game_state == const.GAME_STATE_QUIT:
+            self._save_endless_score()
+            return False
+        self._mark(state)
+        if self.metrics_log:
+            self._collect_metrics()
+            self._mark("metrics")
+        return True
+
     def _draw_win_screen(self):
         self.tela.blit(self.win_background_image, (0, 0)) if self.win_background_image else self.tela.fill(const.BLACK_COLOR)
         win_text = self.menu.translations[self.menu.current_language].get("win_message", const.WIN_TEXT_EN)
-        win_surface = self.menu.font.render(win_text, True, const.WHITE_COLOR)
+        win_surface = self.menu.render_text(self.menu.font, win_text, const.WHITE_COLOR)
         self.tela.blit(win_surface, win_surface.get_rect(center=(const.SCREEN_WIDTH / 2, 100)))
         final_score_text = f"Seu Score Final: {self.score_manager.get_current_score()} abates"
-        final_score_surface = self.menu.font.render(final_score_text, True, const.YELLOW_COLOR)
+        final_score_surface = self.menu.render_text(self.menu.font, final_score_text, const.YELLOW_COLOR)
         self.tela.blit(final_score_surface, final_score_surface.get_rect(center=(const.SCREEN_WIDTH / 2, 180)))
         y_pos = 250
-        ranking_font = pygame.font.Font(self.gothic_font_path, 32)
-        title_surface = ranking_font.render("High Scores:", True, const.WHITE_COLOR)
+        if self._ranking_font is None:
+            self._ranking_font = assets.load_font(self.gothic_font_name, 32)
+        ranking_font = self._ranking_font
+        title_surface = self.menu.render_text(ranking_font, "High Scores:", const.WHITE_COLOR)
         self.tela.blit(title_surface, title_surface.get_rect(center=(const.SCREEN_WIDTH / 2, y_pos)))
         y_pos += 40
         for i, score_entry in enumerate(self.score_manager.get_high_scores()[:5]):
             score_text = f"{i + 1}. {score_entry['score']} abates"
-            score_surface = ranking_font.render(score_text, True, const.WHITE_COLOR)
+            score_surface = self.menu.render_text(ranking_font, score_text, const.WHITE_COLOR)
             self.tela.blit(score_surface, score_surface.get_rect(center=(const.SCREEN_WIDTH / 2, y_pos)))
             y_pos += 35
-        pygame.display.flip()
-        self.relogio.tick(const.FPS)
+        display.present(self.tela)
 
     def _draw_lose_screen(self):
         self.tela.blit(self.lose_background_image, (0, 0)) if self.lose_background_image else self.tela.fill(const.BLACK_COLOR)
         text = self.menu.translations[self.menu.current_language].get("game_over_message", const.GAME_OVER_TEXT_EN)
-        text_surface = self.menu.font.render(text, True, const.WHITE_COLOR)
+        text_surface = self.menu.render_text(self.menu.font, text, const.WHITE_COLOR)
         self.tela.blit(text_surface, text_surface.get_rect(center=(const.SCREEN_WIDTH / 2, const.SCREEN_HEIGHT / 2)))
-        pygame.display.flip()
-        self.relogio.tick(const.FPS)
\ No newline at end of file
+        if self._level_checkpoint:
+            hint = self.menu.translations[self.menu.current_language].get("retry_hint", "")
+            hint_surface = self.menu.render_text(self.menu.info_font, hint, const.WHITE_COLOR)
+            self.tela.blit(hint_surface, hint_surface.get_rect(center=(const.SCREEN_WIDTH / 2, const.SCREEN_HEIGHT / 2 + 60)))
+        display.present(self.tela)
@@ -0,0 +1,240 @@
+"""
+Detector de travadas (hitches): frames isolados muito longos que a média de FPS esconde (carregar a
+música, uma passada do GC, gravar um JSON). Cada frame é dividido em fases marcadas pelo loop
+(`mark`); quando o intervalo entre o fim do frame anterior e o fim deste passa de `threshold` vezes o
+orçamento, o frame vira um registro com os tempos das fases, as coletas do GC durante ele, o contexto
+do jogo (estado, contagem de entidades) e a pilha Python da thread principal amostrada no meio do frame.
+
+Uma thread vigia cada frame: se ele ainda não terminou quando passa do limite, ela copia a pilha da
+thread principal com `sys._current_frames()` (no ponto em que o frame está preso: I/O, SDL, sleep) e
+grava os registros prontos no disco, fora do frame. O log é um anel de tamanho fixo: `HITCH_LOG_SLOTS`
+linhas de `HITCH_LOG_SLOT_BYTES` bytes, a mais antiga sobrescrita primeiro; leia com
+`python -m code.hitch ARQUIVO`.
+"""
+import argparse
+import gc
+import json
+import os
+import sys
+import threading
+import time
+from collections import deque
+
+from . import const, instrumentation
+
+
+def _stack(frame):
+    """Pilha da raiz para a folha como 'arquivo:linha função'."""
+    lines = []
+    while frame is not None:
+        code = frame.f_code
+        lines.append(f"{os.path.basename(code.co_filename)}:{frame.f_lineno} {code.co_name}")
+        frame = frame.f_back
+    lines.reverse()
+    return lines
+
+
+class HitchLog:
+    """Anel de registros JSON em posições fixas de um arquivo; continua do mais recente ao reabrir."""
+
+    def __init__(self, path, slots=const.HITCH_LOG_SLOTS, slot_bytes=const.HITCH_LOG_SLOT_BYTES):
+        self.path = path
+        self.slots = slots
+        self.slot_bytes = slot_bytes
+        records = read_log(path) if os.path.exists(path) else []
+        self.next_seq = records[-1]["seq"] + 1 if records else 0
+        mode = "r+b" if os.path.exists(path) else "w+b"
+        self._file = open(path, mode)
+
+    def _encode(self, record):
+        data = json.dumps(record, separators=(",", ":"), default=str).encode()
+        stack = record.get("stack")
+        while len(data) >= self.slot_bytes and stack:
+            # Corta o meio da pilha: a raiz (loop) e a folha (onde travou) são as partes úteis
+            del stack[len(stack) // 2]
+            record["stack_truncated"] = True
+            data = json.dumps(record, separators=(",", ":"), default=str).encode()
+        if len(data) >= self.slot_bytes:
+            data = json.dumps({"seq": record["seq"], "frame_ms": record.get("frame_ms"), "truncated": True}).encode()
+        return data + b" " * (self.slot_bytes - len(data) - 1) + b"\n"
+
+    def write(self, record):
+        record["seq"] = self.next_seq
+        self.next_seq += 1
+        self._file.seek((record["seq"] % self.slots) * self.slot_bytes)
+        self._file.write(self._encode(record))
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+def read_log(path):
+    """Registros de um log de travadas, do mais antigo para o mais recente."""
+    records = []
+    with open(path, "rb") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    continue
+    records.sort(key=lambda record: record.get("seq", -1))
+    return records
+
+
+class HitchDetector:
+    """
+    O loop chama `begin_frame()` no início do trabalho do frame, `mark(fase)` ao fim de cada fase e
+    `end_frame()` no fim (ou `cancel_frame()` para um frame que não conta, ex. em segundo plano).
+    O tempo desde o fim do frame anterior até `begin_frame` fica na fase "wait" (espera do relógio).
+    `context()` é chamado só quando há travada e deve devolver um dict curto (estado, contagens).
+    """
+
+    def __init__(self, path, threshold=const.HITCH_THRESHOLD, budget_ms=1000.0 / const.FPS, context=None,
+                 slots=const.HITCH_LOG_SLOTS, slot_bytes=const.HITCH_LOG_SLOT_BYTES):
+        self.log = HitchLog(path, slots, slot_bytes)
+        self.threshold = threshold
+        self.budget_ms = budget_ms
+        self.context = context
+        self.frames = 0
+        self.hitches = 0
+        self.worst_ms = 0.0
+        self._limit = threshold * budget_ms / 1000.0
+        self._thread_id = threading.get_ident()
+        self._frame_id = 0
+        self._frame_start = None
+        self._previous_end = None
+        self._last_mark = 0.0
+        self._phases = {}
+        self._sampled = None
+        self._gc_start = None
+        self._gc = [0, 0, 0, 0.0, 0]
+        self._pending = deque()
+        self._stop = threading.Event()
+        gc.callbacks.append(self._on_gc)
+        self._watchdog = threading.Thread(target=self._run, name="HitchDetector", daemon=True)
+        self._watchdog.start()
+        instrumentation.register_provider("hitch", self.stats)
+
+    def _on_gc(self, phase, info):
+        if phase == "start":
+            self._gc_start = time.perf_counter()
+        elif self._gc_start is not None:
+            tally = self._gc
+            tally[info["generation"]] += 1
+            tally[3] += time.perf_counter() - self._gc_start
+            tally[4] += info["collected"]
+            self._gc_start = None
+
+    def begin_frame(self):
+        now = time.perf_counter()
+        self._phases = {"wait": now - self._previous_end} if self._previous_end is not None else {}
+        self._gc = [0, 0, 0, 0.0, 0]
+        self._sampled = None
+        self._last_mark = now
+        self._frame_start = now
+        self._frame_id += 1
+
+    def mark(self, phase):
+        """Soma à fase `phase` o tempo desde a marca anterior (ou o início do frame)."""
+        now = time.perf_counter()
+        phases = self._phases
+        phases[phase] = phases.get(phase, 0.0) + now - self._last_mark
+        self._last_mark = now
+
+    def cancel_frame(self):
+        self._frame_start = None
+        self._previous_end = None
+
+    def end_frame(self):
+        start = self._frame_start
+        if start is None:
+            return
+        now = time.perf_counter()
+        self._frame_start = None
+        self.frames += 1
+        phases = self._phases
+        if now - self._last_mark > 0.0:
+            phases["other"] = phases.get("other", 0.0) + now - self._last_mark
+        frame_ms = (now - start + phases.get("wait", 0.0)) * 1000.0
+        self._previous_end = now
+        if frame_ms <= self.threshold * self.budget_ms:
+            return
+        self.hitches += 1
+        self.worst_ms = max(self.worst_ms, frame_ms)
+        gen0, gen1, gen2, gc_seconds, collected = self._gc
+        record = {
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "frame_ms": round(frame_ms, 3),
+            "budget_ms": round(self.budget_ms, 3),
+            "phases_ms": {phase: round(seconds * 1000.0, 3) for phase, seconds in phases.items()},
+            "gc": {"collections": [gen0, gen1, gen2], "ms": round(gc_seconds * 1000.0, 3), "collected": collected,
+                   "counts": list(gc.get_count())},
+            "stack_at_ms": None,
+            "stack": None,
+        }
+        sampled = self._sampled
+        if sampled is not None and sampled[0] == self._frame_id:
+            record["stack_at_ms"] = round(sampled[1] * 1000.0, 3)
+            record["stack"] = sampled[2]
+        if self.context is not None:
+            record.update(self.context())
+        self._pending.append(record)
+
+    def _run(self):
+        """Vigia: amostra a pilha do frame que passou do limite e grava os registros pendentes."""
+        while not self._stop.is_set():
+            start, frame_id = self._frame_start, self._frame_id
+            if start is None or (self._sampled is not None and self._sampled[0] == frame_id):
+                self._stop.wait(self._limit)
+            else:
+                remaining = start + self._limit - time.perf_counter()
+                if remaining > 0:
+                    self._stop.wait(remaining)
+                elif frame_id == self._frame_id:
+                    frame = sys._current_frames().get(self._thread_id)
+                    self._sampled = (frame_id, time.perf_counter() - start, _stack(frame))
+                    del frame
+            self._write_pending()
+        self._write_pending()
+
+    def _write_pending(self):
+        while self._pending:
+            self.log.write(self._pending.popleft())
+
+    def stats(self):
+        return {"frames": self.frames, "hitches": self.hitches, "worst_ms": self.worst_ms}
+
+    def close(self):
+        self._stop.set()
+        self._watchdog.join()
+        gc.callbacks.remove(self._on_gc)
+        self.log.close()
+        instrumentation.unregister_provider("hitch")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m code.hitch", description="Mostra um log de travadas.")
+    parser.add_argument("path")
+    parser.add_argument("--last", type=int, default=10, help="quantos registros mostrar (os mais recentes)")
+    args = parser.parse_args(argv)
+    records = read_log(args.path)
+    print(f"{len(records)} travadas no log")
+    for record in records[-args.last:]:
+        phases = ", ".join(f"{phase} {ms:.1f}" for phase, ms in
+                           sorted(record.get("phases_ms", {}).items(), key=lambda item: -item[1]))
+        print(f"#{record['seq']} {record.get('time', '')} {record.get('frame_ms', 0):.1f} ms "
+              f"(orçamento {record.get('budget_ms', 0):.1f}) {record.get('state', '')}")
+        print(f"  fases ms: {phases}")
+        gc_info = record.get("gc") or {}
+        if gc_info.get("ms"):
+            print(f"  gc: {gc_info['ms']:.1f} ms, coletas por geração {gc_info['collections']}")
+        for line in (record.get("stack") or [])[-8:]:
+            print(f"    {line}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,69 @@
+"""
+Mede a latência de entrada: do momento em que um evento de tecla é lido da fila até o primeiro
+frame apresentado que já reflete esse evento.
+"""
+import time
+from collections import deque
+
+import pygame
+
+from . import instrumentation
+
+TRACKED_KEYS = (pygame.K_LEFT, pygame.K_RIGHT, pygame.K_UP, pygame.K_SPACE)
+
+
+def percentile(sorted_values, fraction):
+    """Percentil por posição mais próxima de uma lista já ordenada."""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+class InputLatencyTracker:
+    """
+    `on_event` carimba cada KEYDOWN das teclas rastreadas; `frame_captured` marca que o estado do
+    jogo já incorporou esses eventos (chamado quando a lista de desenho do frame é montada); o hook
+    de apresentação `on_present` fecha a medição. O pygame não expõe o timestamp do SDL nos eventos,
+    então o carimbo é do momento da leitura da fila: o tempo que o evento esperou na fila antes disso
+    (em média meio frame) não entra na medida.
+    """
+
+    def __init__(self, keys=TRACKED_KEYS, capacity=4096):
+        self.keys = frozenset(keys)
+        self.samples = deque(maxlen=capacity)
+        self._pending = []
+        self._in_flight = []
+        instrumentation.register_provider("input_latency", self.stats)
+
+    def on_event(self, event):
+        if event.type == pygame.KEYDOWN and event.key in self.keys:
+            self._pending.append(time.perf_counter())
+
+    def frame_captured(self):
+        if self._pending:
+            self._in_flight.extend(self._pending)
+            self._pending.clear()
+
+    def on_present(self, _surface):
+        if self._in_flight:
+            now = time.perf_counter()
+            self.samples.extend(now - stamp for stamp in self._in_flight)
+            self._in_flight.clear()
+
+    def stats(self):
+        """Percentis da latência, em milissegundos."""
+        ordered = sorted(self.samples)
+        return {"count": len(ordered),
+                "p50_ms": percentile(ordered, 0.50) * 1000.0,
+                "p95_ms": percentile(ordered, 0.95) * 1000.0,
+                "p99_ms": percentile(ordered, 0.99) * 1000.0,
+                "max_ms": (ordered[-1] if ordered else 0.0) * 1000.0}
+
+    def report(self):
+        stats = self.stats()
+        return (f"Latência de entrada ({stats['count']} eventos): p50 {stats['p50_ms']:.1f} ms, "
+                f"p95 {stats['p95_ms']:.1f} ms, p99 {stats['p99_ms']:.1f} ms, máx {stats['max_ms']:.1f} ms")
+
+    def close(self):
+        instrumentation.unregister_provider("input_latency")
@@ -0,0 +1,52 @@
+"""
+Registro central de métricas de desempenho.
+Módulos publicam contadores e medidores aqui; quem quiser inspecionar (overlay, log, testes)
+lê tudo de uma vez com `snapshot()`.
+"""
+_counters = {}
+_gauges = {}
+_providers = {}
+
+
+def incr(name, amount=1):
+    """Incrementa um contador."""
+    _counters[name] = _counters.get(name, 0) + amount
+
+
+def set_gauge(name, value):
+    """Define o valor atual de um medidor."""
+    _gauges[name] = value
+
+
+def register_provider(name, provider):
+    """Registra uma função sem argumentos que retorna um dict de métricas, lida a cada snapshot."""
+    _providers[name] = provider
+
+
+def unregister_provider(name):
+    _providers.pop(name, None)
+
+
+def snapshot():
+    """Retorna um dict com todos os contadores, medidores e métricas dos provedores."""
+    data = dict(_counters)
+    data.update(_gauges)
+    for name, provider in list(_providers.items()):
+        for key, value in provider().items():
+            data[f"{name}.{key}"] = value
+    return data
+
+
+def reset():
+    """Limpa todas as métricas registradas."""
+    _counters.clear()
+    _gauges.clear()
+    _providers.clear()
+
+
+def append_jsonl(path, records):
+    """Acrescenta registros (dicts) a um arquivo JSON Lines. Feito para rodar fora do frame."""
+    import json
+    with open(path, "a") as f:
+        for record in records:
+            f.write(json.dumps(record, default=str) + "\n")
@@ -1,43 +1,81 @@
 import pygame
-import os
 import random
-from . import const
+import time
+from . import assets, const, display, surface_memory
+from .animation import AnimationClock
 from .player import Player
-from .enemy import Enemy1, Enemy2, Enemy3
+from .enemy import Enemy1, Enemy2, Enemy3, EnemyPool, ENEMY_ARCHETYPES
 from .entity_mediator import EntityMediator
+from .parallax import BackgroundCompositor
+from .snapshot import SnapshotRing, capture as capture_snapshot, restore as restore_snapshot
+from .tiled_background import TileStreamer, load_manifest
 from .score import ScoreManager
 
 class Level:
     def __init__(self, screen, bg_prefix, bg_count, bg_start_index, level_actual_width, player_lives,
-                 score_manager: ScoreManager):
+                 score_manager: ScoreManager, seed=None, pipelined=False,
+                 late_latch=False, input_latency=None, rewind_seconds=0,
+                 quality_governor=None, hitch_detector=None):
         self.screen = screen
         self.screen_width, self.screen_height = self.screen.get_size()
         self.level_width = level_actual_width
 
-        self.player = Player((const.PLAYER_START_X, const.PLAYER_START_Y), starting_lives=player_lives)
-        self.enemies = pygame.sprite.Group()
-        self.enemy_shots = pygame.sprite.Group()
+        # Um relógio de animação para o nível: avançado uma vez por passo, lido por todas as entidades
+        self.animations = AnimationClock()
+        self.player = Player((const.PLAYER_START_X, const.PLAYER_START_Y), starting_lives=player_lives,
+                             animations=self.animations)
+        self.enemies = EnemyPool(self.animations)
+        self.enemy_shots = self.enemies.shots
         self.score_manager = score_manager
+        self.rng = random.Random(seed)
 
         self.enemy_spawn_timer = 0.0
-        self.next_spawn_time = random.uniform(const.ENEMY_SPAWN_INTERVAL_MIN, const.ENEMY_SPAWN_INTERVAL_MAX)
+        self.next_spawn_time = self.rng.uniform(const.ENEMY_SPAWN_INTERVAL_MIN, const.ENEMY_SPAWN_INTERVAL_MAX)
         self.camera_offset_x = 0
+        # A composição em paralelo só vale para o backend de Surface (blits que liberam o GIL)
+        self.pipelined = pipelined and isinstance(screen, pygame.Surface)
+        # Lê o teclado só depois da parte da simulação que não depende da entrada
+        self.late_latch = late_latch
+        self.input_latency = input_latency
+        # Com rewind ligado, guarda um snapshot por frame; BACKSPACE volta um segundo
+        self.rewind_buffer = SnapshotRing(rewind_seconds) if rewind_seconds > 0 else None
+        self._lives_text = None
+        self._lives_text_value = None
+        # Governador opcional: mede o trabalho de cada frame e reduz o custo de desenho quando estoura o orçamento
+        self.quality_governor = quality_governor
+        self._compositor = None
+        self._pending_draws = None
+        # Detector de travadas opcional: cada frame marca o fim das fases de simulação, desenho e apresentação
+        self.hitch_detector = hitch_detector
 
         self._load_assets(bg_prefix, bg_count, bg_start_index)
+        self.apply_quality(quality_governor.settings if quality_governor is not None else None)
 
     def _load_assets(self, bg_prefix, bg_count, bg_start_index):
-        base_dir = os.path.dirname(os.path.abspath(__file__))
-        asset_dir = os.path.join(base_dir, '..', 'asset')
+        """
+        Cada camada de parallax é uma imagem só (`lvl1bg1.png`, escalada inteira para a altura da tela)
+        ou, se existir `lvl1bg1/tiles.json`, uma camada em blocos carregados sob demanda pelo TileStreamer.
+        """
         self.parallax_layers = []
+        self.tile_streamer = None
         scroll_factors = [0.15, 0.3, 0.45, 0.6, 0.75, 0.9, 1.0][:bg_count]
         for i in range(bg_start_index, bg_start_index + bg_count):
-            path = os.path.join(asset_dir, f'{bg_prefix}{i}.png')
+            layer = {'image': None, 'tiles': None, 'scroll_factor': scroll_factors[i - bg_start_index], 'phase': 0.0}
             try:
-                img = pygame.image.load(path).convert_alpha()
-                sw = int(img.get_width() * (self.screen_height / img.get_height()))
-                img = pygame.transform.scale(img, (sw, self.screen_height))
-                self.parallax_layers.append({'image': img, 'scroll_factor': scroll_factors[i - bg_start_index]})
+                manifest = load_manifest(f'{bg_prefix}{i}')
+                if manifest is not None:
+                    if self.tile_streamer is None:
+                        self.tile_streamer = TileStreamer(self.screen_width)
+                    layer['tiles'] = self.tile_streamer.open_layer(f'{bg_prefix}{i}', manifest, self.screen_height)
+                    layer['width'] = layer['tiles'].width
+                else:
+                    layer['image'] = surface_memory.track(
+                        surface_memory.CATEGORY_PARALLAX,
+                        assets.load_image(f'{bg_prefix}{i}.png', height=self.screen_height))
+                    layer['width'] = layer['image'].get_width()
+                self.parallax_layers.append(layer)
             except Exception:
+                self._close_tiles()
                 self.parallax_layers.clear()
                 break
 
@@ -45,17 +83,81 @@ class Level:
             self.fallback_bg_color = const.BLUE_SKY_COLOR
 
         try:
-            img = pygame.image.load(os.path.join(asset_dir, 'lifeplayer.PNG')).convert_alpha()
-            self.heart_image = pygame.transform.scale(img, (30, 25))
-        except pygame.error:
+            self.heart_image = assets.load_image('lifeplayer.png', (30, 25))
+        except (pygame.error, FileNotFoundError):
             self.heart_image = pygame.Surface((30, 25), pygame.SRCALPHA)
             self.heart_image.fill(const.RED_COLOR)
+        surface_memory.track(surface_memory.CATEGORY_UI, self.heart_image)
 
         try:
-            self.font = pygame.font.Font(os.path.join(asset_dir, f'{const.FONT_NAME}.ttf'), 24)
+            self.font = assets.load_font(f'{const.FONT_NAME}.ttf', 24)
         except Exception:
             self.font = pygame.font.Font(None, 24)
 
+    def _close_tiles(self):
+        if self.tile_streamer is not None:
+            self.tile_streamer.close()
+            self.tile_streamer = None
+
+    def snapshot(self):
+        """Estado completo do nível como bytes compactos (sem superfícies; assets referenciados por tipo)."""
+        return capture_snapshot(self)
+
+    def restore(self, blob):
+        """Volta ao estado de um `snapshot()` deste nível, sem recarregar nenhum asset."""
+        self._wait_compositor()
+        restore_snapshot(self, blob)
+
+    def _snapshot_extra(self):
+        """Bytes de estado próprios de subclasses, anexados ao fim do snapshot."""
+        return b""
+
+    def _restore_extra(self, data):
+        pass
+
+    def unload(self):
+        """
+        Libera já tudo o que o nível carregou (camadas de parallax, HUD, fonte, inimigos e tiros),
+        em vez de esperar o GC coletar o nível antigo. O nível não deve ser usado depois disso.
+        """
+        self.end_frames()
+        self.enemies.empty()
+        self.player.shots_group.empty()
+        if self.rewind_buffer is not None:
+            self.rewind_buffer.clear()
+        for layer in self.parallax_layers:
+            surface_memory.release(layer['image'])
+        self._close_tiles()
+        self.parallax_layers = []
+        self.fallback_bg_color = const.BLUE_SKY_COLOR
+        surface_memory.release(self.heart_image)
+        surface_memory.release(self._lives_text)
+        self.heart_image = None
+        self._lives_text = None
+        self._lives_text_value = None
+        self.font = None
+        self.visible_layers = []
+
+    def apply_quality(self, settings):
+        """
+        Aplica um nível de `quality.QUALITY_LEVELS` (None = qualidade máxima). As camadas descartadas
+        são as mais distantes logo acima do céu; a camada de base e o primeiro plano continuam.
+        A lista de camadas é trocada, não alterada, porque a thread do modo pipelined pode estar lendo a antiga.
+        """
+        drop = settings["parallax_drop"] if settings else 0
+        layers = self.parallax_layers
+        self.visible_layers = layers[:1] + layers[1 + drop:] if drop else list(layers)
+        self.player.shot_animation.paused = not settings["shot_animation"] if settings else False
+        scale = 1.0 / settings["animation_rate"] if settings else 1.0
+        for archetype in ENEMY_ARCHETYPES.values():
+            self.animations.animation(archetype.animation_prefix, archetype.animation_speed).scale = scale
+
+    def _record_frame_time(self, frame_start):
+        """Passa ao governador o tempo de trabalho do frame e aplica o novo nível se ele mudou."""
+        governor = self.quality_governor
+        if governor.record((time.perf_counter() - frame_start) * 1000.0):
+            self.apply_quality(governor.settings)
+
     def _update_camera(self):
         target_x = self.player.rect.centerx - self.screen_width // 2
         self.camera_offset_x = max(0, min(target_x, self.level_width - self.screen_width))
@@ -63,80 +165,208 @@ class Level:
         self.player.rect.right = min(self.camera_offset_x + self.screen_width, self.player.rect.right)
 
     def _spawn_enemy(self):
-        enemy_class = random.choice([Enemy1, Enemy2, Enemy3])
+        enemy_class = self.rng.choice([Enemy1, Enemy2, Enemy3])
         spawn_x = self.camera_offset_x + self.screen_width + const.ENEMY_SPAWN_X_OFFSET
         new_enemy = enemy_class((spawn_x, const.ENEMY_START_Y))
         self.enemies.add(new_enemy)
 
-    def _draw_elements(self):
-        self.screen.fill(self.fallback_bg_color if not self.parallax_layers else const.BLACK_COLOR)
-        if self.parallax_layers:
-            for layer in self.parallax_layers:
-                scroll = self.camera_offset_x * layer['scroll_factor']
-                img_width = layer['image'].get_width()
+    def _draw_background(self, camera_offset_x):
+        """Preenche a tela e desenha as camadas de parallax para a posição de câmera dada."""
+        visible_layers = self.visible_layers
+        self.screen.fill(self.fallback_bg_color if not visible_layers else const.BLACK_COLOR)
+        if visible_layers:
+            for layer in visible_layers:
+                scroll = camera_offset_x * layer['scroll_factor'] + layer['phase']
+                if layer['tiles'] is not None:
+                    layer['tiles'].draw(self.screen, scroll, self.screen_width)
+                    continue
+                img_width = layer['width']
                 x = -(scroll % img_width)
                 while x < self.screen_width:
                     self.screen.blit(layer['image'], (x, 0))
                     x += img_width
 
-        for enemy in self.enemies:
-            enemy.draw(self.screen, self.camera_offset_x)
+    def _collect_sprite_draws(self):
+        """
+        Lista (imagem, posição na tela) de tudo o que vai por cima do fundo: inimigos, tiros,
+        jogador e HUD. Capturar a lista permite desenhar o frame depois que a simulação já avançou.
+        """
+        if self.input_latency:
+            self.input_latency.frame_captured()
+        camera_offset_x = self.camera_offset_x
+        draws = self.enemies.blit_list(camera_offset_x)
         for shot in self.enemy_shots:
-            shot.draw(self.screen, self.camera_offset_x)
-        self.player.draw(self.screen, self.camera_offset_x)
+            draws.append((shot.image, (shot.rect.x - camera_offset_x, shot.rect.y)))
+        draws.append((self.player.image, (self.player.rect.x - camera_offset_x, self.player.rect.y)))
         for shot in self.player.shots_group:
-            shot.draw(self.screen, self.camera_offset_x)
+            draws.append((shot.image, (shot.rect.x - camera_offset_x, shot.rect.y)))
 
         if self.heart_image:
-            self.screen.blit(self.heart_image, (10, 10))
-            lives_text = self.font.render(f"x{self.player.lives}", True, const.WHITE_COLOR)
-            self.screen.blit(lives_text, (10 + self.heart_image.get_width() + 5, 10))
+            draws.append((self.heart_image, (10, 10)))
+            if self._lives_text_value != self.player.lives:
+                surface_memory.release(self._lives_text)
+                self._lives_text = surface_memory.track(surface_memory.CATEGORY_TEXT, self.font.render(
+                    f"x{self.player.lives}", True, const.WHITE_COLOR))
+                self._lives_text_value = self.player.lives
+            draws.append((self._lives_text, (10 + self.heart_image.get_width() + 5, 10)))
+        return draws
 
-        pygame.display.flip()
+    def _draw_elements(self):
+        self._draw_background(self.camera_offset_x)
+        self.screen.blits(self._collect_sprite_draws(), doreturn=False)
+        if self.hitch_detector is not None:
+            self.hitch_detector.mark("draw")
+        display.present(self.screen)
+        if self.hitch_detector is not None:
+            self.hitch_detector.mark("present")
 
-    def run(self, clock):
-        while True:
-            delta_time = clock.tick(const.FPS) / 1000.0
+    def step(self, delta_time, keys=None):
+        """
+        Avança a simulação do nível em um passo, sem desenhar nada.
+        Retorna "level_complete", GAME_STATE_GAME_OVER_LOSE ou None se o nível continua.
+        """
+        if keys is None:
+            keys = pygame.key.get_pressed()
+        self._step_world(delta_time)
+        return self._step_player(delta_time, keys)
 
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT or (event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE):
-                    return "quit"
-                self.player.handle_event(event)
+    def _step_world(self, delta_time):
+        """Parte da simulação que não depende da entrada: relógio de animação, surgimento e movimento dos inimigos e seus tiros."""
+        if delta_time <= 0:
+            return
+        self.animations.advance(delta_time)
+        self.enemy_spawn_timer += delta_time
+        if self.enemy_spawn_timer >= self.next_spawn_time:
+            self._spawn_enemy()
+            self.enemy_spawn_timer = 0.0
+            self.next_spawn_time = self.rng.uniform(const.ENEMY_SPAWN_INTERVAL_MIN,
+                                                    const.ENEMY_SPAWN_INTERVAL_MAX)
+        self.enemies.update(delta_time, self.camera_offset_x, self.screen_width)
 
-            keys = pygame.key.get_pressed()
-            if keys[pygame.K_SPACE]:
-                self.player.shoot()
+    def _step_player(self, delta_time, keys):
+        """Aplica a entrada ao jogador e resolve colisões, pontuação, câmera e fim de nível."""
+        if keys[pygame.K_SPACE]:
+            self.player.shoot()
+
+        if delta_time <= 0:
+            return None
+
+        self.player.update(delta_time, self.camera_offset_x, self.screen_width, keys)
+
+        enemies_before_collision = len(self.enemies)
+        EntityMediator.check_all_collisions(self.player, self.enemies, self.player.shots_group,
+                                            self.enemy_shots)
+
+        kills_this_frame = enemies_before_collision - len(self.enemies)
+        if kills_this_frame > 0:
+            self.score_manager.add_kill(kills_this_frame)
+
+        if self.player.lives <= 0:
+            return const.GAME_STATE_GAME_OVER_LOSE
+
+        self._update_camera()
+
+        if self.player.rect.x >= self.level_width - self.player.rect.width:
+            return "level_complete"
+        return None
+
+    def _handle_events(self):
+        for event in pygame.event.get():
+            if event.type in (pygame.QUIT, pygame.WINDOWCLOSE) or (event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE):
+                return "quit"
+            if self.input_latency:
+                self.input_latency.on_event(event)
+            if self.rewind_buffer is not None and event.type == pygame.KEYDOWN and event.key == pygame.K_BACKSPACE:
+                blob = self.rewind_buffer.rewind(const.FPS)
+                if blob:
+                    self.restore(blob)
+                continue
+            self.player.handle_event(event)
+        return None
 
-            if delta_time > 0:
-                self.enemy_spawn_timer += delta_time
-                if self.enemy_spawn_timer >= self.next_spawn_time:
-                    self._spawn_enemy()
-                    self.enemy_spawn_timer = 0.0
-                    self.next_spawn_time = random.uniform(const.ENEMY_SPAWN_INTERVAL_MIN,
-                                                          const.ENEMY_SPAWN_INTERVAL_MAX)
+    def _advance(self, delta_time):
+        """
+        Lê a entrada e avança um passo. Com late latching, inimigos e tiros inimigos são simulados
+        antes de esvaziar a fila de eventos. Só esse passo, que não depende da entrada, sai do caminho
+        entre a leitura do teclado e a tela; jogador, colisões, câmera, desenho e apresentação dependem
+        da entrada e continuam depois dela, então o ganho fica limitado ao tempo de `_step_world`.
+        """
+        if self.late_latch:
+            self._step_world(delta_time)
+            if self._handle_events():
+                return "quit"
+            action = self._step_player(delta_time, pygame.key.get_pressed())
+        else:
+            if self._handle_events():
+                return "quit"
+            action = self.step(delta_time)
+        if self.rewind_buffer is not None and not action:
+            self.rewind_buffer.push(self.snapshot())
+        return action
 
-                self.player.update(delta_time, self.camera_offset_x, self.screen_width)
+    def frame(self, delta_time):
+        """Um frame do nível: entrada, simulação e desenho. Retorna a ação que encerra o nível, ou None."""
+        if self.pipelined:
+            return self._frame_pipelined(delta_time)
+        frame_start = time.perf_counter()
 
-                enemies_before_collision = len(self.enemies)
-                self.enemies.update(delta_time, self.camera_offset_x, self.screen_width)
+        action = self._advance(delta_time)
+        if self.hitch_detector is not None:
+            self.hitch_detector.mark("simulate")
+        if action:
+            return action
 
-                self.enemy_shots.empty()
-                for enemy in self.enemies:
-                    self.enemy_shots.add(enemy.shots_group.sprites())
+        self._draw_elements()
+        if self.quality_governor is not None:
+            self._record_frame_time(frame_start)
+        return None
 
-                EntityMediator.check_all_collisions(self.player, self.enemies, self.player.shots_group,
-                                                    self.enemy_shots)
+    def _frame_pipelined(self, delta_time):
+        """
+        Frame com o fundo do frame N composto numa thread enquanto a thread principal simula o frame N+1.
+        Depois da simulação, os sprites do frame N (capturados antes dela) são desenhados sobre o fundo
+        pronto e o frame é apresentado. O tempo de frame cai para perto da maior das duas etapas,
+        ao custo de um frame a mais entre a simulação e a tela.
+        """
+        frame_start = time.perf_counter()
+        if self._compositor is None:
+            self._compositor = BackgroundCompositor(self._draw_background)
+            self._pending_draws = None
 
-                kills_this_frame = enemies_before_collision - len(self.enemies)
-                if kills_this_frame > 0:
-                    self.score_manager.add_kill(kills_this_frame)
+        action = self._advance(delta_time)
+        hitch = self.hitch_detector
+        if hitch is not None:
+            hitch.mark("simulate")
 
-                if self.player.lives <= 0:
-                    return const.GAME_STATE_GAME_OVER_LOSE
+        if self._pending_draws is not None:
+            self._compositor.wait()
+            if hitch is not None:
+                hitch.mark("compose_wait")
+            self.screen.blits(self._pending_draws, doreturn=False)
+            display.present(self.screen)
+            if hitch is not None:
+                hitch.mark("present")
+        if action:
+            self.end_frames()
+            return action
 
-                self._update_camera()
+        self._pending_draws = self._collect_sprite_draws()
+        self._compositor.submit(self.camera_offset_x)
+        if self.quality_governor is not None:
+            self._record_frame_time(frame_start)
+        return None
 
-                if self.player.rect.x >= self.level_width - self.player.rect.width:
-                    return "level_complete"
+    def _wait_compositor(self):
+        """
+        No modo pipelined, espera a composição do fundo em andamento antes de mudar o que ela lê além da
+        câmera (a fase das camadas): senão o fundo daquele frame mistura a câmera antiga com a fase nova.
+        """
+        if self._compositor is not None:
+            self._compositor.wait()
 
-            self._draw_elements()
\ No newline at end of file
+    def end_frames(self):
+        """Encerra a thread de composição do modo pipelined, se houver; o próximo `frame()` cria outra."""
+        if self._compositor is not None:
+            self._compositor.close()
+            self._compositor = None
+            self._pending_draws = None
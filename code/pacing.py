@@ -0,0 +1,44 @@
+"""
+Políticas de espera entre frames. `FramePacer` tem a mesma interface de `pygame.time.Clock`
+(`tick(framerate)` retorna os milissegundos desde o último tick), então pode substituí-lo no loop.
+"""
+import time
+
+import pygame
+
+PACING_SLEEP = "sleep"
+PACING_BUSY = "busy"
+PACING_HYBRID = "hybrid"
+PACING_POLICIES = (PACING_SLEEP, PACING_BUSY, PACING_HYBRID)
+
+
+class FramePacer:
+    """
+    sleep:  `Clock.tick`, dorme com SDL_Delay (menos CPU, acorda com atraso de alguns ms).
+    hybrid: `Clock.tick_busy_loop`, dorme a maior parte e gira só no final (preciso, CPU moderada).
+    busy:   gira em `perf_counter` até o prazo (mais preciso, ocupa um núcleo inteiro).
+    """
+
+    def __init__(self, policy=PACING_SLEEP):
+        if policy not in PACING_POLICIES:
+            raise ValueError(f"Política de frame pacing desconhecida: '{policy}'.")
+        self.policy = policy
+        self._clock = pygame.time.Clock()
+        self._last_tick = None
+
+    def tick(self, framerate=0):
+        if self.policy == PACING_SLEEP:
+            return self._clock.tick(framerate)
+        if self.policy == PACING_HYBRID:
+            return self._clock.tick_busy_loop(framerate)
+        now = time.perf_counter()
+        if self._last_tick is None:
+            self._last_tick = now
+            return 0.0
+        if framerate:
+            deadline = self._last_tick + 1.0 / framerate
+            while now < deadline:
+                now = time.perf_counter()
+        elapsed_ms = (now - self._last_tick) * 1000.0
+        self._last_tick = now
+        return elapsed_ms
@@ -0,0 +1,50 @@
+import queue
+import threading
+
+
+class BackgroundCompositor:
+    """
+    Compõe o fundo (parallax) numa thread auxiliar.
+    `submit(camera_offset_x)` dispara a composição e retorna na hora; `wait()` bloqueia até o
+    fundo estar pronto. Enquanto isso a thread principal pode simular o próximo frame: os blits
+    do pygame liberam o GIL, então as duas etapas rodam de fato em paralelo em máquinas multi-core.
+    """
+
+    def __init__(self, draw_background):
+        self._draw_background = draw_background
+        self._requests = queue.Queue(maxsize=1)
+        self._done = threading.Event()
+        self._done.set()
+        self._error = None
+        self._thread = threading.Thread(target=self._worker_loop, name="BackgroundCompositor", daemon=True)
+        self._thread.start()
+
+    def _worker_loop(self):
+        while True:
+            camera_offset_x = self._requests.get()
+            if camera_offset_x is None:
+                break
+            try:
+                self._draw_background(camera_offset_x)
+            except Exception as e:
+                self._error = e
+            finally:
+                self._done.set()
+
+    def submit(self, camera_offset_x):
+        """Começa a compor o fundo para a posição de câmera dada. Só pode haver um pedido pendente."""
+        self.wait()
+        self._done.clear()
+        self._requests.put(camera_offset_x)
+
+    def wait(self):
+        """Espera o fundo pedido ficar pronto; repassa qualquer erro da thread auxiliar."""
+        self._done.wait()
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise error
+
+    def close(self):
+        self._done.wait()
+        self._requests.put(None)
+        self._thread.join()
@@ -1,11 +1,19 @@
 import pygame
-import os
-from . import const
+from . import assets, const, surface_memory
+from .animation import AnimationClock
 from .playershot import PlayerShot
 
 class Player(pygame.sprite.Sprite):
-    """Representa o personagem do jogador, controlando seu estado, movimento e ações."""
-    def __init__(self, position, starting_lives=None):
+    """
+    Representa o personagem do jogador, controlando seu estado, movimento e ações.
+    As animações de andar e pular (e a dos tiros) vêm do relógio `animations` do nível; o jogador guarda
+    qual delas está tocando e o passo em que ela começou.
+    """
+    _shared_frames = None
+    _blank_image = None
+    ANIMATION_IDLE, ANIMATION_WALK, ANIMATION_JUMP = 0, 1, 2
+
+    def __init__(self, position, starting_lives=None, animations=None):
         super().__init__()
         self.name = "Player"
         self.speed = const.PLAYER_SPEED
@@ -26,45 +34,66 @@ class Player(pygame.sprite.Sprite):
         self.y_velocity = 0
         self._load_animation_frames()
         self.image = self.idle_image if self.idle_image else pygame.Surface((const.PLAYER_WIDTH, const.PLAYER_HEIGHT), pygame.SRCALPHA)
-        if not self.idle_image: self.image.fill(const.RED_COLOR)
-        self.original_image = self.image
+        if not self.idle_image:
+            self.image.fill(const.RED_COLOR)
+            self.idle_image = self.image
+            self.idle_mask = pygame.mask.from_surface(self.image)
+        self.mask = self.idle_mask
         self.rect = self.image.get_rect(topleft=position)
         self.is_moving = False
-        self.animation_timer = 0.0
-        self.current_frame_index = 0
+
+        animations = animations if animations is not None else AnimationClock()
+        self.walk_animation = animations.animation("playerwalk", const.WALK_ANIMATION_SPEED)
+        self.jump_animation = animations.animation("playerjump", const.JUMP_ANIMATION_SPEED)
+        self.shot_animation = animations.animation("playershot", const.PLAYER_SHOT_ANIMATION_SPEED)
+        self.animation_kind = self.ANIMATION_IDLE
+        self.animation_start = 0
 
     def _load_animation_frames(self):
-        base_dir = os.path.dirname(os.path.abspath(__file__))
-        asset_path = os.path.join(base_dir, '..', 'asset')
+        """Os frames e suas máscaras de colisão são carregados uma vez e compartilhados entre instâncias."""
+        if Player._shared_frames is None:
+            Player._shared_frames = self._build_animation_frames()
+        (self.idle_image, self.idle_mask, self.walk_frames, self.walk_masks,
+         self.jump_frames, self.jump_masks) = Player._shared_frames
+
+    @staticmethod
+    def _build_animation_frames():
         try:
-            img = pygame.image.load(os.path.join(asset_path, 'playerwalk0.png')).convert_alpha()
-            self.idle_image = pygame.transform.scale(img, (const.PLAYER_WIDTH, const.PLAYER_HEIGHT))
-        except pygame.error:
-            self.idle_image = None;
-        self.walk_frames = []
+            idle_image = assets.load_image('playerwalk0.png', (const.PLAYER_WIDTH, const.PLAYER_HEIGHT))
+            idle_mask = pygame.mask.from_surface(idle_image)
+        except (pygame.error, FileNotFoundError):
+            idle_image, idle_mask = None, None
+        walk_frames = []
         for i in range(1, 8):
             try:
-                img = pygame.image.load(os.path.join(asset_path, f'playerwalk{i}.png')).convert_alpha()
-                self.walk_frames.append(pygame.transform.scale(img, (const.PLAYER_WIDTH, const.PLAYER_HEIGHT)))
-            except pygame.error:
+                walk_frames.append(assets.load_image(f'playerwalk{i}.png', (const.PLAYER_WIDTH, const.PLAYER_HEIGHT)))
+            except (pygame.error, FileNotFoundError):
                 continue
-        self.jump_frames = []
+        jump_frames = []
         for i in range(1, 7):
             try:
-                img = pygame.image.load(os.path.join(asset_path, f'pulo{i}.png')).convert_alpha()
-                self.jump_frames.append(pygame.transform.scale(img, (const.PLAYER_WIDTH, const.PLAYER_HEIGHT)))
-            except pygame.error:
+                jump_frames.append(assets.load_image(f'pulo{i}.png', (const.PLAYER_WIDTH, const.PLAYER_HEIGHT)))
+            except (pygame.error, FileNotFoundError):
                 continue
+        surface_memory.track(surface_memory.CATEGORY_SPRITES, idle_image)
+        surface_memory.track_all(surface_memory.CATEGORY_SPRITES, walk_frames + jump_frames)
+        return (idle_image, idle_mask,
+                walk_frames, [pygame.mask.from_surface(frame) for frame in walk_frames],
+                jump_frames, [pygame.mask.from_surface(frame) for frame in jump_frames])
 
     def handle_event(self, event):
-        if event.type == pygame.KEYDOWN and event.key == pygame.K_UP and self.on_ground:
+        if event.type == pygame.KEYDOWN and event.key == pygame.K_UP:
+            self.jump()
+
+    def jump(self):
+        if self.on_ground:
             self.is_jumping = True;
             self.on_ground = False;
             self.y_velocity = -const.JUMP_STRENGTH
 
     def shoot(self):
         if self.time_since_last_shot >= self.shoot_cooldown:
-            new_shot = PlayerShot(self.rect.midright, direction=1)
+            new_shot = PlayerShot(self.rect.midright, direction=1, animation=self.shot_animation)
             self.shots_group.add(new_shot);
             self.time_since_last_shot = 0.0
 
@@ -73,15 +102,15 @@ class Player(pygame.sprite.Sprite):
             self.lives -= amount;
             self.invincible_timer = self.invincible_duration
 
-    def update(self, delta_time, camera_offset_x, screen_width):
+    def update(self, delta_time, camera_offset_x, screen_width, keys=None):
         self.time_since_last_shot += delta_time
         if self.invincible_timer > 0: self.invincible_timer -= delta_time
-        self._update_movement(delta_time)
-        self._update_animation(delta_time)
+        self._update_movement(delta_time, keys)
+        self._update_animation()
         self.shots_group.update(delta_time, camera_offset_x, screen_width)
 
-    def _update_movement(self, delta_time):
-        keys = pygame.key.get_pressed();
+    def _update_movement(self, delta_time, keys=None):
+        if keys is None: keys = pygame.key.get_pressed()
         dx = 0
         if keys[pygame.K_LEFT]: dx = -self.speed
         if keys[pygame.K_RIGHT]: dx = self.speed
@@ -96,27 +125,36 @@ class Player(pygame.sprite.Sprite):
             self.is_jumping = False;
             self.y_velocity = 0
 
-    def _update_animation(self, delta_time):
-        current_animation = None;
-        animation_speed = 0.1
+    def _update_animation(self):
         if self.is_jumping and self.jump_frames:
-            current_animation = self.jump_frames;
-            animation_speed = const.JUMP_ANIMATION_SPEED
+            kind, animation = self.ANIMATION_JUMP, self.jump_animation
         elif self.is_moving and self.walk_frames:
-            current_animation = self.walk_frames
+            kind, animation = self.ANIMATION_WALK, self.walk_animation
         else:
-            self.image = self.idle_image;
-            self.current_frame_index = 0;
+            kind, animation = self.ANIMATION_IDLE, None
+        if kind != self.animation_kind:
+            # Cada animação recomeça do primeiro frame quando o jogador entra nela
+            self.animation_kind = kind
+            self.animation_start = animation.step if animation is not None else 0
+        self.image, self.mask = self.animation_frame()
+        if kind == self.ANIMATION_IDLE:
             return
-        if current_animation:
-            self.animation_timer += delta_time
-            if self.animation_timer >= animation_speed:
-                self.animation_timer = 0.0
-                self.current_frame_index = (self.current_frame_index + 1) % len(current_animation)
-                self.original_image = current_animation[self.current_frame_index];
-                self.image = self.original_image
         if self.invincible_timer > 0:
-            if int(self.invincible_timer * 10) % 2 == 0: self.image = pygame.Surface((1, 1), pygame.SRCALPHA)
+            if int(self.invincible_timer * 10) % 2 == 0:
+                if Player._blank_image is None:
+                    Player._blank_image = pygame.Surface((1, 1), pygame.SRCALPHA)
+                self.image = Player._blank_image
+
+    def animation_frame(self):
+        """Imagem e máscara do frame atual da animação em `animation_kind`."""
+        if self.animation_kind == self.ANIMATION_JUMP:
+            animation, frames, masks = self.jump_animation, self.jump_frames, self.jump_masks
+        elif self.animation_kind == self.ANIMATION_WALK:
+            animation, frames, masks = self.walk_animation, self.walk_frames, self.walk_masks
+        else:
+            return self.idle_image, self.idle_mask
+        index = animation.frame_index(self.animation_start, len(frames))
+        return frames[index], masks[index]
 
     def draw(self, surface, camera_offset_x):
         screen_x = self.rect.x - camera_offset_x
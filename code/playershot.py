@@ -1,18 +1,19 @@
 import pygame
-import os
-from . import const
+from . import assets, surface_memory
 
 class PlayerShot(pygame.sprite.Sprite):
-    def __init__(self, position, direction):
+    """
+    Tiro do jogador. O frame vem da animação compartilhada "playershot" do nível (`animation.AnimationClock`):
+    o tiro só guarda o passo em que foi criado. Sem animação (ou sem frames), fica num frame fixo.
+    """
+    _shared_frames = None
+    _fallback = None
+
+    def __init__(self, position, direction, animation=None):
         super().__init__()
-        self.animation_frames = []
         self._load_animation_frames()
-
-        if self.animation_frames:
-            self.image = self.animation_frames[0]
-        else:
-            self.image = pygame.Surface((30, 15), pygame.SRCALPHA)
-            self.image.fill((255, 255, 0))
+        self.animation = animation if self.animation_frames else None
+        self.animation_start = animation.step if self.animation is not None else 0
 
         self.rect = self.image.get_rect(center=position)
         self.speed = 500
@@ -20,21 +21,41 @@ class PlayerShot(pygame.sprite.Sprite):
         self.damage = 25
         self.owner = "player"
 
-        self.current_frame_index = 0
-        self.animation_timer = 0.0
-        self.animation_speed = 0.05
+    @property
+    def current_frame_index(self):
+        animation = self.animation
+        if animation is None:
+            return 0
+        return animation.frame_index(self.animation_start, len(self.animation_frames))
+
+    @property
+    def image(self):
+        if not self.animation_frames:
+            return self._fallback[0]
+        return self.animation_frames[self.current_frame_index]
+
+    @property
+    def mask(self):
+        if not self.animation_frames:
+            return self._fallback[1]
+        return self.animation_masks[self.current_frame_index]
 
     def _load_animation_frames(self):
-        base_dir = os.path.dirname(os.path.abspath(__file__))
-        asset_path = os.path.join(base_dir, '..', 'asset')
-        for i in range(1, 6):
-            frame_file = os.path.join(asset_path, f'playershot{i}.png')
-            try:
-                temp_image = pygame.image.load(frame_file).convert_alpha()
-                scaled_image = pygame.transform.scale(temp_image, (30, 15))
-                self.animation_frames.append(scaled_image)
-            except pygame.error:
-                continue
+        """Os frames e suas máscaras são carregados uma vez e compartilhados por todos os tiros."""
+        if PlayerShot._shared_frames is None:
+            frames = []
+            for i in range(1, 6):
+                try:
+                    frames.append(assets.load_image(f'playershot{i}.png', (30, 15)))
+                except (pygame.error, FileNotFoundError):
+                    continue
+            surface_memory.track_all(surface_memory.CATEGORY_SPRITES, frames)
+            PlayerShot._shared_frames = (frames, [pygame.mask.from_surface(frame) for frame in frames])
+        self.animation_frames, self.animation_masks = PlayerShot._shared_frames
+        if not self.animation_frames and PlayerShot._fallback is None:
+            image = pygame.Surface((30, 15), pygame.SRCALPHA)
+            image.fill((255, 255, 0))
+            PlayerShot._fallback = (image, pygame.mask.from_surface(image))
 
     def update(self, delta_time, camera_offset_x, screen_width):
         """
@@ -42,13 +63,6 @@ class PlayerShot(pygame.sprite.Sprite):
         """
         self.rect.x += self.speed * self.direction * delta_time
 
-        if self.animation_frames:
-            self.animation_timer += delta_time
-            if self.animation_timer >= self.animation_speed:
-                self.animation_timer = 0.0
-                self.current_frame_index = (self.current_frame_index + 1) % len(self.animation_frames)
-                self.image = self.animation_frames[self.current_frame_index]
-
         if self.rect.right < camera_offset_x or self.rect.left > camera_offset_x + screen_width:
             self.kill()
 
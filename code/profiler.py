@@ -0,0 +1,187 @@
+"""
+Profiler por amostragem embutido no jogo. A cada `interval` segundos de CPU, a pilha da thread do jogo é
+contada sob a etiqueta do momento (estado do jogo e nível). Nada é instrumentado entre as amostras, então
+o custo é só o delas e o profiler pode ficar ligado em produção. As contagens viram um arquivo de pilhas
+colapsadas (flamegraph.pl, inferno) e um JSON do speedscope com um perfil por etiqueta.
+
+Onde existe `signal.setitimer`, a amostra é tirada pelo tratador de SIGPROF, que o Python roda na própria
+thread do jogo entre dois bytecodes: a pilha é a do código que estava rodando. A alternativa, uma thread
+lendo `sys._current_frames()`, só consegue o GIL quando a thread do jogo o solta (blits, present, sleep)
+e por isso atribui quase todo o tempo ao próximo ponto que solta o GIL; ela fica só como reserva
+(Windows, ou `start()` fora da thread principal).
+"""
+import itertools
+import json
+import os
+import signal
+import sys
+import threading
+import time
+
+from . import instrumentation
+
+PROFILER_INTERVAL_S = 0.01
+PROFILER_MODES = ("signal", "thread")
+
+
+def _frame_label(code):
+    module = os.path.splitext(os.path.basename(code.co_filename))[0]
+    return f"{module}:{getattr(code, 'co_qualname', code.co_name)}"
+
+
+class SamplingProfiler:
+    """
+    `tag()` é chamado a cada amostra (no tratador de sinal ou na thread de reserva) e deve só ler
+    atributos (ex.: o estado do jogo). As pilhas são guardadas como tuplas de ids dos objetos de código,
+    da raiz para a folha; os nomes só são montados na exportação (`collapsed`, `speedscope`, `write`),
+    que recebe as contagens de `take()`.
+    """
+
+    def __init__(self, tag=lambda: "", interval=PROFILER_INTERVAL_S, thread_id=None, mode=None):
+        self.tag = tag
+        self.interval = interval
+        self.thread_id = thread_id if thread_id is not None else threading.main_thread().ident
+        self.samples = 0
+        self._counts = {}
+        self._codes = {}
+        self._sampling_time = 0.0
+        self._started_at = None
+        self._elapsed = 0.0
+        self._stop = threading.Event()
+        self._thread = None
+        self._previous_handler = None
+        self.mode = None
+        self.requested_mode = mode
+        instrumentation.register_provider("profiler", self.stats)
+
+    @property
+    def running(self):
+        return self.mode is not None
+
+    def start(self):
+        if self.running:
+            return
+        self._started_at = time.perf_counter()
+        if self.requested_mode != "thread" and hasattr(signal, "setitimer") and threading.current_thread() is threading.main_thread() \
+                and threading.get_ident() == self.thread_id:
+            self.mode = "signal"
+            self._previous_handler = signal.signal(signal.SIGPROF, self._on_signal)
+            # Chamadas de sistema interrompidas pelo sinal recomeçam sozinhas (SA_RESTART)
+            signal.siginterrupt(signal.SIGPROF, False)
+            signal.setitimer(signal.ITIMER_PROF, self.interval, self.interval)
+        else:
+            self.mode = "thread"
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="SamplingProfiler", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        if not self.running:
+            return
+        if self.mode == "signal":
+            signal.setitimer(signal.ITIMER_PROF, 0, 0)
+            signal.signal(signal.SIGPROF, self._previous_handler or signal.SIG_DFL)
+        else:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+        self.mode = None
+        self._elapsed += time.perf_counter() - self._started_at
+
+    def _on_signal(self, signum, frame):
+        self._sample(frame)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._sample(sys._current_frames().get(self.thread_id))
+
+    def _sample(self, frame):
+        start = time.perf_counter()
+        # Chave por id(): o hash de um objeto de código percorre as constantes (e os códigos aninhados nelas)
+        codes = self._codes
+        stack = []
+        while frame is not None:
+            code = frame.f_code
+            stack.append(id(code))
+            if id(code) not in codes:
+                codes[id(code)] = code
+            frame = frame.f_back
+        stack.reverse()
+        key = (self.tag(), tuple(stack))
+        counts = self._counts
+        counts[key] = counts.get(key, 0) + 1
+        self.samples += 1
+        self._sampling_time += time.perf_counter() - start
+
+    def take(self):
+        """Devolve as contagens acumuladas, com as pilhas como tuplas de objetos de código, e recomeça do zero."""
+        counts, self._counts = self._counts, {}
+        self.samples = 0
+        codes = self._codes
+        return {(tag, tuple(codes[code_id] for code_id in stack)): count for (tag, stack), count in counts.items()}
+
+    def stats(self):
+        elapsed = self._elapsed + (time.perf_counter() - self._started_at if self.running else 0.0)
+        return {"running": self.running, "mode": self.mode or "", "samples": self.samples, "stacks": len(self._counts),
+                "sampling_ms": self._sampling_time * 1000.0,
+                "sampling_share": self._sampling_time / elapsed if elapsed else 0.0}
+
+    def close(self):
+        self.stop()
+        instrumentation.unregister_provider("profiler")
+
+
+def collapsed(counts):
+    """Linhas `etiqueta;raiz;...;folha contagem`, o formato de entrada do flamegraph.pl."""
+    lines = {}
+    for (tag, stack), count in counts.items():
+        line = ";".join([tag or "-"] + [_frame_label(code) for code in stack])
+        lines[line] = lines.get(line, 0) + count
+    return [f"{line} {count}" for line, count in sorted(lines.items())]
+
+
+def speedscope(counts, interval, name="profile"):
+    """Documento do speedscope (https://www.speedscope.app) com um perfil amostrado por etiqueta."""
+    frames, frame_index = [], {}
+    profiles = {}
+    for (tag, stack), count in counts.items():
+        indices = []
+        for code in stack:
+            index = frame_index.get(code)
+            if index is None:
+                index = frame_index[code] = len(frames)
+                frames.append({"name": _frame_label(code), "file": code.co_filename, "line": code.co_firstlineno})
+            indices.append(index)
+        samples, weights = profiles.setdefault(tag or "-", ([], []))
+        samples.append(indices)
+        weights.append(count * interval * 1000.0)
+    return {
+        "$schema": "https://www.speedscope.app/file-format-schema.json",
+        "name": name,
+        "exporter": "The Witch and The Holy Order",
+        "shared": {"frames": frames},
+        "profiles": [{"type": "sampled", "name": tag, "unit": "milliseconds", "startValue": 0,
+                      "endValue": sum(weights), "samples": samples, "weights": weights}
+                     for tag, (samples, weights) in sorted(profiles.items())],
+    }
+
+
+_write_sequence = itertools.count()
+
+
+def write(counts, interval, directory):
+    """
+    Grava `profile-<data>.collapsed` e `profile-<data>.speedscope.json`; retorna os caminhos. Cada chamada
+    grava só as amostras desde o `take()` anterior, então o nome leva milissegundos e um número de sequência
+    do processo: duas gravações no mesmo segundo (F9 desliga/liga/desliga, flush periódico e saída) não se
+    sobrescrevem.
+    """
+    os.makedirs(directory, exist_ok=True)
+    now = time.time()
+    stamp = time.strftime("%Y%m%d-%H%M%S", time.localtime(now))
+    base = os.path.join(directory, f"profile-{stamp}-{int(now * 1000) % 1000:03d}-{os.getpid()}-{next(_write_sequence)}")
+    with open(base + ".collapsed", "w") as f:
+        f.write("\n".join(collapsed(counts)) + "\n")
+    with open(base + ".speedscope.json", "w") as f:
+        json.dump(speedscope(counts, interval, os.path.basename(base)), f)
+    return base + ".collapsed", base + ".speedscope.json"
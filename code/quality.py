@@ -0,0 +1,83 @@
+"""
+Governador de qualidade: acompanha o tempo de trabalho de cada frame (simulação + desenho, sem a espera
+do relógio) e desce ou sobe um nível de qualidade para manter o orçamento de frame.
+"""
+from collections import deque
+
+from . import const, instrumentation
+
+# Do melhor (0) para o mais leve. parallax_drop: quantas camadas mais distantes deixam de ser desenhadas
+# (a camada de base, o céu, sempre fica); shot_animation: anima os tiros do jogador (o único knob dos
+# tiros; os dos inimigos não têm animação); animation_rate: fração da taxa normal de troca de frames das
+# animações dos inimigos, só delas.
+QUALITY_LEVELS = (
+    {"name": "alta", "parallax_drop": 0, "shot_animation": True, "animation_rate": 1.0},
+    {"name": "média", "parallax_drop": 1, "shot_animation": True, "animation_rate": 1.0},
+    {"name": "baixa", "parallax_drop": 2, "shot_animation": False, "animation_rate": 0.5},
+    {"name": "mínima", "parallax_drop": 4, "shot_animation": False, "animation_rate": 0.5},
+)
+
+QUALITY_WINDOW_FRAMES = 30
+QUALITY_UPGRADE_RATIO = 0.7
+QUALITY_UPGRADE_HOLD_FRAMES = 180
+QUALITY_MAX_HOLD_FRAMES = QUALITY_UPGRADE_HOLD_FRAMES * 8
+
+
+class QualityGovernor:
+    """
+    Desce um nível quando a média da janela de frames passa do orçamento; sobe um nível só depois de
+    `QUALITY_UPGRADE_HOLD_FRAMES` frames seguidos abaixo de `QUALITY_UPGRADE_RATIO` do orçamento.
+    Depois de cada troca a janela recomeça. Se uma subida é desfeita logo em seguida, a espera para tentar
+    de novo aquele nível dobra (até 8x), para não ficar oscilando entre dois níveis.
+    """
+
+    def __init__(self, budget_ms=1000.0 / const.FPS, levels=QUALITY_LEVELS, window=QUALITY_WINDOW_FRAMES):
+        self.budget_ms = budget_ms
+        self.levels = levels
+        self.level = 0
+        self.changes = 0
+        self._window = deque(maxlen=window)
+        self._frames_under = 0
+        self._frames_since_upgrade = None
+        self._upgrade_hold = [QUALITY_UPGRADE_HOLD_FRAMES] * len(levels)
+        instrumentation.register_provider("quality", self.stats)
+
+    @property
+    def settings(self):
+        return self.levels[self.level]
+
+    def record(self, frame_ms):
+        """Registra o tempo de trabalho de um frame. Retorna True se o nível de qualidade mudou."""
+        window = self._window
+        window.append(frame_ms)
+        if self._frames_since_upgrade is not None:
+            self._frames_since_upgrade += 1
+        self._frames_under = self._frames_under + 1 if frame_ms < self.budget_ms * QUALITY_UPGRADE_RATIO else 0
+
+        if len(window) == window.maxlen and self.level < len(self.levels) - 1 and \
+                sum(window) / len(window) > self.budget_ms:
+            if self._frames_since_upgrade is not None and \
+                    self._frames_since_upgrade < self._upgrade_hold[self.level] * 2:
+                self._upgrade_hold[self.level] = min(self._upgrade_hold[self.level] * 2, QUALITY_MAX_HOLD_FRAMES)
+            self._change(self.level + 1)
+            self._frames_since_upgrade = None
+            return True
+        if self.level > 0 and self._frames_under >= self._upgrade_hold[self.level - 1]:
+            self._change(self.level - 1)
+            self._frames_since_upgrade = 0
+            return True
+        return False
+
+    def _change(self, level):
+        self.level = level
+        self.changes += 1
+        self._window.clear()
+        self._frames_under = 0
+
+    def stats(self):
+        window = self._window
+        return {"level": self.level, "name": self.settings["name"], "changes": self.changes,
+                "frame_ms_mean": sum(window) / len(window) if window else 0.0}
+
+    def close(self):
+        instrumentation.unregister_provider("quality")
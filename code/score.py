@@ -7,6 +7,8 @@ class ScoreManager:
     def __init__(self):
         self._current_kill_count = 0
         self.high_scores = self._load_and_sort_high_scores()
+        # Com o loop asyncio, recebe (função, *args) e a gravação sai do frame (ver FrameScheduler)
+        self.background = None
 
     def reset(self):
         """Zera o contador de abates para uma nova partida."""
@@ -16,6 +18,10 @@ class ScoreManager:
         """Adiciona uma ou mais mortes ao contador da partida atual."""
         self._current_kill_count += count
 
+    def set_current_score(self, count):
+        """Define o contador de abates (usado ao restaurar um snapshot do nível)."""
+        self._current_kill_count = count
+
     def get_current_score(self):
         """Retorna o score da partida atual."""
         return self._current_kill_count
@@ -35,7 +41,10 @@ class ScoreManager:
         self.high_scores.append(new_score_entry)
         self.high_scores.sort(key=lambda item: item['score'], reverse=True)
         self.high_scores = self.high_scores[:10]
-        db_proxy.save_data(self.high_scores)
+        if self.background is not None:
+            self.background(db_proxy.save_data, list(self.high_scores))
+        else:
+            db_proxy.save_data(self.high_scores)
 
     def get_high_scores(self):
         """Retorna a lista de high scores."""
@@ -0,0 +1,291 @@
+"""
+Pool de imagens decodificadas em memória compartilhada, para várias instâncias do jogo na mesma máquina
+(quiosque com uma instância por assento). A primeira instância que carrega uma imagem a decodifica, escala
+e converte como sempre e publica os pixels prontos num bloco `multiprocessing.shared_memory` só dela; as
+outras acham o bloco pelo índice do pool e criam a Surface direto sobre esses pixels
+(`pygame.image.frombuffer`), sem cópia.
+
+O índice (outro bloco) guarda a lista de imagens publicadas e o pid de cada instância ligada ao pool, que
+funciona como contagem de referências: a última instância a sair apaga todos os blocos, e uma instância
+que morreu sem sair perde o assento na próxima vez que alguém entrar ou sair. As mudanças no índice são
+feitas sob uma trava de arquivo (fcntl); sem fcntl (Windows), `SharedAssetPool` levanta OSError e o jogo
+segue com os assets locais.
+"""
+import hashlib
+import os
+import struct
+import sys
+import tempfile
+from contextlib import contextmanager
+from multiprocessing import resource_tracker, shared_memory
+
+import pygame
+
+from . import const, instrumentation
+from .assets import FORMATS, FORMAT_ALPHA, FORMAT_COLORKEY
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+SHARED_POOL_SEATS = 64
+SHARED_POOL_ENTRIES = 4096
+
+_INDEX_MAGIC = b"WHAP"
+_INDEX_VERSION = 1
+# Índice: magic, versão, nº de imagens publicadas; depois os pids dos assentos e os digests das imagens
+_INDEX_HEADER = struct.Struct("<4sBI")
+_SEAT = struct.Struct("<q")
+_DIGEST_SIZE = 12
+_SEATS_OFFSET = _INDEX_HEADER.size
+_ENTRIES_OFFSET = _SEATS_OFFSET + SHARED_POOL_SEATS * _SEAT.size
+_INDEX_SIZE = _ENTRIES_OFFSET + SHARED_POOL_ENTRIES * _DIGEST_SIZE
+# Bloco de uma imagem: largura, altura, formato de blit, colorkey, fração semi-transparente; pixels em BGRA
+_ENTRY_HEADER = struct.Struct("<IIB3Bd")
+_PIXELS_OFFSET = 32
+
+
+class _Segment(shared_memory.SharedMemory):
+    def close(self):
+        try:
+            super().close()
+        except BufferError:
+            # Ainda há superfícies sobre o bloco; o mapeamento some junto com elas ou com o processo
+            pass
+
+
+def _untrack(segment):
+    # O resource_tracker apagaria o bloco quando o processo que o abriu saísse, mesmo com outros usando
+    if os.name == "posix":
+        resource_tracker.unregister(segment._name, "shared_memory")
+
+
+def _open_segment(name, size=0):
+    segment = _Segment(name, create=size > 0, size=size)
+    _untrack(segment)
+    return segment
+
+
+def _destroy(segment):
+    if os.name == "posix":
+        # unlink() desfaz o registro no resource_tracker; sem registrar de novo, ele reclama
+        resource_tracker.register(segment._name, "shared_memory")
+    segment.unlink()
+
+
+def _unlink(name):
+    try:
+        segment = _open_segment(name)
+    except FileNotFoundError:
+        return
+    _destroy(segment)
+    segment.close()
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def shareable(surface):
+    """Se a superfície está no formato de pixels que o pool guarda (32 bits, BGRA na memória)."""
+    return sys.byteorder == "little" and surface.get_bitsize() == 32 and \
+        surface.get_masks()[:3] == (0xff0000, 0xff00, 0xff) and surface.get_masks()[3] in (0, 0xff000000)
+
+
+class SharedAssetPool:
+    """
+    `get(key)` devolve (superfície, formato, fração semi-transparente) de uma imagem já publicada por
+    qualquer instância, ou None; `put(key, superfície, formato, fração)` publica uma imagem carregada
+    localmente e devolve a superfície sobre a memória compartilhada (ou a própria, se não der para
+    compartilhar). As superfícies do pool são só para leitura: nada deve desenhar sobre elas.
+    Imagens opacas e com alfa ficam sobre o bloco compartilhado; as de colorkey são copiadas (ver `_wrap`).
+    """
+
+    def __init__(self, name=const.SHARED_ASSET_POOL):
+        if fcntl is None:
+            raise OSError("memória compartilhada de assets indisponível nesta plataforma (sem fcntl)")
+        self.name = name
+        self._lock_file = open(os.path.join(tempfile.gettempdir(), f"{name}.lock"), "a+b")
+        self._segments = {}
+        self._known = set()
+        self._known_count = 0
+        self.hits = 0
+        self.misses = 0
+        self.published = 0
+        self.mapped_bytes = 0
+        with self._locked():
+            self._index = self._open_index()
+            if not self._prune_seats():
+                # Ninguém vivo no pool: sobras de instâncias que morreram sem sair
+                self._clear_entries()
+            self._set_seat(0, os.getpid())
+        instrumentation.register_provider("shared_assets", self.stats)
+
+    @contextmanager
+    def _locked(self):
+        fcntl.flock(self._lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(self._lock_file, fcntl.LOCK_UN)
+
+    def _open_index(self):
+        try:
+            index = _open_segment(f"{self.name}_index")
+        except FileNotFoundError:
+            index = _open_segment(f"{self.name}_index", _INDEX_SIZE)
+            index.buf[:_INDEX_SIZE] = bytes(_INDEX_SIZE)
+            _INDEX_HEADER.pack_into(index.buf, 0, _INDEX_MAGIC, _INDEX_VERSION, 0)
+        magic, version, _ = _INDEX_HEADER.unpack_from(index.buf, 0)
+        if magic != _INDEX_MAGIC or version != _INDEX_VERSION or index.size < _INDEX_SIZE:
+            index.close()
+            raise OSError(f"pool de assets '{self.name}' de outra versão do jogo")
+        return index
+
+    def _seats(self):
+        return [_SEAT.unpack_from(self._index.buf, _SEATS_OFFSET + i * _SEAT.size)[0]
+                for i in range(SHARED_POOL_SEATS)]
+
+    def _set_seat(self, old_pid, new_pid):
+        seats = self._seats()
+        if old_pid not in seats:
+            raise OSError(f"pool de assets '{self.name}' sem assentos livres")
+        _SEAT.pack_into(self._index.buf, _SEATS_OFFSET + seats.index(old_pid) * _SEAT.size, new_pid)
+
+    def _prune_seats(self):
+        """Libera os assentos de processos que já morreram; retorna quantos continuam ocupados."""
+        alive = 0
+        for pid in self._seats():
+            if not pid:
+                continue
+            if _pid_alive(pid):
+                alive += 1
+            else:
+                self._set_seat(pid, 0)
+        return alive
+
+    def _entry_count(self):
+        return _INDEX_HEADER.unpack_from(self._index.buf, 0)[2]
+
+    def _refresh(self):
+        """Acrescenta a `_known` as imagens publicadas por outras instâncias desde a última leitura."""
+        count = self._entry_count()
+        buf = self._index.buf
+        for i in range(self._known_count, count):
+            offset = _ENTRIES_OFFSET + i * _DIGEST_SIZE
+            self._known.add(bytes(buf[offset:offset + _DIGEST_SIZE]))
+        self._known_count = count
+
+    def _segment_name(self, digest):
+        return f"{self.name}_{digest.hex()}"
+
+    def _clear_entries(self):
+        self._refresh()
+        for digest in self._known:
+            _unlink(self._segment_name(digest))
+        self._known.clear()
+        self._known_count = 0
+        _INDEX_HEADER.pack_into(self._index.buf, 0, _INDEX_MAGIC, _INDEX_VERSION, 0)
+
+    def _attach(self, digest):
+        segment = self._segments.get(digest)
+        if segment is None:
+            segment = self._segments[digest] = _open_segment(self._segment_name(digest))
+            self.mapped_bytes += segment.size
+        return segment
+
+    @staticmethod
+    def _digest(key):
+        return hashlib.blake2b(repr(key).encode(), digest_size=_DIGEST_SIZE).digest()
+
+    def get(self, key):
+        digest = self._digest(key)
+        segment = self._segments.get(digest)
+        if segment is None:
+            with self._locked():
+                if digest not in self._known:
+                    self._refresh()
+                if digest not in self._known:
+                    self.misses += 1
+                    return None
+                segment = self._attach(digest)
+        self.hits += 1
+        return self._wrap(segment)
+
+    def put(self, key, surface, fmt, partial):
+        if not shareable(surface):
+            return surface
+        digest = self._digest(key)
+        with self._locked():
+            self._refresh()
+            if digest in self._known:
+                # Outra instância publicou a mesma imagem enquanto esta decodificava
+                return self._wrap(self._attach(digest))[0]
+            if self._known_count >= SHARED_POOL_ENTRIES:
+                return surface
+            pixels = pygame.image.tobytes(surface, "BGRA")
+            name = self._segment_name(digest)
+            try:
+                segment = _open_segment(name, _PIXELS_OFFSET + len(pixels))
+            except FileExistsError:
+                # Bloco órfão de um pool antigo com o mesmo nome
+                _unlink(name)
+                segment = _open_segment(name, _PIXELS_OFFSET + len(pixels))
+            colorkey = surface.get_colorkey() or (0, 0, 0)
+            _ENTRY_HEADER.pack_into(segment.buf, 0, surface.get_width(), surface.get_height(), FORMATS.index(fmt),
+                                    *colorkey[:3], partial)
+            segment.buf[_PIXELS_OFFSET:_PIXELS_OFFSET + len(pixels)] = pixels
+            count = self._known_count
+            self._index.buf[_ENTRIES_OFFSET + count * _DIGEST_SIZE:_ENTRIES_OFFSET + (count + 1) * _DIGEST_SIZE] = digest
+            _INDEX_HEADER.pack_into(self._index.buf, 0, _INDEX_MAGIC, _INDEX_VERSION, count + 1)
+            self._known.add(digest)
+            self._known_count = count + 1
+            self._segments[digest] = segment
+            self.mapped_bytes += segment.size
+            self.published += 1
+        return self._wrap(segment)[0]
+
+    @staticmethod
+    def _wrap(segment):
+        width, height, code, red, green, blue, partial = _ENTRY_HEADER.unpack_from(segment.buf, 0)
+        pixels = segment.buf[_PIXELS_OFFSET:_PIXELS_OFFSET + width * height * 4]
+        surface = pygame.image.frombuffer(pixels, (width, height), "BGRA")
+        fmt = FORMATS[code]
+        if fmt != FORMAT_ALPHA:
+            # Sem mistura por pixel: o canal de alfa vira só um byte ignorado
+            surface.set_alpha(None)
+            if fmt == FORMAT_COLORKEY:
+                # O SDL só codifica em RLE uma superfície no formato exato da tela; os sprites com colorkey
+                # são pequenos, então uma cópia local convertida sai mais barata que perder o RLE
+                surface = surface.convert()
+                surface.set_colorkey((red, green, blue), pygame.RLEACCEL)
+        return surface, fmt, partial
+
+    def stats(self):
+        return {"seats": sum(1 for pid in self._seats() if pid), "entries": self._entry_count(),
+                "hits": self.hits, "misses": self.misses, "published": self.published,
+                "mapped_bytes": self.mapped_bytes}
+
+    def close(self):
+        """Libera o assento desta instância; a última a sair apaga todos os blocos do pool."""
+        if self._index is None:
+            return
+        with self._locked():
+            self._set_seat(os.getpid(), 0)
+            last = not self._prune_seats()
+            if last:
+                self._clear_entries()
+                _destroy(self._index)
+        for segment in list(self._segments.values()) + [self._index]:
+            segment.close()
+        self._segments.clear()
+        self._index = None
+        instrumentation.unregister_provider("shared_assets")
+        self._lock_file.close()
@@ -0,0 +1,175 @@
+"""
+Snapshot binário do estado de um nível (jogador, inimigos, tiros, temporizadores, câmera, pontuação
+e RNG) e o anel com os snapshots dos últimos segundos.
+Nenhuma superfície é copiada: inimigos e tiros são gravados pelo índice do seu tipo e as imagens
+vêm dos caches compartilhados na restauração.
+"""
+import struct
+from array import array
+from collections import deque
+
+from . import const
+from .enemy import Enemy, ENEMY_ARCHETYPES
+from .enemyshot import EnemyShot
+from .playershot import PlayerShot
+
+SNAPSHOT_MAGIC = b"WHOS"
+SNAPSHOT_VERSION = 2
+
+ENEMY_TYPES = tuple(ENEMY_ARCHETYPES)
+_ENEMY_TYPE_IDS = {name: index for index, name in enumerate(ENEMY_TYPES)}
+
+# Cabeçalho: magic, versão, câmera, spawn timer, próximo spawn, score, nº de tiros do jogador,
+# inimigos, tiros inimigos e animações, gauss_next do RNG (presente?, valor)
+_HEADER = struct.Struct("<4sBiddIHHHH?d")
+# Animação do relógio do nível (depois do tamanho e dos bytes do nome): período, passo, resto do tempo
+_ANIMATION = struct.Struct("<dqd")
+# Jogador: x, y, y_velocity, vidas, on_ground, is_jumping, is_moving, invencibilidade, tempo desde o tiro,
+# animação atual (0 parado, 1 andando, 2 pulando) e o passo em que ela começou
+_PLAYER = struct.Struct("<iidi???ddBq")
+_PLAYER_SHOT = struct.Struct("<iiiq")
+_ENEMY = struct.Struct("<Biiiq?d")
+_ENEMY_SHOT = struct.Struct("<Biiih")
+_RNG_WORDS = 625
+_RNG_BYTES = _RNG_WORDS * 4
+
+
+def _pack_animations(animations):
+    # Ordenadas pelo nome: o mesmo estado dá os mesmos bytes, qualquer que seja a ordem em que foram criadas
+    parts = []
+    for name, animation in sorted(animations.animations.items()):
+        name = name.encode()
+        parts.append(bytes((len(name),)) + name + _ANIMATION.pack(animation.period, animation.step, animation.remainder))
+    return parts
+
+
+def _unpack_animations(animations, blob, offset, count):
+    for _ in range(count):
+        size = blob[offset]
+        name = bytes(blob[offset + 1:offset + 1 + size]).decode()
+        offset += 1 + size
+        period, step, remainder = _ANIMATION.unpack_from(blob, offset)
+        offset += _ANIMATION.size
+        animation = animations.animation(name, period)
+        animation.step = step
+        animation.remainder = remainder
+    return offset
+
+
+def capture(level):
+    """Serializa o estado do nível em bytes."""
+    player = level.player
+    enemies = level.enemies.sprites()
+    enemy_index = {enemy: index for index, enemy in enumerate(enemies)}
+    player_shots = player.shots_group.sprites()
+    enemy_shots = level.enemy_shots.sprites()
+    rng_version, rng_words, gauss_next = level.rng.getstate()
+    animations = _pack_animations(level.animations)
+
+    parts = [_HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, level.camera_offset_x, level.enemy_spawn_timer,
+                          level.next_spawn_time, level.score_manager.get_current_score(),
+                          len(player_shots), len(enemies), len(enemy_shots), len(animations),
+                          gauss_next is not None, gauss_next or 0.0),
+             array("I", rng_words).tobytes()]
+    parts.extend(animations)
+    parts.append(_PLAYER.pack(player.rect.x, player.rect.y, player.y_velocity, player.lives, player.on_ground,
+                              player.is_jumping, player.is_moving, player.invincible_timer,
+                              player.time_since_last_shot, player.animation_kind, player.animation_start))
+    pack = _PLAYER_SHOT.pack
+    parts.extend(pack(shot.rect.x, shot.rect.y, shot.direction, shot.animation_start) for shot in player_shots)
+    pack = _ENEMY.pack
+    parts.extend(pack(_ENEMY_TYPE_IDS[enemy.archetype.name], enemy.rect.x, enemy.rect.y, enemy.health,
+                      enemy.animation_start, enemy.has_fired_on_screen, enemy.time_since_last_shot)
+                 for enemy in enemies)
+    pack = _ENEMY_SHOT.pack
+    parts.extend(pack(_ENEMY_TYPE_IDS[shot.enemy_type], shot.rect.x, shot.rect.y, shot.direction,
+                      enemy_index.get(shot.owner, -1)) for shot in enemy_shots)
+    parts.append(level._snapshot_extra())
+    return b"".join(parts)
+
+
+def restore(level, blob):
+    """Recoloca o nível no estado gravado por `capture`, reaproveitando os assets já carregados."""
+    (magic, version, camera_offset_x, spawn_timer, next_spawn_time, score, num_player_shots, num_enemies,
+     num_enemy_shots, num_animations, has_gauss, gauss_next) = _HEADER.unpack_from(blob, 0)
+    if magic != SNAPSHOT_MAGIC or version != SNAPSHOT_VERSION:
+        raise ValueError("Snapshot inválido ou de outra versão.")
+    offset = _HEADER.size
+
+    level.camera_offset_x = camera_offset_x
+    level.enemy_spawn_timer = spawn_timer
+    level.next_spawn_time = next_spawn_time
+    level.score_manager.set_current_score(score)
+    level.rng.setstate((3, tuple(array("I", blob[offset:offset + _RNG_BYTES])), gauss_next if has_gauss else None))
+    offset += _RNG_BYTES
+    offset = _unpack_animations(level.animations, blob, offset, num_animations)
+
+    player = level.player
+    (x, y, player.y_velocity, player.lives, player.on_ground, player.is_jumping, player.is_moving,
+     player.invincible_timer, player.time_since_last_shot, player.animation_kind,
+     player.animation_start) = _PLAYER.unpack_from(blob, offset)
+    offset += _PLAYER.size
+    player.rect.topleft = (x, y)
+    player.image, player.mask = player.animation_frame()
+
+    player.shots_group.empty()
+    for x, y, direction, animation_start in _PLAYER_SHOT.iter_unpack(
+            blob[offset:offset + _PLAYER_SHOT.size * num_player_shots]):
+        shot = PlayerShot((0, 0), direction, player.shot_animation)
+        shot.rect.topleft = (x, y)
+        shot.animation_start = animation_start
+        player.shots_group.add(shot)
+    offset += _PLAYER_SHOT.size * num_player_shots
+
+    level.enemies.empty()
+    enemies = []
+    starts = []
+    for (type_id, x, y, health, animation_start, has_fired,
+         since_shot) in _ENEMY.iter_unpack(blob[offset:offset + _ENEMY.size * num_enemies]):
+        enemy = Enemy(ENEMY_ARCHETYPES[ENEMY_TYPES[type_id]], (x, y))
+        enemy.health = health
+        enemy.has_fired_on_screen = has_fired
+        enemy.time_since_last_shot = since_shot
+        enemies.append(enemy)
+        starts.append(animation_start)
+    level.enemies.add(*enemies)
+    for enemy, animation_start in zip(enemies, starts):
+        enemy.animation_start = animation_start
+    offset += _ENEMY.size * num_enemies
+
+    for type_id, x, y, direction, owner in _ENEMY_SHOT.iter_unpack(
+            blob[offset:offset + _ENEMY_SHOT.size * num_enemy_shots]):
+        shot = EnemyShot((0, 0), ENEMY_TYPES[type_id], direction)
+        shot.rect.topleft = (x, y)
+        shot.owner = enemies[owner] if owner >= 0 else None
+        level.enemy_shots.add(shot)
+    offset += _ENEMY_SHOT.size * num_enemy_shots
+
+    level._restore_extra(blob[offset:])
+
+
+class SnapshotRing:
+    """Anel com um snapshot por frame dos últimos `seconds` segundos, para voltar no tempo sem recarregar nada."""
+
+    def __init__(self, seconds, fps=const.FPS):
+        self._snapshots = deque(maxlen=max(1, int(seconds * fps)))
+
+    def __len__(self):
+        return len(self._snapshots)
+
+    def push(self, blob):
+        self._snapshots.append(blob)
+
+    def latest(self):
+        return self._snapshots[-1] if self._snapshots else None
+
+    def rewind(self, frames):
+        """Descarta os últimos `frames` snapshots e retorna o que ficou no fim (o mais antigo, se faltar histórico)."""
+        if not self._snapshots:
+            return None
+        for _ in range(min(frames, len(self._snapshots) - 1)):
+            self._snapshots.pop()
+        return self._snapshots[-1]
+
+    def clear(self):
+        self._snapshots.clear()
@@ -0,0 +1,57 @@
+"""
+Rastreia o tempo de inicialização até o primeiro frame do menu.
+main.py importa este módulo antes de qualquer outro, então a origem dos tempos é o início
+da execução do jogo. Cada etapa medida com `step()` vira uma linha do relatório (--startup-trace).
+"""
+import time
+from contextlib import contextmanager
+
+_origin = time.perf_counter()
+_steps = []
+_depth = 0
+_first_frame_at = None
+
+
+@contextmanager
+def step(label):
+    """Mede o bloco como uma etapa da inicialização. Etapas aninhadas aparecem indentadas."""
+    global _depth
+    start = time.perf_counter()
+    index = len(_steps)
+    _steps.append(None)
+    _depth += 1
+    try:
+        yield
+    finally:
+        _depth -= 1
+        _steps[index] = (label, _depth, start - _origin, time.perf_counter() - start)
+
+
+def mark_first_frame():
+    """Registra o momento em que o primeiro frame foi apresentado (só a primeira chamada conta)."""
+    global _first_frame_at
+    if _first_frame_at is None:
+        _first_frame_at = time.perf_counter() - _origin
+
+
+def time_to_first_frame():
+    """Segundos desde a origem até o primeiro frame, ou None se ainda não houve frame."""
+    return _first_frame_at
+
+
+def as_dict():
+    return {
+        "steps": [{"label": label, "depth": depth, "start": start, "duration": duration}
+                  for label, depth, start, duration in filter(None, _steps)],
+        "first_frame": _first_frame_at,
+    }
+
+
+def report():
+    """Retorna o relatório de inicialização em texto, uma etapa por linha."""
+    lines = ["Inicialização (ms):"]
+    for label, depth, start, duration in filter(None, _steps):
+        lines.append(f"  {start * 1000:8.1f} +{duration * 1000:7.1f}  {'  ' * depth}{label}")
+    if _first_frame_at is not None:
+        lines.append(f"  {_first_frame_at * 1000:8.1f}           primeiro frame")
+    return "\n".join(lines)
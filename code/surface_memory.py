@@ -0,0 +1,92 @@
+"""
+Contabilidade da memória de pixels das superfícies, por categoria de asset.
+Cada superfície registrada com `track()` soma seus bytes à categoria até ser liberada com `release()`
+ou coletada pelo GC (um finalizador desconta automaticamente). Os valores atual e de pico por
+categoria aparecem no `instrumentation.snapshot()` sob "surface_memory.".
+"""
+import threading
+import weakref
+
+from . import instrumentation
+
+CATEGORY_PARALLAX = "parallax"
+CATEGORY_SPRITES = "sprites"
+CATEGORY_TEXT = "text"
+CATEGORY_UI = "ui"
+CATEGORIES = (CATEGORY_PARALLAX, CATEGORY_SPRITES, CATEGORY_TEXT, CATEGORY_UI)
+
+_current = dict.fromkeys(CATEGORIES, 0)
+_peak = dict.fromkeys(CATEGORIES, 0)
+_total_peak = 0
+_finalizers = weakref.WeakKeyDictionary()
+# Superfícies são registradas e liberadas também fora da thread principal (blocos de fundo no compositor
+# do modo pipelined). Reentrante porque o finalizador de uma superfície coletada pode rodar dentro de _add.
+_lock = threading.RLock()
+
+
+def surface_bytes(surface):
+    """Bytes de pixels de uma superfície (altura x pitch)."""
+    return surface.get_height() * surface.get_pitch()
+
+
+def _add(category, amount):
+    global _total_peak
+    with _lock:
+        _current[category] += amount
+        if _current[category] > _peak[category]:
+            _peak[category] = _current[category]
+        total = sum(_current.values())
+        if total > _total_peak:
+            _total_peak = total
+
+
+def track(category, surface):
+    """Registra a superfície na categoria (uma vez só) e a retorna, para uso em linha."""
+    if surface is None:
+        return surface
+    with _lock:
+        if surface in _finalizers:
+            return surface
+        amount = surface_bytes(surface)
+        _add(category, amount)
+        _finalizers[surface] = weakref.finalize(surface, _add, category, -amount)
+    return surface
+
+
+def track_all(category, surfaces):
+    for surface in surfaces:
+        track(category, surface)
+    return surfaces
+
+
+def release(surface):
+    """Desconta a superfície já na hora, sem esperar o GC."""
+    with _lock:
+        finalizer = _finalizers.pop(surface, None) if surface is not None else None
+    if finalizer is not None:
+        finalizer()
+
+
+def current_bytes(category=None):
+    return _current[category] if category else sum(_current.values())
+
+
+def stats():
+    data = {}
+    for category in CATEGORIES:
+        data[f"{category}.current_bytes"] = _current[category]
+        data[f"{category}.peak_bytes"] = _peak[category]
+    data["current_bytes"] = sum(_current.values())
+    data["peak_bytes"] = _total_peak
+    return data
+
+
+def report():
+    lines = [f"{'categoria':>10} {'atual KiB':>10} {'pico KiB':>10}"]
+    for category in CATEGORIES:
+        lines.append(f"{category:>10} {_current[category] / 1024:>10.0f} {_peak[category] / 1024:>10.0f}")
+    lines.append(f"{'total':>10} {sum(_current.values()) / 1024:>10.0f} {_total_peak / 1024:>10.0f}")
+    return "\n".join(lines)
+
+
+instrumentation.register_provider("surface_memory", stats)
@@ -0,0 +1,235 @@
+"""
+Fundos em blocos: uma camada de parallax larga (arte única para o nível inteiro, sem repetição) fica
+em disco cortada em faixas de largura fixa, `asset/<camada>/000.png`, `001.png`, ..., com um
+`tiles.json` descrevendo o corte. No jogo, cada bloco é lido, escalado e convertido só quando a câmera
+chega perto dele; cada camada guarda um LRU pequeno de blocos residentes e pede com antecedência, numa
+thread, os próximos blocos no sentido da rolagem. A memória fica limitada pela largura da tela, não
+pela do nível.
+
+Cortar uma imagem (passo de build, como o code.asset_pack):
+
+    python -m code.tiled_background ORIGEM.png NOME_DA_CAMADA [--tile-width PX]
+"""
+import argparse
+import bisect
+import json
+import math
+import os
+import sys
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import pygame
+
+from . import assets, const, instrumentation, surface_memory
+
+MANIFEST_NAME = "tiles.json"
+
+
+def load_manifest(layer_name):
+    """O `tiles.json` da camada `layer_name`, ou None se ela não está em blocos."""
+    try:
+        with assets.open_asset(f"{layer_name}/{MANIFEST_NAME}") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def _load_tile(name, size):
+    """
+    Lê, decodifica, escala e converte um bloco para o formato de blit (`assets.optimize`). Roda na thread
+    de carga: a conversão só lê o formato de pixels da tela, e a classificação do alfa e a escolha do
+    colorkey (numpy) são a parte mais cara, que não pode ficar no frame.
+    """
+    with assets.open_asset(name) as f:
+        image = pygame.image.load(f, name)
+    return assets.optimize(pygame.transform.scale(image, size).convert_alpha(), name)
+
+
+class TiledLayer:
+    """
+    Uma camada em blocos escalada para `height`. `draw(screen, scroll, screen_width)` desenha a partir
+    da posição `scroll` (com repetição, como as camadas de imagem única) e agenda os blocos seguintes.
+    Os blocos do LRU nunca passam de `capacity`: os que cobrem a tela, um cortado na borda e o último
+    (mais estreito) da camada, `prefetch` à frente e um para trás (a rolagem pode voltar).
+    """
+
+    def __init__(self, name, manifest, height, screen_width, executor, prefetch=const.BG_TILE_PREFETCH):
+        self.name = name
+        self.height = height
+        scale = height / manifest["height"]
+        boundaries = list(range(0, manifest["width"], manifest["tile_width"])) + [manifest["width"]]
+        # Mesmo arredondamento do load_image com `height`: a camada fica com a largura que teria inteira
+        self.offsets = [int(x * scale) for x in boundaries]
+        self.width = self.offsets[-1]
+        self.tile_names = [f"{name}/{tile}" for tile in manifest["tiles"]]
+        self.count = len(self.tile_names)
+        widths = [right - left for left, right in zip(self.offsets, self.offsets[1:])]
+        narrowest = min(widths[:-1]) if len(widths) > 1 else widths[0]
+        self.prefetch = prefetch
+        self.capacity = math.ceil(screen_width / max(1, narrowest)) + 2 + prefetch + 1
+        self._executor = executor
+        self._resident = OrderedDict()
+        self._loading = {}
+        self._last_position = None
+        self._direction = 1
+        # Contadores simples, lidos pelo `stats()` da thread principal enquanto o compositor do modo
+        # pipelined pode estar mexendo no LRU: nunca percorrer `_resident` fora de quem desenha
+        self.resident = 0
+        self.resident_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.waits = 0
+        self.prefetched = 0
+        self.evictions = 0
+
+    def _size(self, index):
+        return self.offsets[index + 1] - self.offsets[index], self.height
+
+    def _insert(self, index, tile):
+        surface_memory.track(surface_memory.CATEGORY_PARALLAX, tile)
+        self._resident[index] = tile
+        self.resident_bytes += surface_memory.surface_bytes(tile)
+        while len(self._resident) > self.capacity:
+            _, evicted = self._resident.popitem(last=False)
+            surface_memory.release(evicted)
+            self.resident_bytes -= surface_memory.surface_bytes(evicted)
+            self.evictions += 1
+        self.resident = len(self._resident)
+        return tile
+
+    def _tile(self, index):
+        tile = self._resident.get(index)
+        if tile is not None:
+            self._resident.move_to_end(index)
+            self.hits += 1
+            return tile
+        future = self._loading.pop(index, None)
+        if future is not None:
+            # Pedido com antecedência mas ainda não pronto: espera só ele
+            if not future.done():
+                self.waits += 1
+            tile = future.result()
+        else:
+            self.misses += 1
+            tile = _load_tile(self.tile_names[index], self._size(index))
+        return self._insert(index, tile)
+
+    def _request(self, index):
+        if index not in self._resident and index not in self._loading:
+            self._loading[index] = self._executor.submit(_load_tile, self.tile_names[index], self._size(index))
+            self.prefetched += 1
+
+    def _promote(self):
+        """Passa para o LRU no máximo um bloco já pronto por frame, antes de ele ser preciso."""
+        for index, future in self._loading.items():
+            if future.done():
+                del self._loading[index]
+                self._insert(index, future.result())
+                return
+
+    def draw(self, screen, scroll, screen_width):
+        position = scroll % self.width
+        if self._last_position is not None and position != self._last_position:
+            # Sentido pelo menor deslocamento, para a volta do fim para o começo (e o rebase) não inverter
+            delta = (position - self._last_position + self.width / 2) % self.width - self.width / 2
+            self._direction = 1 if delta > 0 else -1
+        self._last_position = position
+        start = int(position)
+        first = index = bisect.bisect_right(self.offsets, start) - 1
+        x = self.offsets[index] - start
+        while x < screen_width:
+            screen.blit(self._tile(index), (x, 0))
+            x += self.offsets[index + 1] - self.offsets[index]
+            index = (index + 1) % self.count
+        for step in range(self.prefetch):
+            self._request((index + step) % self.count if self._direction > 0 else (first - 1 - step) % self.count)
+        self._promote()
+
+    def warm(self, scroll, screen_width):
+        """Carrega já os blocos visíveis em `scroll` (na carga do nível, para o primeiro frame não esperar)."""
+        position = int(scroll % self.width)
+        index = bisect.bisect_right(self.offsets, position) - 1
+        x = self.offsets[index] - position
+        while x < screen_width:
+            if index not in self._resident:
+                self._insert(index, _load_tile(self.tile_names[index], self._size(index)))
+            x += self.offsets[index + 1] - self.offsets[index]
+            index = (index + 1) % self.count
+
+    def close(self):
+        for future in self._loading.values():
+            future.cancel()
+        self._loading.clear()
+        for tile in self._resident.values():
+            surface_memory.release(tile)
+        self._resident.clear()
+        self.resident = self.resident_bytes = 0
+
+
+class TileStreamer:
+    """As camadas em blocos de um nível e a thread que decodifica os blocos pedidos com antecedência."""
+
+    def __init__(self, screen_width):
+        self.screen_width = screen_width
+        self.layers = []
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="bg_tiles")
+        instrumentation.register_provider("bg_tiles", self.stats)
+
+    def open_layer(self, name, manifest, height):
+        layer = TiledLayer(name, manifest, height, self.screen_width, self._executor)
+        layer.warm(0, self.screen_width)
+        self.layers.append(layer)
+        return layer
+
+    def stats(self):
+        layers = self.layers
+        return {"layers": len(layers), "resident": sum(layer.resident for layer in layers),
+                "capacity": sum(layer.capacity for layer in layers),
+                "resident_bytes": sum(layer.resident_bytes for layer in layers),
+                "hits": sum(layer.hits for layer in layers), "misses": sum(layer.misses for layer in layers),
+                "waits": sum(layer.waits for layer in layers),
+                "prefetched": sum(layer.prefetched for layer in layers),
+                "evictions": sum(layer.evictions for layer in layers)}
+
+    def close(self):
+        for layer in self.layers:
+            layer.close()
+        self.layers = []
+        self._executor.shutdown(wait=True, cancel_futures=True)
+        instrumentation.unregister_provider("bg_tiles")
+
+
+def cut(image, layer_name, asset_dir, tile_width=const.BG_TILE_WIDTH):
+    """Corta `image` em blocos de `tile_width` px em `asset_dir/layer_name/` e grava o `tiles.json`."""
+    directory = os.path.join(asset_dir, layer_name)
+    os.makedirs(directory, exist_ok=True)
+    width, height = image.get_size()
+    tiles = []
+    for index, x in enumerate(range(0, width, tile_width)):
+        tile = f"{index:03d}.png"
+        pygame.image.save(image.subsurface((x, 0, min(tile_width, width - x), height)),
+                          os.path.join(directory, tile))
+        tiles.append(tile)
+    manifest = {"width": width, "height": height, "tile_width": tile_width, "tiles": tiles}
+    with open(os.path.join(directory, MANIFEST_NAME), "w") as f:
+        json.dump(manifest, f, indent=1)
+    return manifest
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m code.tiled_background",
+                                     description="Corta uma imagem de fundo larga em blocos para streaming.")
+    parser.add_argument("source", help="imagem da camada inteira")
+    parser.add_argument("layer", help="nome da camada, ex. lvl3bg1 (substitui lvl3bg1.png no jogo)")
+    parser.add_argument("--tile-width", type=int, default=const.BG_TILE_WIDTH)
+    parser.add_argument("--asset-dir", default=assets.ASSET_DIR)
+    args = parser.parse_args(argv)
+    manifest = cut(pygame.image.load(args.source), args.layer, args.asset_dir, args.tile_width)
+    print(f"{len(manifest['tiles'])} blocos de {args.tile_width}px ({manifest['width']}x{manifest['height']}) "
+          f"-> {os.path.join(args.asset_dir, args.layer)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
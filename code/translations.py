@@ -0,0 +1,45 @@
+from . import const
+
+
+def _english():
+    return {
+        "title": const.GAME_TITLE, "start_game": "Start Game", "endless_mode": "Endless Mode", const.OPTIONS_TEXT_KEY: "Options",
+        "quit_game": "Quit", "language_en": "English (EN)", "language_pt": "Portuguese (BR)",
+        const.LANGUAGE_TEXT_KEY: "Language", const.CONTROLS_TEXT_KEY: "Controls",
+        const.CONTROLS_MOVE_KEY: "Move:", const.CONTROLS_JUMP_KEY: "Jump:",
+        const.CONTROLS_ATTACK_KEY: "Attack:", const.BACK_TEXT_KEY: "Back",
+        const.CONTROLS_MOVE_VALUE_KEY: "Left and Right Arrows",
+        const.CONTROLS_JUMP_VALUE_KEY: "Up Arrow",
+        const.CONTROLS_ATTACK_VALUE_KEY: "Spacebar",
+        "win_message": const.WIN_TEXT_EN, "game_over_message": const.GAME_OVER_TEXT_EN,
+        "retry_hint": "R: retry level    Enter: menu"
+    }
+
+
+def _portuguese():
+    return {
+        "title": "A Bruxa e a Santa Ordem", "start_game": "Iniciar Jogo", "endless_mode": "Modo Infinito", const.OPTIONS_TEXT_KEY: "Opções",
+        "quit_game": "Sair", "language_en": "Inglês (EN)", "language_pt": "Português (BR)",
+        const.LANGUAGE_TEXT_KEY: "Idioma", const.CONTROLS_TEXT_KEY: "Controles",
+        const.CONTROLS_MOVE_KEY: "Mover:", const.CONTROLS_JUMP_KEY: "Pular:",
+        const.CONTROLS_ATTACK_KEY: "Atacar:", const.BACK_TEXT_KEY: "Voltar",
+        const.CONTROLS_MOVE_VALUE_KEY: "Setas Esquerda e Direita",
+        const.CONTROLS_JUMP_VALUE_KEY: "Seta para Cima",
+        const.CONTROLS_ATTACK_VALUE_KEY: "Barra de Espaço",
+        "win_message": const.WIN_TEXT_PT, "game_over_message": const.GAME_OVER_TEXT_PT,
+        "retry_hint": "R: tentar o nível de novo    Enter: menu"
+    }
+
+
+_LANGUAGE_BUILDERS = {"en": _english, "pt": _portuguese}
+
+
+class Translations(dict):
+    """Dicionário idioma -> textos que só monta os textos de um idioma quando ele é usado pela primeira vez."""
+
+    def __missing__(self, language):
+        builder = _LANGUAGE_BUILDERS.get(language)
+        if builder is None:
+            raise KeyError(language)
+        strings = self[language] = builder()
+        return strings
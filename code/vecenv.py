@@ -0,0 +1,286 @@
+import os
+import multiprocessing as mp
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from . import const
+
+ACTION_LEFT = 1
+ACTION_RIGHT = 2
+ACTION_JUMP = 4
+ACTION_SHOOT = 8
+NUM_ACTIONS = 16
+
+OBS_ENEMY_SLOTS = 4
+OBS_SHOT_SLOTS = 4
+OBS_SIZE = 6 + 3 * OBS_ENEMY_SLOTS + 3 * OBS_SHOT_SLOTS
+
+MAX_EPISODE_STEPS = const.FPS * 180
+
+_CMD_STEP = b's'
+_CMD_RESET = b'r'
+_CMD_CLOSE = b'c'
+_ACK = b'k'
+
+
+def _buffer_layout(num_envs):
+    """Calcula os offsets (em bytes) de cada array dentro do bloco de memória compartilhada."""
+    layout = {}
+    offset = 0
+    for name, dtype, shape in (
+            ("obs", np.float32, (num_envs, OBS_SIZE)),
+            ("rewards", np.float32, (num_envs,)),
+            ("dones", np.uint8, (num_envs,)),
+            ("actions", np.uint8, (num_envs,)),
+    ):
+        layout[name] = (offset, dtype, shape)
+        offset += int(np.prod(shape)) * np.dtype(dtype).itemsize
+        offset = (offset + 7) & ~7
+    return layout, offset
+
+
+def _map_arrays(shm, num_envs):
+    """Cria views NumPy sobre o bloco compartilhado (nenhuma cópia)."""
+    layout, _ = _buffer_layout(num_envs)
+    return {name: np.ndarray(shape, dtype=dtype, buffer=shm.buf, offset=offset)
+            for name, (offset, dtype, shape) in layout.items()}
+
+
+class LevelEnv:
+    """Um `Level` sem renderização, controlado por ações discretas (bitmask ACTION_*)."""
+
+    def __init__(self, screen, level_num=1, seed=None, max_episode_steps=MAX_EPISODE_STEPS):
+        self.screen = screen
+        self.level_num = level_num
+        self.seed = seed
+        self.max_episode_steps = max_episode_steps
+        self.level = None
+        self._checkpoint = None
+        self.score_manager = None
+        self.episode = 0
+        self.steps = 0
+        self.delta_time = 1.0 / const.FPS
+
+    def reset(self, obs_out):
+        from .level import Level
+        from .score import ScoreManager
+
+        bg_prefix, bg_count, bg_start_index, level_width = const.LEVEL_DATA[self.level_num]
+        if self.score_manager is None:
+            self.score_manager = ScoreManager()
+        self.score_manager.reset()
+        seed = None if self.seed is None else self.seed * 100003 + self.episode
+        if self.level is None:
+            self.level = Level(self.screen, bg_prefix, bg_count, bg_start_index, level_width,
+                               player_lives=const.PLAYER_LIVES_START, score_manager=self.score_manager, seed=seed)
+            # Os episódios seguintes voltam a este estado sem recarregar nada (fundos, fontes, sprites)
+            self._checkpoint = self.level.snapshot()
+        else:
+            level = self.level
+            level.restore(self._checkpoint)
+            # Mesmo RNG e mesmo sorteio do primeiro surgimento que um Level novo com esta semente teria
+            level.rng.seed(seed)
+            level.next_spawn_time = level.rng.uniform(const.ENEMY_SPAWN_INTERVAL_MIN, const.ENEMY_SPAWN_INTERVAL_MAX)
+        self.episode += 1
+        self.steps = 0
+        self._write_obs(obs_out)
+
+    def step(self, action, obs_out):
+        """Executa um passo de simulação. Retorna (reward, done)."""
+        import pygame
+
+        level = self.level
+        player = level.player
+        keys = {
+            pygame.K_LEFT: bool(action & ACTION_LEFT),
+            pygame.K_RIGHT: bool(action & ACTION_RIGHT),
+            pygame.K_SPACE: bool(action & ACTION_SHOOT),
+        }
+        if action & ACTION_JUMP:
+            player.jump()
+
+        lives_before = player.lives
+        kills_before = level.score_manager.get_current_score()
+        x_before = player.rect.x
+
+        result = level.step(self.delta_time, keys)
+        self.steps += 1
+
+        reward = (level.score_manager.get_current_score() - kills_before) \
+            - (lives_before - player.lives) \
+            + (player.rect.x - x_before) / 100.0
+        done = result is not None or self.steps >= self.max_episode_steps
+        if result == "level_complete":
+            reward += 10.0
+
+        if done:
+            self.reset(obs_out)
+        else:
+            self._write_obs(obs_out)
+        return reward, done
+
+    def close(self):
+        if self.level is not None:
+            self.level.unload()
+            self.level = None
+            self._checkpoint = None
+
+    def _write_obs(self, out):
+        """Escreve o vetor de observação do estado atual diretamente em `out`."""
+        level = self.level
+        player = level.player
+        px, py = player.rect.centerx, player.rect.centery
+        sw, sh = float(level.screen_width), float(level.screen_height)
+
+        out.fill(0.0)
+        out[0] = player.rect.x / level.level_width
+        out[1] = player.rect.y / sh
+        out[2] = player.y_velocity / const.JUMP_STRENGTH
+        out[3] = player.lives / const.PLAYER_LIVES_START
+        out[4] = min(1.0, player.time_since_last_shot / player.shoot_cooldown)
+        out[5] = 1.0 if player.invincible_timer > 0 else 0.0
+
+        i = 6
+        enemies = sorted(level.enemies, key=lambda e: abs(e.rect.centerx - px))[:OBS_ENEMY_SLOTS]
+        for enemy in enemies:
+            out[i] = (enemy.rect.centerx - px) / sw
+            out[i + 1] = (enemy.rect.centery - py) / sh
+            out[i + 2] = 1.0
+            i += 3
+
+        i = 6 + 3 * OBS_ENEMY_SLOTS
+        shots = sorted(level.enemy_shots, key=lambda s: abs(s.rect.centerx - px))[:OBS_SHOT_SLOTS]
+        for shot in shots:
+            out[i] = (shot.rect.centerx - px) / sw
+            out[i + 1] = (shot.rect.centery - py) / sh
+            out[i + 2] = 1.0
+            i += 3
+
+
+def _worker_main(shm_name, num_envs, start, stop, conn, level_num, seed, max_episode_steps):
+    """Processo trabalhador: hospeda os ambientes [start, stop) e responde a comandos em bytes."""
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+    import pygame
+
+    pygame.display.init()
+    pygame.font.init()
+    screen = pygame.display.set_mode((const.SCREEN_WIDTH, const.SCREEN_HEIGHT))
+
+    shm = shared_memory.SharedMemory(name=shm_name)
+    arrays = _map_arrays(shm, num_envs)
+    obs, rewards, dones, actions = arrays["obs"], arrays["rewards"], arrays["dones"], arrays["actions"]
+    envs = [LevelEnv(screen, level_num, None if seed is None else seed + i, max_episode_steps)
+            for i in range(start, stop)]
+
+    try:
+        while True:
+            cmd = conn.recv_bytes()
+            if cmd == _CMD_STEP:
+                for env_index, env in enumerate(envs, start):
+                    reward, done = env.step(int(actions[env_index]), obs[env_index])
+                    rewards[env_index] = reward
+                    dones[env_index] = done
+            elif cmd == _CMD_RESET:
+                for env_index, env in enumerate(envs, start):
+                    env.reset(obs[env_index])
+                    rewards[env_index] = 0.0
+                    dones[env_index] = 0
+            elif cmd == _CMD_CLOSE:
+                break
+            conn.send_bytes(_ACK)
+    except (EOFError, KeyboardInterrupt):
+        pass
+    finally:
+        for env in envs:
+            env.close()
+        del obs, rewards, dones, actions, arrays
+        shm.close()
+        pygame.quit()
+
+
+class VectorizedLevelRunner:
+    """
+    Executa `num_envs` simulações independentes de `Level` distribuídas em `num_workers` processos,
+    avançando todas em sincronia. Observações, recompensas, flags de término e ações ficam num
+    bloco de memória compartilhada; por passo só trafega um byte de comando por trabalhador.
+    Ambientes que terminam são reiniciados automaticamente (a observação retornada já é a do novo episódio).
+    """
+
+    def __init__(self, num_envs, num_workers=None, level_num=1, seed=None,
+                 max_episode_steps=MAX_EPISODE_STEPS):
+        if num_envs < 1:
+            raise ValueError("num_envs deve ser pelo menos 1.")
+        num_workers = min(num_workers or os.cpu_count() or 1, num_envs)
+        self.num_envs = num_envs
+        self.num_workers = num_workers
+
+        _, size = _buffer_layout(num_envs)
+        self._shm = shared_memory.SharedMemory(create=True, size=size)
+        arrays = _map_arrays(self._shm, num_envs)
+        self.obs = arrays["obs"]
+        self.rewards = arrays["rewards"]
+        self.dones = arrays["dones"]
+        self.actions = arrays["actions"]
+
+        ctx = mp.get_context("spawn")
+        self._conns = []
+        self._processes = []
+        bounds = np.linspace(0, num_envs, num_workers + 1).astype(int)
+        for start, stop in zip(bounds[:-1], bounds[1:]):
+            parent_conn, child_conn = ctx.Pipe()
+            process = ctx.Process(target=_worker_main, daemon=True,
+                                  args=(self._shm.name, num_envs, int(start), int(stop), child_conn,
+                                        level_num, seed, max_episode_steps))
+            process.start()
+            child_conn.close()
+            self._conns.append(parent_conn)
+            self._processes.append(process)
+        self._closed = False
+
+    def _broadcast(self, cmd):
+        for conn in self._conns:
+            conn.send_bytes(cmd)
+        for conn in self._conns:
+            conn.recv_bytes()
+
+    def reset(self):
+        """Reinicia todos os ambientes e retorna a view das observações."""
+        self._broadcast(_CMD_RESET)
+        return self.obs
+
+    def step(self, actions):
+        """
+        Aplica `actions` (uma bitmask por ambiente) e avança todos os ambientes um passo.
+        Retorna (obs, rewards, dones) como views da memória compartilhada; copie se precisar guardá-las.
+        """
+        self.actions[:] = actions
+        self._broadcast(_CMD_STEP)
+        return self.obs, self.rewards, self.dones
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        for conn in self._conns:
+            try:
+                conn.send_bytes(_CMD_CLOSE)
+            except (BrokenPipeError, OSError):
+                pass
+        for process in self._processes:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+        for conn in self._conns:
+            conn.close()
+        del self.obs, self.rewards, self.dones, self.actions
+        self._shm.close()
+        self._shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
@@ -1,4 +1,87 @@
-from code.game import Game # Importa a CLASSE 'Game' do módulo 'game' dentro do pacote 'code'
+from code import startup_trace # Primeiro import: marca a origem do tempo de inicialização
+import argparse
 
-my_game_instance = Game() # Agora posso criar uma instância dessa classe e chamar seus métodos
-my_game_instance.run()
\ No newline at end of file
+with startup_trace.step("import pygame"):
+    import pygame
+with startup_trace.step("import code.game"):
+    from code.game import Game # Importa a CLASSE 'Game' do módulo 'game' dentro do pacote 'code'
+from code import assets, const
+from code.display import SCALE_MODES, SCALE_NEAREST, BACKENDS, BACKEND_SURFACE
+from code.pacing import PACING_POLICIES, PACING_SLEEP
+
+
+def window_size(text):
+    width, height = text.lower().split("x")
+    return int(width), int(height)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="The Witch and The Holy Order")
+    parser.add_argument("--record", metavar="CAMINHO",
+                        help="grava a sessão: pasta de PNGs ou arquivo .rgb bruto (ver --record-format)")
+    parser.add_argument("--record-format", choices=[const.CAPTURE_FORMAT_PNG, const.CAPTURE_FORMAT_RAW],
+                        default=const.CAPTURE_FORMAT_PNG)
+    parser.add_argument("--window", metavar="LxA", type=window_size,
+                        help="tamanho da janela, ex: 1920x1080 (padrão: resolução lógica do jogo)")
+    parser.add_argument("--fullscreen", action="store_true", help="tela cheia na resolução do monitor")
+    parser.add_argument("--scale", choices=SCALE_MODES, default=SCALE_NEAREST,
+                        help="como ampliar a imagem lógica para a janela")
+    parser.add_argument("--backend", choices=BACKENDS, default=BACKEND_SURFACE,
+                        help="surface: blits em software (padrão); sdl2: Renderer/Texture do SDL2")
+    parser.add_argument("--software-renderer", action="store_true",
+                        help="com --backend sdl2, usa o renderer de software do SDL (sem GPU)")
+    parser.add_argument("--pipelined-render", action="store_true",
+                        help="compõe o fundo numa thread enquanto simula o próximo frame (+1 frame de latência)")
+    parser.add_argument("--frame-pacing", choices=PACING_POLICIES, default=PACING_SLEEP,
+                        help="espera entre frames: sleep (padrão), busy (gira a CPU) ou hybrid (tick_busy_loop)")
+    parser.add_argument("--late-latch", action="store_true",
+                        help="simula inimigos e tiros inimigos antes de ler o teclado; o ganho de latência "
+                             "se limita ao tempo desse passo (câmera, colisões e desenho continuam depois da leitura)")
+    parser.add_argument("--input-latency", action="store_true",
+                        help="mede a latência entre tecla e frame apresentado e mostra os percentis ao sair")
+    parser.add_argument("--rewind-seconds", type=float, default=0, metavar="S",
+                        help="guarda os últimos S segundos de estado; BACKSPACE volta um segundo no nível")
+    parser.add_argument("--adaptive-quality", action="store_true",
+                        help="reduz parallax e animações quando o frame passa do orçamento e volta quando sobra tempo")
+    parser.add_argument("--async-loop", action="store_true",
+                        help="loop asyncio: gravação de scores, pré-carga de fundos e logs na sobra de cada frame "
+                             "(ignora --frame-pacing)")
+    parser.add_argument("--metrics-log", metavar="ARQUIVO",
+                        help="acrescenta um snapshot das métricas por segundo a um arquivo JSON Lines")
+    parser.add_argument("--profile", metavar="PASTA", nargs="?", const=const.PROFILE_DIR,
+                        help="liga o profiler por amostragem desde o início (F9 liga/desliga a qualquer momento); "
+                             "grava pilhas colapsadas e speedscope por estado do jogo")
+    parser.add_argument("--shared-assets", metavar="NOME", nargs="?", const=const.SHARED_ASSET_POOL,
+                        help="compartilha as imagens decodificadas com as outras instâncias da máquina que usam o "
+                             "mesmo pool (quiosque com um jogo por assento)")
+    parser.add_argument("--hitch-log", metavar="ARQUIVO",
+                        help="registra cada frame que passa do limite (fases, GC, entidades e a pilha no meio do "
+                             "frame) num log em anel de tamanho fixo; leia com python -m code.hitch ARQUIVO")
+    parser.add_argument("--hitch-threshold", type=float, default=const.HITCH_THRESHOLD, metavar="N",
+                        help="um frame é travada quando passa de N vezes o orçamento de 1/FPS")
+    parser.add_argument("--asset-report", action="store_true",
+                        help="ao sair, lista o formato de blit escolhido para cada imagem carregada")
+    parser.add_argument("--loose-assets", action="store_true",
+                        help="lê os arquivos soltos de asset/ mesmo que exista o assets.pak (desenvolvimento)")
+    parser.add_argument("--startup-trace", action="store_true",
+                        help="mostra o tempo gasto em cada etapa até o primeiro frame")
+    return parser.parse_args()
+
+
+if __name__ == "__main__": # Necessário porque a captura inicia processos auxiliares
+    args = parse_args()
+    if args.loose_assets:
+        assets.use_loose_files()
+    with startup_trace.step("Game.__init__"):
+        my_game_instance = Game(record_path=args.record, record_format=args.record_format,
+                                window_size=args.window, fullscreen=args.fullscreen, scale_mode=args.scale,
+                                show_startup_trace=args.startup_trace, backend=args.backend,
+                                software_renderer=args.software_renderer,
+                                pipelined_render=args.pipelined_render, frame_pacing=args.frame_pacing,
+                                late_latch=args.late_latch, measure_input_latency=args.input_latency,
+                                rewind_seconds=args.rewind_seconds, show_asset_report=args.asset_report,
+                                adaptive_quality=args.adaptive_quality, async_loop=args.async_loop,
+                                metrics_log=args.metrics_log, profile_dir=args.profile,
+                                shared_assets=args.shared_assets, hitch_log=args.hitch_log,
+                                hitch_threshold=args.hitch_threshold) # Agora posso criar uma instância dessa classe e chamar seus métodos
+    my_game_instance.run()